@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+比较文件名分类的速度（每秒分类的文件名数量）
+
+    python -m benchmarks.bench_classifier [--names 200000] [--unique 0.5]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from organizer.classifier import KEYWORDS, FilenameClassifier
+
+from .synthetic_tree import ASCII_NAMES, CHINESE_NAMES
+
+
+def inline_is_modified(filename):
+    """旧实现：每个文件重建关键词列表并逐字符检查中文"""
+    keywords = ["修改后", "增加", "增加后", "拷贝", "改后"]
+    has_keywords = any(keyword in filename for keyword in keywords)
+    has_chinese = any('\u4e00' <= char <= '\u9fff' for char in filename)
+    return has_keywords or has_chinese
+
+
+def make_names(count, unique_ratio, seed=1):
+    rng = random.Random(seed)
+    unique = max(1, int(count * unique_ratio))
+    patterns = ASCII_NAMES * 2 + CHINESE_NAMES
+    return [rng.choice(patterns).format(rng.randrange(unique)) for _ in range(count)]
+
+
+def measure(label, func, names):
+    start = time.perf_counter()
+    result = func(names)
+    elapsed = time.perf_counter() - start
+    rate = len(names) / elapsed
+    print(f"{label:<28} {elapsed:8.3f}s  {rate:>12,.0f} names/s")
+    return {"label": label, "seconds": round(elapsed, 4), "names_per_second": round(rate)}, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="文件名分类性能测试")
+    parser.add_argument("--names", type=int, default=200000)
+    parser.add_argument("--unique", type=float, default=0.5, help="不重复文件名的比例")
+    parser.add_argument("--batch", type=int, default=256, help="批量接口每批的文件名数量")
+    parser.add_argument("--json", metavar="PATH", help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    names = make_names(args.names, args.unique)
+    results = []
+
+    row, expected = measure("inline (before)", lambda ns: [inline_is_modified(n) for n in ns], names)
+    results.append(row)
+
+    classifier = FilenameClassifier(KEYWORDS)
+    row, single = measure("compiled is_modified", lambda ns: [classifier.is_modified(n) for n in ns], names)
+    results.append(row)
+
+    def batched(ns, classifier):
+        out = []
+        for i in range(0, len(ns), args.batch):
+            out.extend(classifier.is_modified_batch(ns[i:i + args.batch]))
+        return out
+
+    row, batch = measure("compiled batch (cold cache)", lambda ns: batched(ns, FilenameClassifier(KEYWORDS)), names)
+    results.append(row)
+    row, warm = measure("compiled batch (warm cache)", lambda ns: batched(ns, classifier), names)
+    results.append(row)
+
+    assert single == expected and batch == expected and warm == expected
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
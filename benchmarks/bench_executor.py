@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+比较不同工作线程数下的移动速度
+
+    python -m benchmarks.bench_executor [--files 5000] [--latency-ms 2] [--workers 1 4 16]
+
+本地同一磁盘上的移动只是一次 rename，线程数的影响很小；
+--latency-ms 为每次移动增加固定延迟，用来模拟网络存储或跨磁盘复制。
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from organizer.engine import OrganizerEngine
+from organizer.transfer import FileMover
+
+from .synthetic_tree import make_tree
+
+
+def run_once(workers, files, latency):
+    temp_dir = tempfile.mkdtemp(prefix="bench_executor_")
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        folders = max(1, files // 100)
+        total = make_tree(root_folder, folders=folders, files_per_folder=100)
+
+        mover = FileMover()
+
+        def move(src, dst):
+            if latency:
+                time.sleep(latency)
+            mover(src, dst)
+
+        engine = OrganizerEngine(workers=workers, move_func=move)
+        start = time.perf_counter()
+        summary = engine.organize_files(root_folder)
+        elapsed = time.perf_counter() - start
+        assert summary.error_count == 0
+        return {"workers": workers, "files": total, "seconds": round(elapsed, 3),
+                "files_per_second": round(total / elapsed, 1)}
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并行移动性能测试")
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="每次移动增加的模拟延迟（毫秒）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--json", metavar="PATH", help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    results = []
+    for workers in args.workers:
+        result = run_once(workers, args.files, args.latency_ms / 1000)
+        results.append(result)
+        print(f"workers={workers:>3}  files={result['files']}  "
+              f"{result['seconds']:.3f}s  {result['files_per_second']:.0f} files/s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
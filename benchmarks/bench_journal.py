@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+测量移动日志的开销
+
+    python -m benchmarks.bench_journal [--files 20000] [--sync-every 256]
+
+同一棵合成文件树分别在不使用日志和使用日志的情况下整理一次，输出两者的耗时，
+以及日志本身（写记录和 fsync）平均每次移动的开销。
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from organizer import journal as journal_module
+from organizer.engine import OrganizerEngine
+
+from .synthetic_tree import make_tree
+
+
+def run_once(files, use_journal):
+    temp_dir = tempfile.mkdtemp(prefix="bench_journal_")
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        folders = max(1, files // 100)
+        total = make_tree(root_folder, folders=folders, files_per_folder=100)
+
+        engine = OrganizerEngine(journal=use_journal)
+        start = time.perf_counter()
+        summary = engine.organize_files(root_folder)
+        elapsed = time.perf_counter() - start
+        assert summary.error_count == 0
+        result = {"journal": use_journal, "files": total, "seconds": round(elapsed, 3)}
+        if use_journal:
+            stats = summary.journal_stats
+            result.update(stats)
+            result["us_per_move"] = round(stats["seconds"] / total * 1e6, 1)
+        return result
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="移动日志开销测试")
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--sync-every", type=int, default=journal_module.SYNC_EVERY,
+                        help="每追加多少条提交记录 fsync 一次")
+    parser.add_argument("--repeat", type=int, default=3, help="每种情况运行的次数，取最快的一次")
+    parser.add_argument("--json", metavar="PATH", help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+    journal_module.SYNC_EVERY = args.sync_every
+
+    results = []
+    for use_journal in (False, True):
+        runs = [run_once(args.files, use_journal) for _ in range(args.repeat)]
+        results.append(min(runs, key=lambda result: result["seconds"]))
+    plain, journaled = results
+    for result in results:
+        line = f"{'使用日志' if result['journal'] else '不使用日志'}: {result['files']} 个文件 {result['seconds']:.3f} 秒"
+        if result["journal"]:
+            line += f"（日志 {result['records']} 条，fsync {result['syncs']} 次，每次移动 {result['us_per_move']} 微秒）"
+        print(line)
+    print(f"总耗时增加 {(journaled['seconds'] / plain['seconds'] - 1) * 100:.1f}%")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+并行扫描的扩展曲线：不同扫描线程数（或 asyncio 并发数）下的扫描速度
+
+    python -m benchmarks.bench_scan_scaling [--files 20000] [--latency-ms 2] [--workers 1 2 4 8 16]
+    python -m benchmarks.bench_scan_scaling --mode async --workers 1 8 64 256
+    python -m benchmarks.bench_scan_scaling --root /mnt/smb/照片 --latency-ms 0
+
+本地缓存中的文件夹列出得很快，扫描主要受 Python 本身的速度限制，多线程只会增加开销；
+--latency-ms 为每次列出文件夹增加固定延迟，用来模拟 SMB/NFS 的网络往返。
+--mode async 使用 AsyncScanner，--workers 为并发数，延迟由 LatencyFileSystem 注入（不占用线程）。
+--root 直接扫描已有的文件夹（只读，不修改任何文件），用来测量真实设备上的扩展曲线。
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from organizer.async_scan import AsyncScanner, LatencyFileSystem
+from organizer.engine import OrganizerEngine
+from organizer.parallel_scan import ParallelScanner
+from organizer.scanner import Scanner
+
+from .synthetic_tree import generate_tree
+
+
+def with_latency(scanner_class, latency):
+    """返回每次列出文件夹前等待 latency 秒的扫描器类"""
+    if not latency:
+        return scanner_class
+
+    class SlowScanner(scanner_class):
+        def _list_folder(self, *args, **kwargs):
+            time.sleep(latency)
+            return super()._list_folder(*args, **kwargs)
+
+    return SlowScanner
+
+
+def measure(root_folder, workers, latency, repeat, mode="threads"):
+    """返回最快一次扫描的 (耗时, 文件数, 文件夹数)"""
+    rules = OrganizerEngine().rules
+    best = None
+    for _ in range(repeat):
+        if mode == "async":
+            filesystem = LatencyFileSystem(latency) if latency else None
+            scanner = AsyncScanner(root_folder, concurrency=workers, filesystem=filesystem,
+                                   classification_folders=rules.target_folders)
+        elif workers == 1:
+            scanner = with_latency(Scanner, latency)(root_folder, classification_folders=rules.target_folders)
+        else:
+            scanner = with_latency(ParallelScanner, latency)(root_folder, workers=workers,
+                                                             classification_folders=rules.target_folders)
+        start = time.perf_counter()
+        files = sum(1 for _entry in scanner.scan())
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, files, scanner.stats.directories)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多线程扫描性能测试")
+    parser.add_argument("--files", type=int, default=20000, help="生成的文件数（使用 --root 时忽略）")
+    parser.add_argument("--shape", choices=("wide", "deep"), default="wide")
+    parser.add_argument("--mode", choices=("threads", "async"), default="threads",
+                        help="threads：ParallelScanner；async：AsyncScanner")
+    parser.add_argument("--root", metavar="PATH", help="扫描已有的文件夹，不生成文件树")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="每次列出文件夹增加的模拟延迟（毫秒）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=3, help="每个线程数重复的次数，取最快的一次")
+    parser.add_argument("--json", metavar="PATH", help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    temp_dir = None
+    if args.root:
+        root_folder = args.root
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="bench_scan_scaling_")
+        root_folder = os.path.join(temp_dir, "root")
+        generate_tree(root_folder, files=args.files, shape=args.shape)
+
+    results = []
+    try:
+        for workers in args.workers:
+            elapsed, files, directories = measure(root_folder, workers, args.latency_ms / 1000, args.repeat,
+                                               args.mode)
+            result = {"workers": workers, "files": files, "directories": directories,
+                      "seconds": round(elapsed, 3), "files_per_second": round(files / elapsed, 1)}
+            result["speedup"] = round(results[0]["seconds"] / elapsed, 2) if results else 1.0
+            results.append(result)
+            print(f"workers={workers:>3}  {elapsed:8.3f}s  {result['files_per_second']:>12,.0f} files/s"
+                  f"  {result['speedup']:>6.2f}x")
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+启动时间：导入时间、命令行整理一个空文件夹的总时间、窗口第一次显示的时间
+
+    python -m benchmarks.bench_startup [--repeat 5] [--json startup.json]
+    python -m benchmarks.bench_startup --exe dist/file_organizer/file_organizer.exe \
+        --cli-exe dist/file_organizer/file_organizer_cli.exe
+
+每项在新的子进程中测量 --repeat 次，取最快的一次，与 TARGETS 中的目标比较，
+超出任何一项目标时返回 1：
+
+    import_cli     import organizer.cli 的耗时（子进程内计时，不含解释器启动）
+    import_gui     import file_organizer 的耗时（包括 tkinter；没有 tkinter 时跳过）
+    cli_run        从启动进程到命令行整理完一个空文件夹并退出
+    first_window   从启动进程到窗口第一次显示（没有图形界面时跳过）
+
+import_cli 同时检查命令行的导入链中没有 tkinter、asyncio、sqlite3 和 concurrent.futures。
+--exe 测量打包后的图形界面程序的 first_window，--cli-exe 测量打包后的命令行程序的 cli_run
+（图形界面程序没有控制台窗口，不用于测量命令行）。
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 各项的目标（秒）。import_* 不含解释器启动；cli_run 和 first_window 是用户感受到的
+# 总时间。单文件 exe 每次启动都要先解压，通常达不到这些目标，需要快速启动时使用文件夹版
+TARGETS = {
+    "import_cli": 0.10,
+    "import_gui": 0.25,
+    "cli_run": 0.50,
+    "first_window": 1.00,
+}
+
+# 命令行启动时不应导入的模块：只在对应的功能开启时才需要
+HEAVY_MODULES = ("tkinter", "asyncio", "sqlite3", "concurrent.futures")
+
+# 与 file_organizer.STARTUP_PROBE_ENV 相同（这里不能导入 file_organizer，否则会加载 tkinter）
+STARTUP_PROBE_ENV = "ORGANIZER_STARTUP_PROBE"
+
+_IMPORT_SNIPPET = """\
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def measure_import(module, repeat=5):
+    """返回 (最快的导入耗时, 导入后已加载的重量级模块列表)；模块无法导入时返回 (None, [])"""
+    best = None
+    loaded = []
+    code = _IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+        if result.returncode != 0:
+            return None, []
+        lines = result.stdout.split("\n")
+        elapsed = float(lines[0])
+        loaded = [name for name in lines[1].split(",") if name]
+        best = elapsed if best is None else min(best, elapsed)
+    return best, loaded
+
+
+def measure_process(command, repeat=5, ready_line=None, env=None, timeout=60):
+    """返回从启动进程到输出 ready_line（None 表示到进程退出）的最快耗时；失败时返回 None"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(command, cwd=PROJECT_DIR, env=env, stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL, universal_newlines=True)
+        except OSError:
+            return None
+        elapsed = None
+        try:
+            if ready_line is None:
+                process.communicate(timeout=timeout)
+                if process.returncode == 0:
+                    elapsed = time.perf_counter() - start
+            else:
+                for line in process.stdout:
+                    if line.strip() == ready_line:
+                        elapsed = time.perf_counter() - start
+                        break
+                process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+        if elapsed is None:
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def has_display():
+    if sys.platform in ("win32", "darwin"):
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def run_benchmarks(repeat=5, exe=None, cli_exe=None):
+    """返回 ({项目: 最快耗时，跳过或失败为 None}, 命令行导入链中出现的重量级模块)"""
+    packaged = exe is not None or cli_exe is not None
+    if packaged:
+        cli_command = [cli_exe] if cli_exe is not None else None
+        gui_command = [exe] if exe is not None else None
+    else:
+        cli_command = [sys.executable, "-m", "organizer"]
+        gui_command = [sys.executable, os.path.join(PROJECT_DIR, "file_organizer.py")]
+
+    results = {}
+    loaded = []
+    if not packaged:
+        results["import_cli"], loaded = measure_import("organizer.cli", repeat)
+        results["import_gui"], _loaded = measure_import("file_organizer", repeat)
+
+    results["cli_run"] = None
+    if cli_command is not None:
+        temp_dir = tempfile.mkdtemp(prefix="bench_startup_")
+        try:
+            results["cli_run"] = measure_process(cli_command + [temp_dir, "--quiet"], repeat)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    results["first_window"] = None
+    if gui_command is not None and has_display():
+        env = dict(os.environ, **{STARTUP_PROBE_ENV: "1"})
+        results["first_window"] = measure_process(gui_command, repeat, ready_line="window-ready", env=env)
+    return results, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动时间测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复的次数，取最快的一次")
+    parser.add_argument("--exe", metavar="PATH", help="测量打包后的图形界面程序，而不是源代码")
+    parser.add_argument("--cli-exe", metavar="PATH", help="测量打包后的命令行程序，而不是源代码")
+    parser.add_argument("--json", metavar="PATH", help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    results, loaded = run_benchmarks(args.repeat, args.exe, args.cli_exe)
+    failed = []
+    for name, seconds in results.items():
+        target = TARGETS[name]
+        if seconds is None:
+            print(f"{name:<14}       跳过")
+            continue
+        status = "OK" if seconds <= target else "超出目标"
+        if seconds > target:
+            failed.append(name)
+        print(f"{name:<14} {seconds * 1000:8.1f} ms  目标 {target * 1000:6.0f} ms  {status}")
+    if loaded:
+        print(f"命令行启动时导入了不需要的模块: {', '.join(loaded)}")
+        failed.append("import_cli")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"exe": args.exe, "cli_exe": args.cli_exe, "targets": TARGETS, "seconds": results, "heavy_modules": loaded,
+                       "failed": failed}, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
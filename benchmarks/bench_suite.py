@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+按阶段测量整理大型文件树的耗时和内存
+
+    python -m benchmarks.bench_suite [--sizes 10k 100k 1m] [--shapes wide deep] [--json results.json]
+    python -m benchmarks.bench_suite --sizes 100k --json new.json --compare old.json
+
+每种规模和形状生成一棵合成文件树（见 synthetic_tree.generate_tree），依次测量：
+
+    scan      扫描整棵树（Scanner.scan）
+    classify  按规则分类（RuleSet.prepare_batch + route）
+    resolve   在目标文件夹中分配不重名的文件名（NameIndex）
+    plan      引擎流水线生成完整的移动计划（以上三步同时进行）
+    move      执行移动计划（修正"原图"中的文件，再移动其他文件）
+
+生成文件树的时间单独记录，不计入任何阶段。--memory 用 tracemalloc 记录每个阶段的
+Python 内存峰值（会让耗时明显变长，结果中有标记）；进程的最大常驻内存总会记录。
+另外分别用三种方式保存一次扫描结果，记录每个文件占用的内存（bytes_per_file）：
+(路径, 文件名, 文件夹) 元组、ScanEntry 列表和 FileRecords。
+结果 JSON 可以用 --compare 与之前的结果逐阶段比较。
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from organizer.engine import OrganizerEngine
+from organizer.name_index import NameIndex
+from organizer.pipeline import BATCH_SIZE
+from organizer.records import FileRecords
+
+from .synthetic_tree import SHAPES, SIZES, generate_tree
+
+try:
+    import resource
+except ImportError:
+    # Windows 没有 resource 模块
+    resource = None
+
+RESULT_FORMAT = 1
+
+PHASES = ("scan", "classify", "resolve", "plan", "move")
+
+
+def parse_size(text):
+    """把 "10k"、"1m"、"25000" 转换为文件数"""
+    text = text.lower()
+    if text in SIZES:
+        return SIZES[text]
+    multiplier = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def max_rss():
+    """进程的最大常驻内存（字节），不支持时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 上单位是字节，Linux 上是 KB
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PhaseTimer:
+    """测量各阶段的耗时和（可选的）Python 内存峰值"""
+
+    def __init__(self, files, memory=False):
+        self.files = files
+        self.memory = memory
+        self.phases = {}
+
+    def run(self, name, func, *args):
+        if self.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = None
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        self.phases[name] = {"seconds": round(elapsed, 4),
+                             "files_per_second": round(self.files / elapsed) if elapsed else None,
+                             "peak_memory": peak}
+        print(f"  {name:<9} {elapsed:9.3f}s  {self.files / elapsed if elapsed else 0:>12,.0f} files/s"
+              + (f"  峰值 {peak / 1048576:8.1f} MB" if peak is not None else ""))
+        return result
+
+
+def scan(engine, root_folder):
+    scanner = engine.create_scanner(root_folder)
+    return FileRecords.from_entries(scanner.scan(), scanner.stats)
+
+
+# 保存扫描结果的三种方式，用于比较每个文件占用的内存
+RECORD_LAYOUTS = {
+    "tuples": lambda scanner: [(entry.path, entry.name, entry.folder) for entry in scanner.scan()],
+    "entries": lambda scanner: list(scanner.scan()),
+    "records": lambda scanner: FileRecords.from_entries(scanner.scan()),
+}
+
+
+def bytes_per_file(engine, root_folder):
+    """分别扫描一次，返回各种保存方式中每个文件占用的内存（字节）"""
+    result = {}
+    for name, build in RECORD_LAYOUTS.items():
+        gc.collect()
+        tracemalloc.start()
+        try:
+            scanner = engine.create_scanner(root_folder)
+            records = build(scanner)
+            del scanner
+            gc.collect()
+            # 只统计扫描结束后仍然保留的内存
+            current = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        result[name] = round(current / len(records), 1) if records else None
+        del records
+    print("  每个文件占用的内存: " + "  ".join(f"{name} {size} B" for name, size in result.items()))
+    return result
+
+
+def classify(engine, records):
+    rules = engine.rules
+    routes = []
+    for start in range(0, len(records), BATCH_SIZE):
+        batch = [records.entry(index) for index in range(start, min(start + BATCH_SIZE, len(records)))]
+        rules.prepare_batch([entry.name for entry in batch])
+        for entry in batch:
+            routes.append(rules.route(entry, os.path.splitext(entry.name)[1].lower()))
+    return routes
+
+
+def resolve(root_folder, entries, routes):
+    """按整理时的方式分配目标文件名，返回需要重命名的文件数"""
+    names = NameIndex()
+    renamed = 0
+    for entry, rule in zip(entries, routes):
+        if rule.to_root:
+            if entry.folder == root_folder:
+                continue
+            folder = root_folder
+        else:
+            folder = os.path.join(root_folder, rule.target)
+        if names.reserve(folder, entry.name) != entry.name:
+            renamed += 1
+    return renamed
+
+
+def run_case(files, shape, base_dir, memory, workers):
+    temp_dir = tempfile.mkdtemp(prefix="bench_suite_", dir=base_dir)
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        print(f"{shape} {files}: 生成文件树...")
+        start = time.perf_counter()
+        tree = generate_tree(root_folder, files=files, shape=shape)
+        generate_seconds = time.perf_counter() - start
+
+        engine = OrganizerEngine(workers=workers)
+        timer = PhaseTimer(tree["files"], memory=memory)
+        entries = timer.run("scan", scan, engine, root_folder)
+        routes = timer.run("classify", classify, engine, entries)
+        renamed = timer.run("resolve", resolve, root_folder, entries, routes)
+        scanned = len(entries)
+        del entries, routes
+        memory_per_file = bytes_per_file(engine, root_folder)
+        plan = timer.run("plan", engine.plan_files, root_folder)
+        summary = timer.run("move", engine.execute_plan, root_folder, plan)
+        assert summary.error_count == 0, f"移动时出现 {summary.error_count} 个错误"
+
+        return {
+            "shape": shape,
+            "size": files,
+            "files": tree["files"],
+            "scanned": scanned,
+            "renamed": renamed,
+            "excel": tree["excel"],
+            "root_existing": tree["root_existing"],
+            "moved": summary.total_processed,
+            "generate_seconds": round(generate_seconds, 3),
+            "phases": timer.phases,
+            "bytes_per_file": memory_per_file,
+            "max_rss": max_rss(),
+        }
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def compare(results, baseline):
+    """逐阶段打印与之前结果的耗时比"""
+    previous = {(run["shape"], run["size"]): run for run in baseline.get("runs", [])}
+    print("与基准比较（耗时比，小于 1 表示变快）：")
+    if baseline.get("tracemalloc") != results["tracemalloc"]:
+        print("  注意：两次结果中只有一次使用了 --memory，耗时不可直接比较")
+    for run in results["runs"]:
+        old = previous.get((run["shape"], run["size"]))
+        if old is None:
+            print(f"  {run['shape']} {run['size']}: 基准中没有对应的结果")
+            continue
+        ratios = []
+        for phase in PHASES:
+            before = old["phases"].get(phase, {}).get("seconds")
+            after = run["phases"][phase]["seconds"]
+            ratios.append(f"{phase} {after / before:.2f}x" if before else f"{phase} -")
+        print(f"  {run['shape']} {run['size']}: " + "  ".join(ratios))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="分阶段整理性能测试")
+    parser.add_argument("--sizes", nargs="+", default=["10k"], help="文件数，可以使用 10k、100k、1m 或具体数字")
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--workers", type=int, default=1, help="移动阶段的线程数")
+    parser.add_argument("--memory", action="store_true", help="用 tracemalloc 记录每个阶段的内存峰值（耗时会变长）")
+    parser.add_argument("--tmpdir", metavar="DIR", help="生成文件树的位置（默认系统临时文件夹）")
+    parser.add_argument("--json", metavar="PATH", help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", metavar="PATH", help="与之前写入的 JSON 结果比较")
+    args = parser.parse_args(argv)
+
+    results = {
+        "format": RESULT_FORMAT,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "workers": args.workers,
+        "tracemalloc": args.memory,
+        "runs": [],
+    }
+    for size in args.sizes:
+        for shape in args.shapes:
+            results["runs"].append(run_case(parse_size(size), shape, args.tmpdir, args.memory, args.workers))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
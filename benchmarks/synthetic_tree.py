@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+生成用于性能测试的合成文件夹结构
+
+make_tree() 生成少量批次文件夹，供单项测试使用；generate_tree() 按文件总数生成
+宽或深的大型文件树（一万到一百万个文件），包含根目录中已有的"原图"/"处理图"、
+批次内已整理过的分类文件夹、Excel文件和大量同名文件。
+"""
+
+import os
+import random
+
+ASCII_NAMES = ["IMG_{:04d}.jpg", "DSC{:05d}.png", "scan_{:04d}.tif", "photo_{:04d}.jpeg"]
+CHINESE_NAMES = ["产品图{:04d}.jpg", "IMG_{:04d}_修改后.jpg", "主图{:04d}_拷贝.png", "详情页{:04d}.png"]
+EXCEL_NAMES = ["清单{:03d}.xlsx", "report_{:03d}.xls"]
+
+# generate_tree() 额外使用的文件名，更接近实际拍摄和修图后的文件
+CAMERA_NAMES = ASCII_NAMES + ["IMG_{:04d}.JPG", "DSC_{:04d}.NEF", "IMG_{:04d}.HEIC", "P{:07d}.jpg",
+                              "IMG_{:04d} (1).jpg", "Screenshot_{:06d}.png"]
+EDITED_NAMES = CHINESE_NAMES + ["合照{:03d}.jpg", "证件照_{:03d}.png", "IMG_{:04d}_增加后.jpg",
+                                "海报{:03d}_改后.psd", "宣传册第{:02d}页.tif"]
+SHEET_NAMES = EXCEL_NAMES + ["订单汇总{:02d}.xlsx", "拍摄清单_{:03d}.xls", "data_{:04d}.xlsm"]
+
+# 预设规模
+SIZES = {"10k": 10000, "100k": 100000, "1m": 1000000}
+
+SHAPES = ("wide", "deep")
+
+
+def make_tree(root_folder, folders=20, files_per_folder=50, depth=2, collision_ratio=0.3,
+              chinese_ratio=0.3, excel_ratio=0.02, file_size=0, seed=1):
+    """在 root_folder 下生成合成文件夹结构
+
+    Args:
+        root_folder: 根文件夹路径（会自动创建）
+        folders: 叶子文件夹数量
+        files_per_folder: 每个叶子文件夹中的文件数
+        depth: 叶子文件夹的深度
+        collision_ratio: 与其他文件夹中的文件同名的文件比例
+        chinese_ratio: 中文名或带关键词文件名的比例
+        excel_ratio: Excel文件的比例
+        file_size: 每个文件的字节数
+        seed: 随机种子，保证每次生成的结构相同
+
+    Returns:
+        int: 生成的文件总数
+    """
+    rng = random.Random(seed)
+    payload = b"\0" * file_size
+    total = 0
+    for folder_index in range(folders):
+        parts = [f"批次{folder_index % 7}"] + [f"level{level}_{folder_index}" for level in range(1, depth)]
+        folder = os.path.join(root_folder, *parts)
+        os.makedirs(folder, exist_ok=True)
+        for file_index in range(files_per_folder):
+            roll = rng.random()
+            if roll < excel_ratio:
+                pattern = rng.choice(EXCEL_NAMES)
+            elif roll < excel_ratio + chinese_ratio:
+                pattern = rng.choice(CHINESE_NAMES)
+            else:
+                pattern = rng.choice(ASCII_NAMES)
+            # 同名文件取自一个很小的编号范围，制造大量重名
+            number = rng.randrange(10) if rng.random() < collision_ratio else folder_index * files_per_folder + file_index
+            name = pattern.format(number)
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                continue
+            with open(path, "wb") as f:
+                f.write(payload)
+            total += 1
+    return total
+
+
+def _leaf_parts(index, shape, depth, batches):
+    """第 index 个叶子文件夹相对于根文件夹的路径各段"""
+    if shape == "deep":
+        # 每条链 depth 层，每层都有文件
+        chain, level = divmod(index, depth)
+        return [f"批次{chain}"] + [f"第{n}层" for n in range(1, level + 1)]
+    return [f"批次{index % batches}"] + [f"子文件夹{level}_{index}" for level in range(1, depth)]
+
+
+def _create(path, payload):
+    if payload:
+        with open(path, "xb") as f:
+            f.write(payload)
+    else:
+        os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+
+
+def generate_tree(root_folder, files=10000, shape="wide", files_per_folder=100, depth=None, batches=50,
+                  collision_ratio=0.3, collision_pool=20, chinese_ratio=0.3, excel_ratio=0.02,
+                  classified_ratio=0.1, root_ratio=0.05, misplaced_ratio=0.2, file_size=0, seed=1):
+    """按文件总数生成大型合成文件树
+
+    Args:
+        root_folder: 根文件夹路径（会自动创建）
+        files: 文件总数（近似，同一文件夹中的重名文件会被跳过）
+        shape: "wide"（很多浅层文件夹）或 "deep"（深层嵌套的文件夹链）
+        files_per_folder: 每个叶子文件夹中的文件数
+        depth: 文件夹深度，默认 wide 为 3、deep 为 12
+        batches: wide 形状下根目录中批次文件夹的数量
+        collision_ratio: 文件名编号取自很小范围（collision_pool）的比例，制造大量重名
+        collision_pool: 重名文件使用的编号范围
+        chinese_ratio: 中文名或带关键词文件名的比例
+        excel_ratio: Excel文件的比例
+        classified_ratio: 叶子文件夹中已经整理过（文件在其"原图"/"处理图"子文件夹中）的比例
+        root_ratio: 根目录"原图"/"处理图"中已有文件占总数的比例
+        misplaced_ratio: 根目录"原图"中已有文件里错误分类（应在"处理图"）的比例
+        file_size: 每个文件的字节数
+        seed: 随机种子，保证每次生成的结构相同
+
+    Returns:
+        dict: {"files": 文件总数, "leaf_folders": 含文件的文件夹数, "excel": Excel文件数, "root_existing": 根分类文件夹中的文件数}
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"未知的文件树形状: {shape}")
+    if depth is None:
+        depth = 12 if shape == "deep" else 3
+    rng = random.Random(seed)
+    payload = b"\0" * file_size
+    info = {"files": 0, "leaf_folders": 0, "excel": 0, "root_existing": 0}
+
+    def pick_name(unique_number):
+        roll = rng.random()
+        if roll < excel_ratio:
+            pattern = rng.choice(SHEET_NAMES)
+            info["excel"] += 1
+        elif roll < excel_ratio + chinese_ratio:
+            pattern = rng.choice(EDITED_NAMES)
+        else:
+            pattern = rng.choice(CAMERA_NAMES)
+        number = rng.randrange(collision_pool) if rng.random() < collision_ratio else unique_number
+        return pattern.format(number)
+
+    def fill(folder, count, first_number, names=None):
+        os.makedirs(folder, exist_ok=True)
+        info["leaf_folders"] += 1
+        names = set() if names is None else names
+        created = 0
+        for number in range(first_number, first_number + count):
+            name = pick_name(number)
+            if name in names:
+                continue
+            names.add(name)
+            _create(os.path.join(folder, name), payload)
+            created += 1
+        info["files"] += created
+        return created
+
+    # 根目录中上一次整理留下的文件
+    root_count = int(files * root_ratio)
+    if root_count:
+        misplaced = int(root_count * misplaced_ratio)
+        original = os.path.join(root_folder, "原图")
+        modified = os.path.join(root_folder, "处理图")
+        os.makedirs(original, exist_ok=True)
+        os.makedirs(modified, exist_ok=True)
+        info["leaf_folders"] += 2
+        original_names, modified_names = set(), set()
+        for number in range(root_count):
+            if number < misplaced:
+                folder, names, pattern = original, original_names, rng.choice(EDITED_NAMES)
+            elif number % 3:
+                folder, names, pattern = original, original_names, rng.choice(CAMERA_NAMES)
+            else:
+                folder, names, pattern = modified, modified_names, rng.choice(EDITED_NAMES)
+            name = pattern.format(rng.randrange(collision_pool) if rng.random() < collision_ratio else number)
+            if name in names:
+                continue
+            names.add(name)
+            _create(os.path.join(folder, name), payload)
+            info["files"] += 1
+            info["root_existing"] += 1
+
+    leaf = 0
+    number = root_count
+    while info["files"] < files:
+        folder = os.path.join(root_folder, *_leaf_parts(leaf, shape, depth, batches))
+        count = min(files_per_folder, files - info["files"])
+        if rng.random() < classified_ratio:
+            # 已经整理过的批次：文件分在其"原图"和"处理图"子文件夹中
+            half = count // 2
+            fill(os.path.join(folder, "原图"), half, number)
+            fill(os.path.join(folder, "处理图"), count - half, number + half)
+        else:
+            fill(folder, count, number)
+        number += count
+        leaf += 1
+    return info
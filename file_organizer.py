@@ -1,10 +1,34 @@
+import os
+
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import os
-import shutil
-from pathlib import Path
 import threading
 
+from organizer.engine import OrganizerEngine
+from organizer.events import EventChannel
+from organizer.journal import JOURNAL_FILENAME
+from organizer.watch import FolderWatcher
+
+# 界面刷新间隔（毫秒），工作线程的事件按此帧率批量显示
+FRAME_MS = 50
+
+# 并行移动文件的线程数
+MOVE_WORKERS = 4
+
+# 日志文本框最多保留的行数，超出后删除最早的日志
+LOG_MAX_LINES = 5000
+
+# "记录移动日志"选项的默认值：记录时程序中途关闭后再次整理会继续，也可以撤销上一次整理，
+# 但要先扫描完整个文件夹生成计划才开始移动，并在文件夹中留下 .organizer_journal.jsonl
+USE_JOURNAL = False
+
+# 设置了这个环境变量时，窗口第一次显示后输出一行 "window-ready" 并退出，
+# 用于测量启动时间，见 benchmarks/bench_startup.py
+STARTUP_PROBE_ENV = "ORGANIZER_STARTUP_PROBE"
+
+# 整理结束后删除被移空的子文件夹，下次整理不必再逐个列出（撤销时会重新创建）
+PRUNE_EMPTY_FOLDERS = False
+
 class FileOrganizer:
     def __init__(self, root):
         self.root = root
@@ -18,6 +42,15 @@ class FileOrganizer:
         
         self.setup_ui()
         
+        # 工作线程只向事件通道写入，界面控件只在主线程中更新
+        self.events = EventChannel()
+        self.engine = OrganizerEngine(self.events, workers=MOVE_WORKERS, journal=USE_JOURNAL,
+                                      prune=PRUNE_EMPTY_FOLDERS)
+        self.watcher = None
+        self.organize_thread = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(FRAME_MS, self.drain_events)
+        
     def setup_ui(self):
         # 主框架
         main_frame = ttk.Frame(self.root, padding="20")
@@ -42,9 +75,23 @@ class FileOrganizer:
         folder_label = ttk.Label(main_frame, textvariable=self.folder_var, font=("微软雅黑", 10))
         folder_label.grid(row=1, column=1, columnspan=2, sticky=(tk.W, tk.E), padx=(10, 0), pady=(0, 10))
         
-        # 开始整理按钮
-        self.organize_btn = ttk.Button(main_frame, text="开始整理", command=self.start_organizing, state="disabled")
-        self.organize_btn.grid(row=2, column=0, columnspan=3, pady=(0, 20))
+        # 开始整理按钮和监视按钮
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=2, column=0, columnspan=3, pady=(0, 20))
+        self.organize_btn = ttk.Button(button_frame, text="开始整理", command=self.start_organizing, state="disabled")
+        self.organize_btn.grid(row=0, column=0, padx=(0, 10))
+        self.watch_btn = ttk.Button(button_frame, text="开始监视", command=self.toggle_watching, state="disabled")
+        self.watch_btn.grid(row=0, column=1, padx=(0, 10))
+        self.undo_btn = ttk.Button(button_frame, text="撤销上次整理", command=self.start_undo, state="disabled")
+        self.undo_btn.grid(row=0, column=2, padx=(0, 10))
+        self.pause_btn = ttk.Button(button_frame, text="暂停", command=self.toggle_pause, state="disabled")
+        self.pause_btn.grid(row=0, column=3, padx=(0, 10))
+        self.cancel_btn = ttk.Button(button_frame, text="取消", command=self.cancel_organizing, state="disabled")
+        self.cancel_btn.grid(row=0, column=4)
+        self.journal_var = tk.BooleanVar(value=USE_JOURNAL)
+        journal_check = ttk.Checkbutton(button_frame, text="记录移动日志（可继续中断的整理、撤销上次整理）",
+                                        variable=self.journal_var, command=self.toggle_journal)
+        journal_check.grid(row=1, column=0, columnspan=5, sticky=tk.W, pady=(10, 0))
         
         # 进度条
         self.progress_var = tk.DoubleVar()
@@ -80,14 +127,35 @@ class FileOrganizer:
         folder_path = filedialog.askdirectory(title="选择要整理的文件夹")
         if folder_path:
             self.folder_var.set(folder_path)
-            self.organize_btn.config(state="normal")
+            if self.watcher is None:
+                self.enable_buttons()
             self.log_message(f"已选择文件夹: {folder_path}")
             
     def log_message(self, message):
-        """在日志中添加消息"""
-        self.log_text.insert(tk.END, f"{message}\n")
+        """在日志中添加消息（只能在主线程中调用，工作线程请使用 self.events.log）"""
+        self.append_log_lines([message])
+        
+    def append_log_lines(self, lines):
+        """一次性追加多行日志，并删除超出 LOG_MAX_LINES 的旧日志"""
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        line_count = int(self.log_text.index("end-1c").split(".")[0])
+        if line_count > LOG_MAX_LINES:
+            self.log_text.delete("1.0", f"{line_count - LOG_MAX_LINES}.0")
         self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        
+    def drain_events(self):
+        """按固定帧率取出工作线程的事件：日志批量追加，状态和进度只显示最新值"""
+        batch = self.events.drain()
+        if batch.logs:
+            self.append_log_lines(batch.logs)
+        if batch.has_status:
+            self.status_var.set(batch.status)
+        if batch.has_progress:
+            self.progress_var.set(batch.progress)
+        for func, args in batch.calls:
+            func(*args)
+        # 日志积压时立即处理下一批，否则等待下一帧
+        self.root.after(1 if self.events.pending() else FRAME_MS, self.drain_events)
         
     def start_organizing(self):
         """开始整理文件"""
@@ -97,395 +165,155 @@ class FileOrganizer:
             return
             
         # 禁用按钮，防止重复操作
-        self.organize_btn.config(state="disabled")
+        self.disable_buttons()
+        self.pause_btn.config(state="normal", text="暂停")
+        self.cancel_btn.config(state="normal")
         
         # 在新线程中执行文件整理
         thread = threading.Thread(target=self.organize_files, args=(folder_path,))
         thread.daemon = True
+        self.organize_thread = thread
         thread.start()
         
     def organize_files(self, root_folder):
-        """整理文件的主要逻辑"""
+        """在工作线程中运行整理引擎"""
         try:
-            self.status_var.set("正在扫描文件...")
-            self.progress_var.set(0)
-            
-            # 第一步：处理已经错误分类的文件（在"原图"文件夹中的文件）
-            self.log_message("第一步：检查并处理已错误分类的文件...")
-            corrected_count = self.correct_misclassified_files(root_folder)
-            
-            # 第二步：处理剩余的文件
-            self.log_message("第二步：处理剩余文件...")
-            
-            # 获取所有需要处理的文件
-            all_files = self.get_all_files_to_process(root_folder)
-            
-            if not all_files:
-                self.log_message("未找到任何需要处理的文件")
-                self.status_var.set("完成")
-                self.organize_btn.config(state="normal")
-                return
-                
-            total_files = len(all_files)
-            self.log_message(f"找到 {total_files} 个需要处理的文件")
-            
-            # 在根文件夹中创建分类文件夹（如果不存在）
-            original_folder_path = os.path.join(root_folder, "原图")
-            modified_folder_path = os.path.join(root_folder, "处理图")
-            
-            if not os.path.exists(original_folder_path):
-                os.makedirs(original_folder_path)
-                self.log_message(f"在根文件夹中创建: 原图/")
-            else:
-                self.log_message(f"根文件夹中已存在: 原图/")
-                
-            if not os.path.exists(modified_folder_path):
-                os.makedirs(modified_folder_path)
-                self.log_message(f"在根文件夹中创建: 处理图/")
-            else:
-                self.log_message(f"根文件夹中已存在: 处理图/")
-            
-            # 首先处理所有Excel文件，确保它们被移动到根目录
-            excel_files = [(fp, fn, sf) for fp, fn, sf in all_files if os.path.splitext(fn)[1].lower() in ['.xlsx', '.xls']]
-            other_files = [(fp, fn, sf) for fp, fn, sf in all_files if os.path.splitext(fn)[1].lower() not in ['.xlsx', '.xls']]
-            
-            self.log_message(f"发现 {len(excel_files)} 个Excel文件，{len(other_files)} 个其他文件")
-            
-            # 处理Excel文件
-            processed_count = 0
-            
-            for i, (file_path, filename, source_folder) in enumerate(excel_files):
-                try:
-                    self.status_var.set(f"正在处理: {filename}")
-                    self.progress_var.set((i + 1) / total_files * 100)
-                    
-                    # 检查文件扩展名
-                    file_ext = os.path.splitext(filename)[1].lower()
-                    
-                    # Excel文件直接放置到根目录
-                    if file_ext in ['.xlsx', '.xls']:
-                        self.log_message(f"🔍 发现Excel文件: {filename} (来自: {os.path.relpath(source_folder, root_folder)})")
-                        self.log_message(f"📁 文件路径: {file_path}")
-                        target_folder_path = root_folder
-                        target_folder_name = "根目录"
-                        
-                        # 构建目标文件路径
-                        target_file_path = os.path.join(target_folder_path, filename)
-                        
-                        # 检查目标文件是否已存在，如果存在则重命名
-                        target_file_path, final_filename = self.generate_unique_filename(target_folder_path, filename)
-                        if final_filename != filename:
-                            self.log_message(f"Excel文件重命名: {filename} -> {final_filename} (避免覆盖根目录中的同名文件)")
-                        else:
-                            self.log_message(f"Excel文件 {filename} 将直接移动到根目录")
-                        
-                        # 移动Excel文件到根目录
-                        try:
-                            shutil.move(file_path, target_file_path)
-                            if final_filename != filename:
-                                self.log_message(f"✅ 成功移动Excel文件: {filename} -> 根目录/{final_filename} (来自: {os.path.relpath(source_folder, root_folder)})")
-                            else:
-                                self.log_message(f"✅ 成功移动Excel文件: {filename} -> 根目录 (来自: {os.path.relpath(source_folder, root_folder)})")
-                            processed_count += 1
-                        except Exception as e:
-                            self.log_message(f"❌ 移动Excel文件失败: {filename}, 错误: {str(e)}")
-                            raise
-                        
-                    else:
-                        # 其他文件按逻辑分类
-                        # 检查文件名是否包含指定关键词
-                        keywords = ["修改后", "增加", "增加后", "拷贝", "改后"]
-                        has_keywords = any(keyword in filename for keyword in keywords)
-                        
-                        # 检查文件名是否包含中文字符
-                        has_chinese = any('\u4e00' <= char <= '\u9fff' for char in filename)
-                        
-                        # 如果文件名包含关键词，或者包含中文字符，则放到"处理图"文件夹
-                        if has_keywords or has_chinese:
-                            target_folder_name = "处理图"
-                            target_folder_path = modified_folder_path
-                        else:
-                            # 文件名中没有任何中文名称，也不包含关键词，放到"原图"文件夹
-                            target_folder_name = "原图"
-                            target_folder_path = original_folder_path
-                        
-                        # 构建目标文件路径
-                        target_file_path = os.path.join(target_folder_path, filename)
-                        
-                        # 检查目标文件是否已存在，如果存在则重命名
-                        target_file_path, final_filename = self.generate_unique_filename(target_folder_path, filename)
-                        if final_filename != filename:
-                            self.log_message(f"文件重命名: {filename} -> {final_filename} (避免覆盖同名文件)")
-                        
-                        # 移动文件
-                        shutil.move(file_path, target_file_path)
-                        self.log_message(f"移动文件: {filename} -> {target_folder_name}/ (来自: {os.path.relpath(source_folder, root_folder)})")
-                        processed_count += 1
-                    
-                except Exception as e:
-                    self.log_message(f"处理文件 {filename} 时出错: {str(e)}")
-            
-            # 处理其他文件
-            self.log_message(f"开始处理其他文件...")
-            for i, (file_path, filename, source_folder) in enumerate(other_files):
-                try:
-                    self.status_var.set(f"正在处理: {filename}")
-                    self.progress_var.set((i + 1) / len(other_files) * 100)
-                    
-                    # 检查文件名是否包含指定关键词
-                    keywords = ["修改后", "增加", "增加后", "拷贝", "改后"]
-                    has_keywords = any(keyword in filename for keyword in keywords)
-                    
-                    # 检查文件名是否包含中文字符
-                    has_chinese = any('\u4e00' <= char <= '\u9fff' for char in filename)
-                    
-                    # 如果文件名包含关键词，或者包含中文字符，则放到"处理图"文件夹
-                    if has_keywords or has_chinese:
-                        target_folder_name = "处理图"
-                        target_folder_path = modified_folder_path
-                    else:
-                        # 文件名中没有任何中文名称，也不包含关键词，放到"原图"文件夹
-                        target_folder_name = "原图"
-                        target_folder_path = original_folder_path
-                    
-                    # 构建目标文件路径
-                    target_file_path = os.path.join(target_folder_path, filename)
-                    
-                    # 检查目标文件是否已存在，如果存在则重命名
-                    target_file_path, final_filename = self.generate_unique_filename(target_folder_path, filename)
-                    if final_filename != filename:
-                        self.log_message(f"文件重命名: {filename} -> {final_filename} (避免覆盖同名文件)")
-                    
-                    # 移动文件
-                    shutil.move(file_path, target_file_path)
-                    self.log_message(f"移动文件: {filename} -> {target_folder_name}/ (来自: {os.path.relpath(source_folder, root_folder)})")
-                    processed_count += 1
-                    
-                except Exception as e:
-                    self.log_message(f"处理文件 {filename} 时出错: {str(e)}")
-            
-            total_processed = corrected_count + processed_count
-            self.status_var.set(f"完成！共处理 {total_processed} 个文件（修正 {corrected_count} 个，新处理 {processed_count} 个）")
-            self.log_message(f"文件整理完成，共处理 {total_processed} 个文件")
-            
+            self.engine.organize_files(root_folder)
         except Exception as e:
-            self.log_message(f"发生错误: {str(e)}")
-            self.status_var.set("发生错误")
+            self.events.log(f"发生错误: {str(e)}")
+            self.events.status("发生错误")
             
         finally:
-            self.organize_btn.config(state="normal")
-    
-    def generate_unique_filename(self, target_folder, filename):
-        """生成唯一的文件名，避免覆盖同名文件
-        
-        Args:
-            target_folder: 目标文件夹路径
-            filename: 原始文件名
-            
-        Returns:
-            tuple: (完整的目标文件路径, 最终文件名)
+            self.events.call(self.organizing_stopped)
+
+    def organizing_stopped(self):
+        self.organize_thread = None
+        self.enable_buttons()
+
+    def toggle_pause(self):
+        """暂停或继续整理：暂停后正在进行的移动完成，之后不再开始新的移动"""
+        control = self.engine.control
+        if control.paused:
+            control.resume()
+            self.pause_btn.config(text="暂停")
+            self.status_var.set("正在整理...")
+            self.log_message("继续整理")
+        else:
+            control.pause()
+            self.pause_btn.config(text="继续")
+            self.status_var.set("已暂停")
+            self.log_message("已暂停，点击“继续”恢复整理")
+
+    def cancel_organizing(self):
+        """取消整理：已经完成的移动保留
+
+        勾选"记录移动日志"时下次整理从中断处继续；不记录日志时没有检查点，下次整理重新扫描整个文件夹。
         """
-        # 构建目标文件路径
-        target_file_path = os.path.join(target_folder, filename)
-        
-        # 如果目标文件不存在，直接返回
-        if not os.path.exists(target_file_path):
-            return target_file_path, filename
-        
-        # 如果目标文件存在，需要重命名
-        base_name, ext = os.path.splitext(filename)
-        counter = 1
-        
-        # 循环查找可用的文件名
-        while os.path.exists(target_file_path):
-            new_filename = f"{base_name}_{counter}{ext}"
-            target_file_path = os.path.join(target_folder, new_filename)
-            counter += 1
-        
-        return target_file_path, os.path.basename(target_file_path)
-    
-    def get_all_files_to_process(self, root_folder):
-        """获取所有需要处理的文件，收集到根文件夹的分类文件夹中"""
-        all_files = []
-        
-        # 使用队列来管理待处理的文件夹
-        from collections import deque
-        queue = deque([root_folder])
-        processed_folders = set()
-        
-        while queue:
-            current_folder = queue.popleft()
-            
-            # 如果已经处理过，跳过
-            if current_folder in processed_folders:
-                continue
-                
-            processed_folders.add(current_folder)
-            
-            try:
-                # 检查当前文件夹是否包含文件
-                items = os.listdir(current_folder)
-                subdirs = []
-                
-                for item in items:
-                    item_path = os.path.join(current_folder, item)
-                    if os.path.isfile(item_path):
-                        # 检查文件是否已经在根文件夹的分类文件夹中
-                        if self.is_file_in_root_classification_folders(item_path, root_folder):
-                            # 如果文件已经在根文件夹的分类文件夹中，跳过
-                            self.log_message(f"跳过已分类文件: {item}")
-                            continue
-                        
-                        # 检查是否是Excel文件
-                        file_ext = os.path.splitext(item)[1].lower()
-                        if file_ext in ['.xlsx', '.xls']:
-                            self.log_message(f"📊 收集Excel文件: {item} (来自: {os.path.relpath(current_folder, root_folder)})")
-                        
-                        # 收集文件信息：(文件路径, 文件名, 源文件夹)
-                        all_files.append((item_path, item, current_folder))
-                    elif os.path.isdir(item_path):
-                        # 对于分类文件夹，我们仍然需要处理其中的文件
-                        # 但标记为来自分类文件夹
-                        if os.path.basename(item_path) in ["原图", "处理图"]:
-                            self.log_message(f"发现分类文件夹: {os.path.relpath(item_path, root_folder)}")
-                        
-                        # 所有子文件夹都需要添加到队列中，包括分类文件夹
-                        # 这样可以确保嵌套分类文件夹中的文件也能被处理
-                        # 但是，我们需要特别标记这些文件，确保Excel文件被正确处理
-                        subdirs.append(item_path)
-                
-                # 将子文件夹添加到队列中
-                for subdir in subdirs:
-                    queue.append(subdir)
-                        
-            except PermissionError:
-                # 跳过没有权限访问的文件夹
-                continue
-            except Exception as e:
-                self.log_message(f"检查文件夹 {current_folder} 时出错: {str(e)}")
-                continue
-        
-        self.log_message(f"总共收集到 {len(all_files)} 个文件需要处理")
-        return all_files
-    
-    def is_file_in_root_classification_folders(self, file_path, root_folder):
-        """检查文件是否已经在根文件夹的分类文件夹中"""
+        self.engine.control.cancel()
+        self.pause_btn.config(state="disabled")
+        self.cancel_btn.config(state="disabled")
+        self.status_var.set("正在取消...")
+
+    def on_close(self):
+        """整理中关闭窗口时先取消，等正在进行的移动完成后再退出，不留下移动了一半的文件"""
+        thread = self.organize_thread
+        if thread is not None:
+            self.engine.control.cancel()
+            thread.join()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.root.destroy()
+
+    def toggle_journal(self):
+        """开启或关闭移动日志，从下一次整理开始生效"""
+        self.engine.journal = self.journal_var.get()
+
+    def can_undo(self):
+        """选中的文件夹中有移动日志时可以撤销（日志可能是之前开启选项时留下的）"""
+        folder_path = self.folder_var.get()
+        return os.path.isfile(os.path.join(folder_path, JOURNAL_FILENAME))
+
+    def enable_buttons(self):
+        self.pause_btn.config(state="disabled", text="暂停")
+        self.cancel_btn.config(state="disabled")
+        self.organize_btn.config(state="normal")
+        self.watch_btn.config(state="normal", text="开始监视")
+        self.undo_btn.config(state="normal" if self.can_undo() else "disabled")
+
+    def disable_buttons(self):
+        self.organize_btn.config(state="disabled")
+        self.watch_btn.config(state="disabled")
+        self.undo_btn.config(state="disabled")
+
+    def start_undo(self):
+        """按移动日志撤销上一次整理"""
+        folder_path = self.folder_var.get()
+        if not messagebox.askyesno("撤销", "把上一次整理移动过的文件全部移回原处？"):
+            return
+        self.disable_buttons()
+        thread = threading.Thread(target=self.undo_last_run, args=(folder_path,))
+        thread.daemon = True
+        thread.start()
+
+    def undo_last_run(self, root_folder):
+        """在工作线程中撤销上一次整理"""
         try:
-            # 获取文件的父文件夹
-            parent_folder = os.path.dirname(file_path)
-            
-            # 如果父文件夹就是根文件夹，检查是否是分类文件夹
-            if parent_folder == root_folder:
-                # 检查父文件夹名称是否是分类文件夹
-                parent_name = os.path.basename(parent_folder)
-                if parent_name in ["原图", "处理图"]:
-                    return True
-                return False
-            
-            # 检查是否在根文件夹的分类文件夹中（通过路径比较）
-            try:
-                relative_path = os.path.relpath(file_path, root_folder)
-                path_parts = relative_path.split(os.sep)
-                
-                # 如果路径的第一部分是分类文件夹名称，则文件已经在根文件夹的分类文件夹中
-                # 但是，如果路径长度大于2，说明文件在嵌套的分类文件夹中，需要处理
-                if len(path_parts) >= 2 and path_parts[0] in ["原图", "处理图"]:
-                    # 如果路径长度正好是2，说明文件在根目录的直接分类文件夹中
-                    if len(path_parts) == 2:
-                        return True
-                    # 如果路径长度大于2，说明文件在嵌套的分类文件夹中，需要处理
-                    else:
-                        return False
-            except ValueError:
-                # 如果无法计算相对路径，使用绝对路径检查
-                pass
-            
-            return False
-        except Exception:
-            return False
-    
-    def is_classification_folder(self, folder_path):
-        """检查文件夹是否已经是分类文件夹（包含"原图"或"处理图"文件夹）"""
-        if not os.path.exists(folder_path):
-            return False
-            
+            self.engine.undo_last_run(root_folder)
+        except Exception as e:
+            self.events.log(f"发生错误: {str(e)}")
+            self.events.status("发生错误")
+        finally:
+            self.events.call(self.enable_buttons)
+
+    def toggle_watching(self):
+        """开始或停止监视：监视期间新到达的文件会自动整理"""
+        if self.watcher is not None:
+            self.watch_btn.config(state="disabled")
+            self.watcher.stop()
+            return
+
+        folder_path = self.folder_var.get()
+        if not folder_path or folder_path == "请选择要整理的文件夹":
+            messagebox.showerror("错误", "请先选择文件夹")
+            return
+
+        self.organize_btn.config(state="disabled")
+        self.undo_btn.config(state="disabled")
+        self.watch_btn.config(text="停止监视")
+        self.watcher = FolderWatcher(self.engine, folder_path)
+        thread = threading.Thread(target=self.watch_files, args=(self.watcher,))
+        thread.daemon = True
+        thread.start()
+
+    def watch_files(self, watcher):
+        """在工作线程中运行监视，直到 watcher.stop()"""
         try:
-            items = os.listdir(folder_path)
-            # 检查是否包含分类文件夹
-            has_original = "原图" in items and os.path.isdir(os.path.join(folder_path, "原图"))
-            has_modified = "处理图" in items and os.path.isdir(os.path.join(folder_path, "处理图"))
-            
-            # 如果包含任何一个分类文件夹，就认为是分类文件夹
-            if has_original or has_modified:
-                return True
-                
-            # 额外检查：如果文件夹名称本身就是"原图"或"处理图"，也认为是分类文件夹
-            folder_name = os.path.basename(folder_path)
-            if folder_name in ["原图", "处理图"]:
-                return True
-                
-            return False
-            
-        except Exception:
-            return False
-    
-    def correct_misclassified_files(self, root_folder):
-        """修正已经错误分类的文件"""
-        corrected_count = 0
-        
-        # 查找根文件夹中的"原图"文件夹
-        original_folder_path = os.path.join(root_folder, "原图")
-        if os.path.exists(original_folder_path):
-            self.log_message(f"检查根文件夹中的原图文件夹")
-            
-            # 检查"原图"文件夹中的文件
-            for filename in os.listdir(original_folder_path):
-                file_path = os.path.join(original_folder_path, filename)
-                
-                # 跳过文件夹，只处理文件
-                if os.path.isfile(file_path):
-                    try:
-                        # 检查文件名是否包含指定关键词或中文字符
-                        keywords = ["修改后", "增加", "增加后", "拷贝", "改后"]
-                        has_keywords = any(keyword in filename for keyword in keywords)
-                        has_chinese = any('\u4e00' <= char <= '\u9fff' for char in filename)
-                        
-                        if has_keywords or has_chinese:
-                            # 这个文件应该放在"处理图"文件夹中
-                            target_folder_name = "处理图"
-                            target_folder_path = os.path.join(root_folder, target_folder_name)
-                            
-                            # 如果"处理图"文件夹不存在，则创建
-                            if not os.path.exists(target_folder_path):
-                                os.makedirs(target_folder_path)
-                                self.log_message(f"创建文件夹: {target_folder_name}")
-                            
-                            # 移动文件
-                            target_file_path = os.path.join(target_folder_path, filename)
-                            if not os.path.exists(target_file_path):
-                                shutil.move(file_path, target_file_path)
-                                self.log_message(f"修正文件分类: {filename} -> {target_folder_name}/")
-                                corrected_count += 1
-                            else:
-                                self.log_message(f"目标文件已存在，跳过: {filename}")
-                        else:
-                            # 这个文件已经在正确的"原图"文件夹中，无需移动
-                            self.log_message(f"文件已在正确位置: {filename}")
-                            
-                    except Exception as e:
-                        self.log_message(f"修正文件 {filename} 时出错: {str(e)}")
-        
-        if corrected_count > 0:
-            self.log_message(f"修正了 {corrected_count} 个错误分类的文件")
-        else:
-            self.log_message("未发现需要修正的文件分类")
-            
-        return corrected_count
+            watcher.run()
+        except Exception as e:
+            self.events.log(f"发生错误: {str(e)}")
+            self.events.status("发生错误")
+        finally:
+            self.events.call(self.watch_stopped)
+
+    def watch_stopped(self):
+        self.watcher = None
+        self.enable_buttons()
+        self.status_var.set("准备就绪")
+
 
 def main():
     root = tk.Tk()
     app = FileOrganizer(root)
+    if os.environ.get(STARTUP_PROBE_ENV):
+        root.after(1, lambda: startup_probe(root))
     root.mainloop()
 
+
+def startup_probe(root):
+    """窗口画出后报告并退出"""
+    root.update_idletasks()
+    print("window-ready", flush=True)
+    root.destroy()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,114 @@
+# -*- mode: python ; coding: utf-8 -*-
+#
+# PyInstaller 打包配置
+#
+#     pyinstaller --noconfirm file_organizer.spec          单文件版 dist/file_organizer.exe
+#                                                          和 dist/file_organizer_cli.exe
+#     ORGANIZER_ONEDIR=1 pyinstaller --noconfirm file_organizer.spec
+#                                                          文件夹版 dist/file_organizer/（启动更快）
+#
+# file_organizer.exe 是图形界面，不显示控制台窗口；file_organizer_cli.exe 是带控制台的
+# 命令行版本（入口 file_organizer_cli.py，不打包 tkinter）。文件夹版中两者共用同一份运行库。
+#
+# 单文件版每次启动都要把 Python 和 Tcl/Tk 运行库解压到临时文件夹，冷启动需要数秒；
+# 文件夹版直接从安装目录加载，只在打开窗口时才加载 Tcl/Tk。两者都不使用 UPX：压缩过的
+# DLL 每次加载都要在内存中解压，反而更慢，Tcl/Tk 和 vcruntime 也常因此无法加载。
+# 启动时间用 python -m benchmarks.bench_startup --exe <程序路径> 测量。
+
+import os
+
+ONEDIR = os.environ.get("ORGANIZER_ONEDIR") == "1"
+
+# 程序用不到、但会被依赖分析带进来的标准库
+EXCLUDES = [
+    "tkinter.test", "idlelib", "turtle", "turtledemo", "test", "unittest", "doctest", "pdb", "pydoc",
+    "pydoc_data", "lib2to3", "distutils", "setuptools", "pip", "email", "http", "xmlrpc",
+    "xml", "html", "ftplib", "smtplib", "imaplib", "poplib", "mailbox", "ssl", "_ssl", "multiprocessing",
+    "bz2", "_bz2", "lzma", "_lzma", "curses", "readline", "sqlite3.test", "asyncio.test",
+]
+
+gui = Analysis(['file_organizer.py'],
+               pathex=[],
+               binaries=[],
+               datas=[],
+               hiddenimports=[],
+               hookspath=[],
+               runtime_hooks=[],
+               excludes=EXCLUDES,
+               win_no_prefer_redirects=False,
+               win_private_assemblies=False,
+               noarchive=False)
+gui_pyz = PYZ(gui.pure, gui.zipped_data)
+
+cli = Analysis(['file_organizer_cli.py'],
+               pathex=[],
+               binaries=[],
+               datas=[],
+               hiddenimports=[],
+               hookspath=[],
+               runtime_hooks=[],
+               excludes=EXCLUDES + ["tkinter", "_tkinter"],
+               win_no_prefer_redirects=False,
+               win_private_assemblies=False,
+               noarchive=False)
+cli_pyz = PYZ(cli.pure, cli.zipped_data)
+
+if ONEDIR:
+    gui_exe = EXE(gui_pyz,
+                  gui.scripts,
+                  [],
+                  exclude_binaries=True,
+                  name='file_organizer',
+                  debug=False,
+                  bootloader_ignore_signals=False,
+                  strip=False,
+                  upx=False,
+                  console=False)
+    cli_exe = EXE(cli_pyz,
+                  cli.scripts,
+                  [],
+                  exclude_binaries=True,
+                  name='file_organizer_cli',
+                  debug=False,
+                  bootloader_ignore_signals=False,
+                  strip=False,
+                  upx=False,
+                  console=True)
+    coll = COLLECT(gui_exe,
+                   gui.binaries,
+                   gui.zipfiles,
+                   gui.datas,
+                   cli_exe,
+                   cli.binaries,
+                   cli.zipfiles,
+                   cli.datas,
+                   strip=False,
+                   upx=False,
+                   name='file_organizer')
+else:
+    gui_exe = EXE(gui_pyz,
+                  gui.scripts,
+                  gui.binaries,
+                  gui.zipfiles,
+                  gui.datas,
+                  [],
+                  name='file_organizer',
+                  debug=False,
+                  bootloader_ignore_signals=False,
+                  strip=False,
+                  upx=False,
+                  runtime_tmpdir=None,
+                  console=False)
+    cli_exe = EXE(cli_pyz,
+                  cli.scripts,
+                  cli.binaries,
+                  cli.zipfiles,
+                  cli.datas,
+                  [],
+                  name='file_organizer_cli',
+                  debug=False,
+                  bootloader_ignore_signals=False,
+                  strip=False,
+                  upx=False,
+                  runtime_tmpdir=None,
+                  console=True)
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行版本的入口，打包为带控制台窗口的 file_organizer_cli.exe（见 file_organizer.spec）
+"""
+
+import sys
+
+from organizer.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
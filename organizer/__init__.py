@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+文件整理工具的核心逻辑（不依赖图形界面）
+
+导出的名称在第一次使用时才导入对应的模块（PEP 562）：import organizer.cli 等只会
+导入实际用到的模块，不会因为包里有 asyncio 扫描、扫描索引等而拖慢启动。
+"""
+
+import importlib
+
+# 导出的名称 -> 所在的模块
+_EXPORTS = {
+    "AsyncScanner": "async_scan",
+    "LatencyFileSystem": "async_scan",
+    "LocalFileSystem": "async_scan",
+    "FilenameClassifier": "classifier",
+    "RunControl": "control",
+    "DedupeStats": "dedupe",
+    "Deduplicator": "dedupe",
+    "CallbackListener": "engine",
+    "EngineListener": "engine",
+    "OrganizerEngine": "engine",
+    "RunSummary": "engine",
+    "MoveExecutor": "executor",
+    "MoveResult": "executor",
+    "MoveTask": "executor",
+    "Job": "jobs",
+    "JobQueue": "jobs",
+    "Metrics": "metrics",
+    "prometheus_text": "metrics",
+    "write_prometheus": "metrics",
+    "NameIndex": "name_index",
+    "ParallelScanner": "parallel_scan",
+    "MovePlan": "plan",
+    "PlanError": "plan",
+    "read_plan": "plan",
+    "write_plan": "plan",
+    "FolderPruner": "prune",
+    "FileRecords": "records",
+    "RecordView": "records",
+    "Rule": "rules",
+    "RuleError": "rules",
+    "RuleSet": "rules",
+    "compile_rules": "rules",
+    "default_rules": "rules",
+    "load_rules": "rules",
+    "ScanIndex": "scan_index",
+    "CLASSIFICATION_FOLDERS": "scanner",
+    "ScanEntry": "scanner",
+    "ScanStats": "scanner",
+    "Scanner": "scanner",
+    "scan_files": "scanner",
+    "FileMover": "transfer",
+    "TransferStats": "transfer",
+    "FolderWatcher": "watch",
+    "PendingFiles": "watch",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # 缓存到包的命名空间，之后不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
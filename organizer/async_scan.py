@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+基于 asyncio 的扫描
+
+SMB/NFS 上每次列出文件夹或 stat 都要等待数毫秒的网络往返，串行扫描几乎所有时间
+都在等待。AsyncScanner 在事件循环中同时进行最多 concurrency 个文件系统调用，
+按广度优先队列的顺序取回结果，产出的条目和顺序与 Scanner 相同。scan() 仍然是
+普通的迭代器（事件循环运行在迭代它的线程中，通常是 ScanPipeline 的扫描线程），
+之后的分类和移动不需要任何改变。
+
+文件系统调用通过 filesystem 对象进行：LocalFileSystem 在线程池中执行 os.scandir
+和 os.stat；LatencyFileSystem 在每次调用前等待固定的延迟，用来在本地测试和测量
+高延迟文件系统上的扫描。扫描索引的查询和记录（SQLite，记录时还要 stat 每个文件）
+通过 filesystem.call() 在线程池中进行，不阻塞事件循环。
+"""
+
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .scanner import Scanner
+
+# 默认同时进行的文件系统调用数
+SCAN_CONCURRENCY = 32
+
+
+def _list_dir(path):
+    """列出文件夹，返回 DirEntry 列表"""
+    with os.scandir(path) as it:
+        dir_entries = list(it)
+    # 文件系统没有返回条目类型时（部分 NFS），is_dir() 需要一次 stat；
+    # 在这里确定并缓存，之后在事件循环中判断类型时不再访问文件系统
+    for dir_entry in dir_entries:
+        dir_entry.is_dir()
+    return dir_entries
+
+
+class LocalFileSystem:
+    """在线程池中执行的本地文件系统调用
+
+    Args:
+        workers: 线程数，默认与扫描器的并发数相同
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self._pool = None
+
+    def open(self, concurrency):
+        self._pool = ThreadPoolExecutor(max_workers=self.workers or concurrency,
+                                        thread_name_prefix="organizer-ascan")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def call(self, func, *args):
+        """在线程池中执行可能访问文件系统的同步函数"""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    async def scandir(self, path):
+        return await self.call(_list_dir, path)
+
+    async def stat(self, path):
+        return await self.call(os.stat, path)
+
+
+class LatencyFileSystem:
+    """每次调用前等待固定延迟的文件系统替身
+
+    等待使用 asyncio.sleep，不占用线程；之后直接在事件循环中访问本地文件夹。
+    call() 执行的同步函数（扫描索引的查询和记录）与 LocalFileSystem 一样在线程池中运行。
+    同时在等待的调用数记录在 max_in_flight 中，可以用来检查并发上限。
+
+    Args:
+        latency: 每次 scandir/stat 的延迟（秒）
+        jitter: 在 latency 之上随机增加的最大延迟（秒）
+        seed: 随机延迟的种子
+    """
+
+    def __init__(self, latency=0.002, jitter=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._pool = None
+
+    def open(self, concurrency):
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="organizer-ascan")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def _wait(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+
+    async def call(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    async def scandir(self, path):
+        await self._wait()
+        return _list_dir(path)
+
+    async def stat(self, path):
+        await self._wait()
+        return os.stat(path)
+
+
+class AsyncScanner(Scanner):
+    """用 asyncio 同时列出多个文件夹的 Scanner，产出顺序与 Scanner 相同
+
+    参数与 Scanner 相同，另外：
+
+    Args:
+        concurrency: 同时进行的文件系统调用数上限
+        filesystem: LocalFileSystem（默认）或 LatencyFileSystem 等具有相同接口的对象
+        window: 最多提前开始的文件夹数，默认为 concurrency 的 4 倍
+    """
+
+    def __init__(self, root_folder, concurrency=SCAN_CONCURRENCY, filesystem=None, window=None, **kwargs):
+        super().__init__(root_folder, **kwargs)
+        self.concurrency = max(1, int(concurrency))
+        self.filesystem = filesystem if filesystem is not None else LocalFileSystem()
+        self.window = window or self.concurrency * 4
+        self._loop = None
+        self._limit = None
+        self._tasks = {}
+
+    def scan(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        self.filesystem.open(self.concurrency)
+        try:
+            loop.run_until_complete(self._open())
+            yield from super().scan()
+        finally:
+            # 消费者提前停止时取消还没有完成的列出
+            tasks = list(self._tasks.values())
+            self._tasks = {}
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.filesystem.close()
+            loop.close()
+            self._loop = None
+
+    async def _open(self):
+        # 信号量需要在事件循环中创建
+        self._limit = asyncio.Semaphore(self.concurrency)
+
+    def _next_listing(self, queue):
+        # 队首的 window 个文件夹都已开始（等待信号量）；新加入队列的文件夹在轮到它们进入窗口时开始
+        tasks = self._tasks
+        for position, item in enumerate(queue):
+            if position >= self.window:
+                break
+            if item not in tasks:
+                tasks[item] = self._loop.create_task(self._visit_async(*item))
+        item = queue.popleft()
+        # 运行事件循环直到队首的文件夹列出完成，其他文件夹同时在进行
+        return item, self._loop.run_until_complete(tasks.pop(item))
+
+    async def _visit_async(self, current_folder, rel_dir, depth):
+        """与 Scanner._visit 相同，文件系统调用通过 filesystem 进行"""
+        stats = self.stats
+        index = self.index
+        filesystem = self.filesystem
+        async with self._limit:
+            # 同时进行的列出互相重叠，seconds 是各文件夹耗时之和
+            start = time.perf_counter()
+            try:
+                listing = None
+                if index is not None:
+                    stats.dir_stat_calls += 1
+                    mtime_ns = (await filesystem.stat(current_folder)).st_mtime_ns
+                    # 查询 SQLite 索引，不能在事件循环中进行
+                    cached = await filesystem.call(index.lookup, rel_dir, mtime_ns)
+                    listing = self._index_listing(current_folder, rel_dir, depth, cached, stats)
+                if listing is None:
+                    stats.scandir_calls += 1
+                    dir_entries = await filesystem.scandir(current_folder)
+                    listing = self._collect(dir_entries, current_folder, rel_dir, depth, stats)
+                    if index is not None:
+                        # 记录时会 stat 每个文件，不能在事件循环中进行
+                        await filesystem.call(self._record_listing, rel_dir, depth, mtime_ns, listing)
+                return listing
+            except PermissionError:
+                # 跳过没有权限访问的文件夹
+                stats.errors += 1
+                return None
+            except OSError as e:
+                stats.errors += 1
+                if self.on_error is not None:
+                    self.on_error(current_folder, e)
+                return None
+            finally:
+                stats.seconds += time.perf_counter() - start
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+文件名分类器
+
+把关键词和中文字符范围编译成一个正则表达式。包含中文字符的关键词一定会被
+字符范围匹配到，编译时直接省略，所以默认关键词最终只剩一个字符类，
+每个文件名只需一次 C 实现的 search。批量接口在一次调用中处理一批文件名，
+结果按文件名缓存，大量重复的文件名（如 IMG_0001.jpg）只分类一次。
+"""
+
+import re
+
+from .scanner import CLASSIFICATION_FOLDERS
+
+# 文件名包含这些关键词时放到"处理图"文件夹
+KEYWORDS = ["修改后", "增加", "增加后", "拷贝", "改后"]
+
+# 中文字符范围
+CJK_RANGE = ('\u4e00', '\u9fff')
+
+# 缓存的文件名数量上限，超过后清空重新开始
+CACHE_LIMIT = 200000
+
+ORIGINAL_FOLDER, MODIFIED_FOLDER = CLASSIFICATION_FOLDERS
+
+
+class FilenameClassifier:
+    """判断文件名应放到"处理图"还是"原图"文件夹
+
+    Args:
+        keywords: 关键词列表
+        cjk_range: (起始字符, 结束字符)，文件名包含该范围内的字符即视为处理图；None 表示不检查
+    """
+
+    def __init__(self, keywords=KEYWORDS, cjk_range=CJK_RANGE):
+        self.keywords = list(keywords)
+        self.cjk_range = cjk_range
+        self.pattern = self._compile()
+        self.cache = {}
+
+    def _compile(self):
+        parts = []
+        if self.cjk_range is not None:
+            low, high = self.cjk_range
+            parts.append(f"[{re.escape(low)}-{re.escape(high)}]")
+            in_range = lambda char: low <= char <= high
+        else:
+            in_range = lambda char: False
+        # 含有范围内字符的关键词已被字符类覆盖，无需单独匹配
+        for keyword in sorted(set(self.keywords), key=len, reverse=True):
+            if keyword and not any(in_range(char) for char in keyword):
+                parts.append(re.escape(keyword))
+        if not parts:
+            # 不会匹配任何内容
+            return re.compile(r"(?!)")
+        return re.compile("|".join(parts))
+
+    def is_modified(self, filename):
+        """文件名包含关键词或中文字符时返回 True"""
+        result = self.cache.get(filename)
+        if result is None:
+            result = self.pattern.search(filename) is not None
+            self._remember(filename, result)
+        return result
+
+    def classify(self, filename):
+        """返回目标分类文件夹名称"""
+        return MODIFIED_FOLDER if self.is_modified(filename) else ORIGINAL_FOLDER
+
+    def is_modified_batch(self, filenames):
+        """批量判断，返回与 filenames 等长的布尔值列表"""
+        cache = self.cache
+        if len(cache) + len(filenames) > CACHE_LIMIT:
+            cache.clear()
+        get = cache.get
+        search = self.pattern.search
+        results = []
+        append = results.append
+        for name in filenames:
+            flag = get(name)
+            if flag is None:
+                flag = cache[name] = search(name) is not None
+            append(flag)
+        return results
+
+    def classify_batch(self, filenames):
+        """批量返回目标分类文件夹名称"""
+        return [MODIFIED_FOLDER if flag else ORIGINAL_FOLDER for flag in self.is_modified_batch(filenames)]
+
+    def _remember(self, filename, result):
+        cache = self.cache
+        if len(cache) >= CACHE_LIMIT:
+            cache.clear()
+        cache[filename] = result
+
+
+# 使用默认规则的共享分类器
+default_classifier = FilenameClassifier()
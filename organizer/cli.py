@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+命令行入口，不导入 tkinter，可在无图形界面的服务器上运行
+
+用法：
+    python -m organizer 要整理的文件夹 [--quiet] [--workers N] [--rules 规则文件] [--summary-json 路径]
+    python -m organizer 要整理的文件夹 --metrics-prom /var/lib/node_exporter/organizer.prom
+    python -m organizer 要整理的文件夹 --watch [--latency 秒] [--poll]
+    python -m organizer 要整理的文件夹 --plan plan.jsonl      # 只生成移动计划，不移动文件
+    python -m organizer 要整理的文件夹 --apply-plan plan.jsonl
+    python -m organizer 要整理的文件夹 --journal              # 记录移动日志，中断后再次运行会继续
+    python -m organizer 要整理的文件夹 --undo                 # 按移动日志撤销上一次整理
+    python -m organizer 要整理的文件夹 --dedupe hardlink      # 内容相同的同名文件改用硬链接
+    python -m organizer 文件夹1 文件夹2 ... [--roots-file 列表.txt] [--per-device N]  # 依次整理多个文件夹
+
+整理或执行计划时按一次 Ctrl+C 会在正在进行的移动完成后停止；使用 --journal 时
+再次运行会从中断处继续。再按一次 Ctrl+C 立即退出。
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from .dedupe import POLICIES as DEDUPE_POLICIES
+from .engine import EngineListener, OrganizerEngine
+from .jobs import PER_DEVICE, JobQueue, read_roots
+from .metrics import write_prometheus
+from .plan import PlanError, read_plan, write_plan
+from .rules import load_rules
+from .watch import DEFAULT_LATENCY, POLL_INTERVAL, FolderWatcher
+
+
+class ConsoleListener(EngineListener):
+    """把日志输出到终端的监听器"""
+
+    def __init__(self, quiet=False, stream=None, prefix=""):
+        self.quiet = quiet
+        self.stream = stream if stream is not None else sys.stdout
+        # 同时整理多个文件夹时，在每行日志前加上文件夹名
+        self.prefix = prefix
+
+    def log(self, message):
+        if not self.quiet:
+            print(f"{self.prefix}{message}", file=self.stream)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m organizer", description="文件整理工具（命令行版）")
+    parser.add_argument("root_folders", nargs="*", metavar="root_folder",
+                        help="要整理的文件夹；给出多个时按磁盘并行依次整理")
+    parser.add_argument("--roots-file", metavar="PATH",
+                        help="从文件读取要整理的文件夹，每行一个（忽略空行和 # 注释）；PATH 为 - 时从标准输入读取")
+    parser.add_argument("--per-device", type=int, default=PER_DEVICE, metavar="N",
+                        help=f"整理多个文件夹时同一磁盘上同时整理的文件夹数（默认 {PER_DEVICE}，不同磁盘之间总是并行）")
+    parser.add_argument("--max-jobs", type=int, metavar="N", help="整理多个文件夹时所有磁盘合计同时整理的文件夹数上限")
+    parser.add_argument("-q", "--quiet", action="store_true", help="只输出最终结果，不输出逐个文件的日志")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="并行移动文件的线程数（默认 1）")
+    parser.add_argument("--scan-workers", type=int, default=1, metavar="N",
+                        help="同时列出文件夹的线程数（默认 1；网络文件系统或 NVMe 上可以加快扫描）")
+    parser.add_argument("--scan-concurrency", type=int, metavar="N",
+                        help="用 asyncio 扫描，同时进行最多 N 个文件夹列出（适合高延迟的 SMB/NFS，优先于 --scan-workers）")
+    parser.add_argument("--excel-first", action="store_true",
+                        help="扫描全部完成后先移动Excel文件再移动其他文件（需要保存全部文件列表）")
+    parser.add_argument("--index", action="store_true",
+                        help="使用根文件夹下的扫描索引，跳过自上次整理以来没有变化的文件夹")
+    parser.add_argument("--rules", metavar="PATH", help="分类规则文件（.json 或 .toml），默认使用内置规则")
+    parser.add_argument("--summary-json", metavar="PATH", help="把结果汇总（包括各阶段耗时和计数器）写入 JSON 文件")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="把各阶段耗时和计数器写入 Prometheus 文本文件（供 node exporter 的 textfile collector 读取）")
+    parser.add_argument("--plan", metavar="PATH",
+                        help="只生成移动计划（JSONL）并写入 PATH，不移动任何文件；PATH 为 - 时写到标准输出")
+    parser.add_argument("--apply-plan", metavar="PATH",
+                        help="执行之前生成的移动计划；PATH 为 - 时从标准输入读取")
+    parser.add_argument("--journal", action="store_true",
+                        help="先把完整的移动计划写入根文件夹下的移动日志再移动；中途退出后再次运行会从日志继续")
+    parser.add_argument("--undo", action="store_true", help="按移动日志撤销上一次整理")
+    parser.add_argument("--prune", action="store_true",
+                        help="整理结束后删除被移空的子文件夹（按扫描结果判断，不重新遍历；撤销时会重新创建）")
+    parser.add_argument("--dedupe", choices=DEDUPE_POLICIES,
+                        help="比较需要重命名的同名文件的内容，内容相同时只报告（report）、跳过不移动（skip）"
+                             "或在目标位置改为硬链接（hardlink）")
+    parser.add_argument("--watch", action="store_true", help="整理后继续监视文件夹，自动整理新到达的文件（Ctrl+C 停止）")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, metavar="SECONDS",
+                        help=f"监视模式下文件停止变化多少秒后再移动（默认 {DEFAULT_LATENCY:g}）")
+    parser.add_argument("--poll", action="store_true", help="监视模式下使用轮询，不使用 inotify（适合网络文件系统）")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, metavar="SECONDS",
+                        help=f"轮询间隔（默认 {POLL_INTERVAL:g}）")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    roots = list(args.root_folders)
+    if args.roots_file:
+        try:
+            if args.roots_file == "-":
+                roots.extend(read_roots(sys.stdin))
+            else:
+                with open(args.roots_file, encoding='utf-8') as f:
+                    roots.extend(read_roots(f))
+        except OSError as e:
+            print(f"错误：无法读取文件夹列表 {args.roots_file}: {str(e)}", file=sys.stderr)
+            return 2
+    if not roots:
+        parser.error("需要指定要整理的文件夹")
+
+    rules = None
+    if args.rules:
+        try:
+            rules = load_rules(args.rules)
+        except (OSError, ValueError) as e:
+            print(f"错误：无法读取规则文件 {args.rules}: {str(e)}", file=sys.stderr)
+            return 2
+
+    if len(roots) > 1 or args.roots_file:
+        for option in ("watch", "plan", "apply_plan", "undo", "metrics_prom"):
+            if getattr(args, option):
+                flag = "--" + option.replace("_", "-")
+                print(f"错误：整理多个文件夹时不支持 {flag}", file=sys.stderr)
+                return 2
+        return run_jobs(roots, args, rules)
+
+    root_folder = os.path.abspath(roots[0])
+    if not os.path.isdir(root_folder):
+        print(f"错误：文件夹不存在: {root_folder}", file=sys.stderr)
+        return 2
+
+    # 计划写到标准输出时，日志改为输出到标准错误
+    log_stream = sys.stderr if args.plan == "-" else None
+    engine = create_engine(args, rules, ConsoleListener(quiet=args.quiet, stream=log_stream))
+    if args.watch:
+        return watch(engine, root_folder, args)
+    if args.plan:
+        return write_plan_file(engine, root_folder, args.plan)
+
+    try:
+        if args.undo:
+            summary = engine.undo_last_run(root_folder)
+            print(f"撤销完成，共移回 {summary.processed_count} 个文件")
+            return 1 if summary.error_count else 0
+        with cancel_on_interrupt(engine.control):
+            if args.apply_plan:
+                summary = apply_plan_file(engine, root_folder, args.apply_plan)
+            else:
+                summary = engine.organize_files(root_folder)
+    except PlanError as e:
+        print(f"错误：无法读取移动计划 {args.apply_plan}: {str(e)}", file=sys.stderr)
+        return 2
+    except Exception as e:
+        print(f"发生错误: {str(e)}", file=sys.stderr)
+        return 1
+
+    print(summary.status_text())
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as f:
+            json.dump(summary.as_dict(), f, ensure_ascii=False, indent=2)
+    if args.metrics_prom and summary.metrics is not None:
+        write_prometheus(args.metrics_prom, summary.metrics, labels={"root": root_folder})
+    if summary.cancelled:
+        return 130
+    return 1 if summary.error_count else 0
+
+
+@contextlib.contextmanager
+def cancel_on_interrupt(control):
+    """第一次 Ctrl+C 取消整理（正在进行的移动照常完成），第二次立即退出"""
+    if threading.current_thread() is not threading.main_thread():
+        # 只有主线程可以设置信号处理函数
+        yield
+        return
+
+    def handler(signum, frame):
+        if control.cancelled:
+            raise KeyboardInterrupt
+        control.cancel()
+        print("正在停止，等待正在进行的移动完成...（再按一次 Ctrl+C 立即退出）", file=sys.stderr)
+
+    previous = signal.signal(signal.SIGINT, handler)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+
+def create_engine(args, rules, listener):
+    return OrganizerEngine(listener, workers=args.workers,
+                           scan_workers=args.scan_workers, scan_concurrency=args.scan_concurrency,
+                           excel_first=args.excel_first, rules=rules,
+                           use_index=args.index, journal=args.journal, dedupe=args.dedupe, prune=args.prune,
+                           metrics=bool(args.summary_json or args.metrics_prom))
+
+
+def run_jobs(roots, args, rules):
+    """按磁盘并行整理多个文件夹，最后列出每个文件夹的结果"""
+    def make_engine(root_folder):
+        # 各任务共用同一个 RuleSet：RuleSet 只读，规则统计由每个引擎各自记录（RuleStats）
+        return create_engine(args, rules, ConsoleListener(quiet=args.quiet,
+                                                          prefix=f"[{os.path.basename(root_folder)}] "))
+
+    def on_finish(job):
+        print(f"[{os.path.basename(job.root_folder)}] {job.status_text()}")
+
+    queue = JobQueue(make_engine, per_device=args.per_device, max_jobs=args.max_jobs, on_finish=on_finish)
+    for root_folder in roots:
+        queue.add(root_folder)
+    start = time.perf_counter()
+    with cancel_on_interrupt(queue.control):
+        jobs = queue.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"共整理 {len(jobs)} 个文件夹，用时 {elapsed:.1f} 秒：")
+    for job in jobs:
+        print(f"  {job.root_folder}: {job.status_text()}（{job.elapsed:.1f} 秒）")
+    if args.summary_json:
+        with open(args.summary_json, 'w', encoding='utf-8') as f:
+            json.dump({"elapsed": round(elapsed, 3), "jobs": [job.as_dict() for job in jobs]},
+                      f, ensure_ascii=False, indent=2)
+    if queue.control.cancelled:
+        return 130
+    return 0 if all(job.ok for job in jobs) else 1
+
+
+def watch(engine, root_folder, args):
+    """监视模式，直到按下 Ctrl+C"""
+    watcher = FolderWatcher(engine, root_folder, latency=args.latency,
+                            backend="poll" if args.poll else "auto", poll_interval=args.poll_interval)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"发生错误: {str(e)}", file=sys.stderr)
+        return 1
+    print(f"共整理 {watcher.processed_count} 个文件，出错 {watcher.error_count} 个")
+    return 1 if watcher.error_count else 0
+
+
+def write_plan_file(engine, root_folder, path):
+    """生成移动计划并逐行写出，不移动文件"""
+    try:
+        if path == "-":
+            count = write_plan(sys.stdout, root_folder, engine.iter_plan(root_folder))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                count = write_plan(f, root_folder, engine.iter_plan(root_folder))
+    except Exception as e:
+        print(f"发生错误: {str(e)}", file=sys.stderr)
+        return 1
+    print(f"已生成移动计划，共 {count} 个文件", file=sys.stderr if path == "-" else sys.stdout)
+    return 0
+
+
+def apply_plan_file(engine, root_folder, path):
+    """逐行读取移动计划并执行"""
+    if path == "-":
+        return engine.execute_plan(root_folder, read_plan(sys.stdin, root_folder))
+    with open(path, encoding='utf-8') as f:
+        return engine.execute_plan(root_folder, read_plan(f, root_folder))
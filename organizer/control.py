@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+暂停、继续和取消
+
+RunControl 在界面线程（或信号处理函数）中设置状态，整理线程在两次移动之间检查：
+暂停时等待继续，取消时不再开始新的移动，已经开始的移动照常完成并记录，不会
+留下移动了一半的文件。使用移动日志时，已完成的移动和尚未执行的计划都在日志中，
+下次整理从中断处继续，见 OrganizerEngine。
+"""
+
+import threading
+
+
+class RunControl:
+    """一次整理的暂停/继续/取消状态（多线程安全）
+
+    Args:
+        parent: 上级 RunControl（例如 JobQueue 的），上级暂停或取消时本控制同样暂停或取消；
+            reset() 只清除本控制自己的状态
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = threading.Event()
+
+    @property
+    def paused(self):
+        return not self._running.is_set() or (self.parent is not None and self.parent.paused)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # 暂停中的整理线程需要被唤醒才能发现已取消
+        self._running.set()
+
+    def reset(self):
+        """开始新的一次整理前清除上一次的暂停和取消"""
+        self._cancelled.clear()
+        self._running.set()
+
+    def wait(self):
+        """暂停时等待继续；返回 False 表示已取消"""
+        if self.parent is not None and not self.parent.wait():
+            return False
+        self._running.wait()
+        return not self.cancelled
+
+    def gate(self, tasks):
+        """逐个交出 tasks 中的任务，取出每个任务之前检查暂停和取消；取消后关闭 tasks 并停止
+
+        tasks 通常是边扫描边生成任务的生成器，关闭它会同时停止扫描线程。
+        """
+        iterator = iter(tasks)
+        try:
+            while self.wait():
+                try:
+                    task = next(iterator)
+                except StopIteration:
+                    return
+                yield task
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
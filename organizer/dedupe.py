@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+按内容查找重复文件
+
+同名文件进入同一个目标文件夹时会被重命名为 x_1.jpg、x_2.jpg……，其中很多与已有文件
+内容完全相同。查重分三步，每一步只处理上一步仍无法区分的文件：
+
+1. 按文件大小分组（大小已在扫描时取得，不需要读文件）；
+2. 大小相同的文件比较开头和结尾各 PARTIAL_BLOCK 字节的哈希；
+3. 仍然相同的文件再计算完整哈希：用 mmap 映射整个文件交给 hashlib（不复制到
+   Python 对象，hashlib 计算时释放 GIL），在线程池中并行进行。
+
+不超过两个 PARTIAL_BLOCK 的文件在第二步已经比较了全部内容，不再计算完整哈希。
+"""
+
+import hashlib
+import mmap
+import os
+import time
+
+from .transfer import format_bytes
+
+# 部分哈希读取的开头和结尾的字节数
+PARTIAL_BLOCK = 64 * 1024
+
+# 计算哈希的线程数
+HASH_WORKERS = 4
+
+# 发现重复文件后的处理方式：只报告、跳过（保留在原处不移动）、用硬链接代替
+POLICIES = ("report", "skip", "hardlink")
+
+POLICY_NAMES = {"report": "只报告", "skip": "跳过", "hardlink": "硬链接"}
+
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=20)
+
+
+def partial_hash(path, size):
+    """开头和结尾各 PARTIAL_BLOCK 字节的哈希，返回 (哈希, 读取的字节数)"""
+    digest = _new_hash()
+    with open(path, "rb") as f:
+        head = f.read(PARTIAL_BLOCK)
+        digest.update(head)
+        read = len(head)
+        if size > PARTIAL_BLOCK:
+            f.seek(max(size - PARTIAL_BLOCK, PARTIAL_BLOCK))
+            tail = f.read(PARTIAL_BLOCK)
+            digest.update(tail)
+            read += len(tail)
+    return digest.digest(), read
+
+
+def full_hash(path):
+    """通过 mmap 计算整个文件的哈希，返回 (哈希, 读取的字节数)"""
+    digest = _new_hash()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return digest.digest(), 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                digest.update(view)
+    return digest.digest(), size
+
+
+class Candidate:
+    """参与查重的文件
+
+    Args:
+        path: 文件路径
+        size: 文件大小
+        payload: 调用者附带的对象（例如 MoveTask），已在目标位置的文件为 None
+    """
+
+    __slots__ = ("path", "size", "payload")
+
+    def __init__(self, path, size, payload=None):
+        self.path = path
+        self.size = size
+        self.payload = payload
+
+
+class DedupeStats:
+    """查重过程的统计"""
+
+    __slots__ = ("candidates", "partial_hashed", "full_hashed", "bytes_hashed", "hash_seconds",
+                 "duplicates", "duplicate_bytes", "bytes_saved", "errors")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    @property
+    def throughput(self):
+        """哈希吞吐量（字节/秒）"""
+        return self.bytes_hashed / self.hash_seconds if self.hash_seconds else 0.0
+
+    def as_dict(self):
+        result = {name: getattr(self, name) for name in self.__slots__}
+        result["hash_seconds"] = round(self.hash_seconds, 3)
+        result["throughput"] = round(self.throughput)
+        return result
+
+    def summary(self):
+        text = (f"查重：比较 {self.candidates} 个同名文件，部分哈希 {self.partial_hashed} 个、"
+                f"完整哈希 {self.full_hashed} 个，读取 {format_bytes(self.bytes_hashed)}"
+                f"（{format_bytes(self.throughput)}/秒）；发现 {self.duplicates} 个重复文件"
+                f"（{format_bytes(self.duplicate_bytes)}）")
+        if self.bytes_saved:
+            text += f"，节省 {format_bytes(self.bytes_saved)}"
+        return text
+
+
+class Deduplicator:
+    """分阶段比较文件内容
+
+    Args:
+        workers: 计算哈希的线程数
+    """
+
+    def __init__(self, workers=HASH_WORKERS):
+        self.workers = max(1, int(workers))
+        self.stats = DedupeStats()
+
+    def find_identical(self, groups):
+        """在每组候选文件中找出内容完全相同的文件
+
+        Args:
+            groups: Candidate 列表的列表，只有同一组内的文件会互相比较
+
+        Returns:
+            list: 内容相同的 Candidate 列表（每个至少两个文件，保持组内原有顺序）
+        """
+        stats = self.stats
+        buckets = []
+        for group in groups:
+            stats.candidates += len(group)
+            buckets.extend(_split(group, lambda candidate: candidate.size))
+        if not buckets:
+            return []
+
+        start = time.perf_counter()
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="organizer-hash") as pool:
+            partial = self._hash_all(pool, buckets, lambda c: partial_hash(c.path, c.size))
+            stats.partial_hashed += len(partial)
+            buckets = [bucket for old in buckets for bucket in _split(old, partial.get)]
+
+            # 两个数据块以内的文件已经比较了全部内容
+            large = [bucket for bucket in buckets if bucket[0].size > 2 * PARTIAL_BLOCK]
+            identical = [bucket for bucket in buckets if bucket[0].size <= 2 * PARTIAL_BLOCK]
+            full = self._hash_all(pool, large, lambda c: full_hash(c.path))
+            stats.full_hashed += len(full)
+            identical.extend(bucket for old in large for bucket in _split(old, full.get))
+        stats.hash_seconds += time.perf_counter() - start
+        return identical
+
+    def _hash_all(self, pool, buckets, hash_func):
+        """并行计算所有候选文件的哈希，返回 {Candidate: 哈希}；读取失败的文件不在结果中"""
+        candidates = [candidate for bucket in buckets for candidate in bucket]
+
+        def run(candidate):
+            try:
+                return hash_func(candidate)
+            except OSError:
+                return None
+
+        hashes = {}
+        for candidate, result in zip(candidates, pool.map(run, candidates)):
+            if result is None:
+                self.stats.errors += 1
+                continue
+            hashes[candidate], read = result
+            self.stats.bytes_hashed += read
+        return hashes
+
+
+def _split(candidates, key_func):
+    """按 key_func 分组，只返回至少有两个文件的组；key 为 None 的文件被丢弃"""
+    groups = {}
+    for candidate in candidates:
+        key = key_func(candidate)
+        if key is not None:
+            groups.setdefault(key, []).append(candidate)
+    return [group for group in groups.values() if len(group) > 1]
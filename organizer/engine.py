@@ -0,0 +1,989 @@
+# -*- coding: utf-8 -*-
+"""
+文件整理引擎
+
+包含全部整理逻辑，不依赖 tkinter；界面和命令行都通过 EngineListener 接收
+日志、状态和进度事件。
+
+只在部分选项下用到的模块（asyncio 扫描、多线程扫描、扫描索引）在用到时才导入：
+asyncio、concurrent.futures 和 sqlite3 的导入时间比引擎本身还长，命令行和界面的启动
+不应为没有开启的功能付出这些时间。
+"""
+
+import os
+import time
+
+from .control import RunControl
+from .dedupe import POLICIES as DEDUPE_POLICIES
+from .dedupe import POLICY_NAMES as DEDUPE_POLICY_NAMES
+from .dedupe import Candidate, Deduplicator
+from .executor import MoveExecutor, MoveTask
+from .journal import MoveJournal, PlanProgress
+from .metrics import NULL_METRICS, Metrics
+from .name_index import NameIndex
+from .pipeline import EntryBatches, ScanPipeline
+from .plan import MovePlan
+from .prune import FolderPruner
+from .records import FileRecords
+from .rules import EXCEL_EXTENSIONS, RuleStats, default_rules
+from .scanner import CLASSIFICATION_FOLDERS, Scanner
+from .transfer import FileMover
+
+ORIGINAL_FOLDER, MODIFIED_FOLDER = CLASSIFICATION_FOLDERS
+
+
+def is_excel_file(filename):
+    return os.path.splitext(filename)[1].lower() in EXCEL_EXTENSIONS
+
+
+class EngineListener:
+    """引擎事件接口，默认忽略所有事件，按需在子类中覆盖"""
+
+    def log(self, message):
+        pass
+
+    def status(self, text):
+        pass
+
+    def progress(self, percent):
+        pass
+
+
+class CallbackListener(EngineListener):
+    """把事件转发给普通函数的监听器"""
+
+    def __init__(self, log=None, status=None, progress=None):
+        if log is not None:
+            self.log = log
+        if status is not None:
+            self.status = status
+        if progress is not None:
+            self.progress = progress
+
+
+class RunSummary:
+    """一次整理的结果汇总"""
+
+    def __init__(self):
+        self.corrected_count = 0
+        self.processed_count = 0
+        self.error_count = 0
+        self.scan_stats = None
+        self.transfer_stats = None
+        self.rule_stats = None
+        self.journal_stats = None
+        self.dedupe_stats = None
+        self.metrics = None
+        self.pruned_dirs = 0
+        self.cancelled = False
+        self.elapsed = 0.0
+
+    @property
+    def total_processed(self):
+        return self.corrected_count + self.processed_count
+
+    def status_text(self):
+        if self.cancelled:
+            return (f"已取消，共处理 {self.total_processed} 个文件"
+                    f"（修正 {self.corrected_count} 个，新处理 {self.processed_count} 个）")
+        return (f"完成！共处理 {self.total_processed} 个文件"
+                f"（修正 {self.corrected_count} 个，新处理 {self.processed_count} 个）")
+
+    def as_dict(self):
+        return {
+            "corrected": self.corrected_count,
+            "processed": self.processed_count,
+            "total": self.total_processed,
+            "errors": self.error_count,
+            "cancelled": self.cancelled,
+            "pruned_dirs": self.pruned_dirs,
+            "elapsed": round(self.elapsed, 3),
+            "scan": self.scan_stats.as_dict() if self.scan_stats is not None else None,
+            "transfer": self.transfer_stats.as_dict() if self.transfer_stats is not None else None,
+            "rules": self.rule_stats,
+            "journal": self.journal_stats,
+            "dedupe": self.dedupe_stats.as_dict() if self.dedupe_stats is not None else None,
+            "metrics": self.metrics.as_dict() if self.metrics is not None else None,
+        }
+
+
+class OrganizerEngine:
+    """文件整理引擎
+
+    Args:
+        listener: EngineListener 实例，接收日志、状态和进度事件
+        workers: 并行移动文件的线程数，1 表示逐个移动
+        scan_workers: 同时列出文件夹的线程数，大于 1 时使用 ParallelScanner（产出顺序不变）
+        scan_concurrency: 设置时用 AsyncScanner 扫描，同时进行最多这么多个文件系统调用
+            （适合每次调用都有网络往返的 SMB/NFS），优先于 scan_workers
+        move_func: 执行移动的函数 move_func(源路径, 目标路径)，默认使用 FileMover
+        excel_first: 是否在扫描全部完成后先移动Excel文件（移动到根目录的文件）、再移动其他文件
+        rules: RuleSet 实例，默认使用 default_rules()（Excel到根目录，关键词/中文到处理图，其余到原图）
+        use_index: 是否使用根文件夹下的扫描索引，跳过自上次整理以来没有变化的文件夹
+        journal: 是否使用移动日志：先生成并记录完整的移动计划再移动，中途退出后下次运行
+            从日志继续，也可以用 undo_last_run() 撤销
+        dedupe: 移动前比较需要重命名的同名文件的内容，对内容相同的文件采取的处理方式：
+            "report"（只报告）、"skip"（跳过，留在原处）或 "hardlink"（目标位置改为硬链接）；
+            None 表示不查重。查重需要先生成全部移动任务，见 dedupe_tasks()
+        metrics: 是否记录各阶段耗时和计数器（RunSummary.metrics，见 organizer.metrics），
+            同时统计每条规则的评估次数、命中次数和耗时（RunSummary.rule_stats）。规则统计
+            在生成移动任务时记录；按日志继续上次的整理或执行保存的计划时不评估规则，没有规则统计
+        control: RunControl 实例，用于在其他线程中暂停、继续或取消整理，默认新建；
+            取消后已完成的移动保留，使用移动日志时下次整理从中断处继续
+        prune: 整理结束后删除被移空的源文件夹（按扫描时记录的内容判断，不重新遍历，
+            见 organizer.prune）
+    """
+
+    def __init__(self, listener=None, workers=1, move_func=None, excel_first=False, rules=None,
+                 use_index=False, journal=False, dedupe=None, metrics=False, scan_workers=1,
+                 scan_concurrency=None, control=None, prune=False):
+        if dedupe is not None and dedupe not in DEDUPE_POLICIES:
+            raise ValueError(f"未知的查重方式: {dedupe}")
+        self.listener = listener if listener is not None else EngineListener()
+        self.workers = workers
+        self.scan_workers = scan_workers
+        self.scan_concurrency = scan_concurrency
+        self.move_func = move_func
+        self.excel_first = excel_first
+        self.rules = rules if rules is not None else default_rules()
+        self.use_index = use_index
+        self.journal = journal
+        self.dedupe = dedupe
+        self.collect_metrics = metrics
+        self.control = control if control is not None else RunControl()
+        self.prune = prune
+        # 当前这次整理的 Metrics，没有启用时为 NULL_METRICS
+        self.metrics = NULL_METRICS
+        self._plan_names = None
+        self._index = None
+        self._journal = None
+        self._pruner = None
+        # 使用移动日志生成计划时记录已经处理完的文件夹，见 PlanProgress
+        self._progress = None
+        self.last_scan_stats = None
+        self.last_dedupe_stats = None
+        self.last_rule_stats = None
+        # 目标文件夹中已占用的文件名，每次整理开始时重建
+        self._name_index = NameIndex()
+        # 本次整理中已确认存在的目标文件夹
+        self._ready_folders = set()
+        # 生成计划时为 True：只计算移动，不创建文件夹
+        self._dry_run = False
+
+    def log_message(self, message):
+        self.listener.log(message)
+
+    def _begin_metrics(self):
+        self.metrics = Metrics() if self.collect_metrics else NULL_METRICS
+        self._plan_names = None
+
+    def _executor_metrics(self):
+        # 没有启用时执行器完全不计时
+        return self.metrics if self.metrics.enabled else None
+
+    def record_metrics(self, summary):
+        """整理结束时从各统计对象中读出计数器，放入 summary.metrics"""
+        metrics = self.metrics
+        if not metrics.enabled:
+            return
+        metrics.set("files_corrected", summary.corrected_count)
+        metrics.set("files_processed", summary.processed_count)
+        metrics.set("errors", summary.error_count)
+        metrics.set("pruned_dirs", summary.pruned_dirs)
+        if summary.scan_stats is not None:
+            scan_stats = summary.scan_stats
+            metrics.phases["scan"] = scan_stats.seconds
+            metrics.set("directories", scan_stats.directories)
+            metrics.set("scandir_calls", scan_stats.scandir_calls)
+            metrics.set("stat_calls", scan_stats.stat_calls)
+        if summary.transfer_stats is not None:
+            for name in ("renames", "copies", "links", "bytes_copied", "bytes_moved", "bytes_linked"):
+                metrics.set(name, getattr(summary.transfer_stats, name))
+        # 使用移动日志时，生成计划和执行计划各用一个 NameIndex
+        indexes = [self._name_index]
+        if self._plan_names is not None and self._plan_names is not self._name_index:
+            indexes.append(self._plan_names)
+        metrics.set("name_reservations", sum(names.reservations for names in indexes))
+        metrics.set("name_collisions", sum(names.collisions for names in indexes))
+        metrics.set("name_collision_probes", sum(names.collision_probes for names in indexes))
+        metrics.phases["total"] = summary.elapsed
+        summary.metrics = metrics
+
+    def organize_files(self, root_folder):
+        """整理文件的主要逻辑
+
+        扫描、分类和移动以流水线方式同时进行，见 organizer.pipeline。
+        使用移动日志时先生成完整的计划再移动，见 organizer.journal。
+
+        Returns:
+            RunSummary: 本次整理的结果汇总
+        """
+        listener = self.listener
+        summary = RunSummary()
+        start_time = time.perf_counter()
+
+        listener.status("正在扫描文件...")
+        listener.progress(0)
+
+        self._ready_folders = set()
+        self.control.reset()
+        self._begin_metrics()
+        self._index = None
+        if self.use_index:
+            from .scan_index import ScanIndex
+            self._index = ScanIndex(root_folder, rules_key=self.rules.fingerprint)
+        self._journal = MoveJournal(root_folder) if self.journal else None
+        self._pruner = FolderPruner(root_folder, keep=self.rules.target_folders) if self.prune else None
+        try:
+            if self._journal is not None:
+                summary = self._organize_journaled(root_folder, summary, start_time)
+            else:
+                summary = self._organize(root_folder, summary, start_time)
+            if self._pruner is not None:
+                self.prune_folders(summary)
+                summary.elapsed = time.perf_counter() - start_time
+            self.record_metrics(summary)
+            return summary
+        finally:
+            self._pruner = None
+            if self._index is not None:
+                self._index.finish()
+                self._index = None
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def report_rule_stats(self, summary):
+        """把生成移动任务时记录的规则统计放入 summary 并写入日志（没有开启 metrics 时不记录）"""
+        rule_stats = self.last_rule_stats
+        if rule_stats is None:
+            return
+        summary.rule_stats = rule_stats.as_list()
+        for line in rule_stats.report_lines():
+            self.log_message(line)
+
+    def prune_folders(self, summary):
+        """自底向上删除本次整理中被移空的文件夹，更新扫描索引"""
+        index = self._index
+        with self.metrics.timer("prune"):
+            removed = self._pruner.prune(on_removed=index.remove_dir if index is not None else None)
+        summary.pruned_dirs = removed
+        if removed:
+            self.log_message(f"删除了 {removed} 个已清空的文件夹")
+
+    def _organize(self, root_folder, summary, start_time):
+        # 一次遍历：扫描器最先交出"原图"中的文件，错误分类的文件在其他移动之前修正
+        self.log_message("扫描并整理文件...")
+        files = ScanPipeline(self.create_scanner(root_folder, self._index, correct=True))
+        return self._move_files(root_folder, files, summary, start_time)
+
+    def _organize_journaled(self, root_folder, summary, start_time):
+        journal = self._journal
+        state = journal.load()
+        resume = None
+        if state is not None and state.unfinished:
+            summary = self._resume(root_folder, state, summary, start_time)
+            if not state.partial or summary.cancelled:
+                return summary
+            # 上次在扫描中途取消：计划中的移动已经完成，跳过已经处理完的文件夹继续扫描
+            self.log_message("上次整理在扫描中途取消，继续扫描剩余的文件...")
+            resume = state.done
+
+        # 第一步：生成完整的移动计划并写入日志（落盘后才开始移动）
+        self.log_message("第一步：生成移动计划...")
+        journal.begin()
+        progress = self._progress = PlanProgress(resume)
+
+        def written(tasks):
+            # write_plan() 写入一个任务后才取下一个：文件已经记入计划
+            for task in tasks:
+                yield task
+                progress.handled(task.entry)
+
+        try:
+            with self.metrics.timer("plan"):
+                total = journal.write_plan(written(self.control.gate(self.iter_plan(root_folder))))
+        finally:
+            self._progress = None
+        self._plan_names = self._name_index
+        summary.scan_stats = self.last_scan_stats
+        summary.dedupe_stats = self.last_dedupe_stats
+        self.report_rule_stats(summary)
+        if total:
+            journal.publish()
+        else:
+            # 没有需要移动的文件：保留上一次整理的日志，仍然可以撤销
+            journal.discard()
+        if self.control.cancelled:
+            # 已经计划的移动留在日志中，下次整理先完成它们，再扫描没有处理完的文件夹
+            if total:
+                journal.mark_partial(progress.finished())
+            summary.cancelled = True
+            self.log_message(f"整理已取消：已计划 {total} 个移动，下次整理时继续")
+            self.listener.status(summary.status_text())
+            summary.elapsed = time.perf_counter() - start_time
+            return summary
+        if not total:
+            self.log_message("未找到任何需要处理的文件")
+            self.listener.status("完成")
+            summary.elapsed = time.perf_counter() - start_time
+            return summary
+
+        # 第二步：按日志中的计划移动（从文件中逐条读回，不在内存中保存整个计划）
+        self.log_message(f"第二步：移动 {total} 个文件...")
+        self.execute_plan(root_folder, journal.iter_tasks(journal.load()), total=total, summary=summary)
+        if not summary.cancelled:
+            journal.end()
+        summary.elapsed = time.perf_counter() - start_time
+        return summary
+
+    def _resume(self, root_folder, state, summary, start_time):
+        """继续执行日志中中途停止的整理，不重新扫描"""
+        journal = self._journal
+        journal.reopen(state)
+        self.log_message(f"发现未完成的整理：计划 {state.planned} 个移动，还剩 {state.remaining} 个，继续执行")
+
+        def pending_tasks():
+            done_before = 0
+            for task in journal.iter_tasks(state):
+                if os.path.lexists(task.entry.path):
+                    yield task
+                elif os.path.lexists(task.target_path):
+                    # 退出前已经移动，只是提交记录没有落盘
+                    journal.commit(task)
+                    done_before += 1
+                else:
+                    journal.fail(task, "源文件不存在")
+                    self.log_message(f"源文件不存在，跳过: {task.entry.path}")
+            if done_before:
+                self.log_message(f"{done_before} 个文件在中断前已经移动")
+
+        self.execute_plan(root_folder, pending_tasks(), total=state.remaining, summary=summary)
+        if not summary.cancelled:
+            journal.end()
+        summary.elapsed = time.perf_counter() - start_time
+        return summary
+
+    def undo_last_run(self, root_folder):
+        """按移动日志把上一次整理移动过的文件按相反顺序移回原处
+
+        原位置已有同名文件、或文件已不在整理后的位置时跳过。整理时创建的分类文件夹不会删除。
+
+        Returns:
+            RunSummary: processed_count 为移回原处的文件数
+        """
+        listener = self.listener
+        summary = RunSummary()
+        start_time = time.perf_counter()
+        journal = MoveJournal(root_folder)
+        state = journal.load()
+        if state is None or state.planned is None:
+            self.log_message("没有可以撤销的整理记录")
+            return summary
+        if state.undone:
+            self.log_message("上一次整理已经撤销过了")
+            return summary
+
+        listener.status("正在撤销上一次整理...")
+        moves = list(journal.iter_tasks(state, include_done=True))
+        mover = self.move_func if self.move_func is not None else FileMover()
+        journal.reopen(state)
+        try:
+            for done, task in enumerate(reversed(moves), 1):
+                src, dst = task.entry.path, task.target_path
+                listener.progress(done / len(moves) * 100)
+                # 没有提交记录的移动只有在确实已经完成时才撤销
+                if task.seq not in state.committed and (os.path.lexists(src) or not os.path.lexists(dst)):
+                    continue
+                if not os.path.lexists(dst):
+                    self.log_message(f"文件已不在整理后的位置，跳过: {os.path.relpath(dst, root_folder)}")
+                    continue
+                if os.path.lexists(src):
+                    self.log_message(f"原位置已有同名文件，跳过: {os.path.relpath(src, root_folder)}")
+                    continue
+                try:
+                    os.makedirs(task.entry.folder, exist_ok=True)
+                    mover(dst, src)
+                except Exception as e:
+                    self.log_message(f"撤销移动 {task.final_name} 时出错: {str(e)}")
+                    summary.error_count += 1
+                    continue
+                self.log_message(f"撤销: {os.path.relpath(dst, root_folder)} -> {os.path.relpath(src, root_folder)}")
+                summary.processed_count += 1
+            journal.mark_undone()
+        finally:
+            journal.close()
+
+        summary.elapsed = time.perf_counter() - start_time
+        listener.progress(100)
+        listener.status(f"撤销完成，共移回 {summary.processed_count} 个文件")
+        self.log_message(f"撤销完成，共移回 {summary.processed_count} 个文件")
+        return summary
+
+    def organize_paths(self, root_folder, paths):
+        """只整理给定的文件（监视模式使用），不扫描整棵树，也不修正已分类的文件
+
+        位于根分类文件夹中的文件、不存在的文件，以及已在根目录中且规则要求留在根目录的
+        文件（通常是刚被移入根目录的Excel文件）会被直接忽略，不输出日志。
+
+        Returns:
+            RunSummary: 本次整理的结果汇总
+        """
+        summary = RunSummary()
+        start_time = time.perf_counter()
+        scanner = self.create_scanner(root_folder)
+        entries = []
+        for entry in map(scanner.entry_for_path, paths):
+            if entry is None or (entry.depth == 0 and self.rules.route(entry).to_root):
+                continue
+            entries.append(entry)
+        if not entries:
+            return summary
+
+        self.listener.status("正在处理新文件...")
+        self._ready_folders = set()
+        self.control.reset()
+        self._begin_metrics()
+        summary = self._move_files(root_folder, EntryBatches(entries), summary, start_time)
+        self.record_metrics(summary)
+        return summary
+
+    def iter_plan(self, root_folder):
+        """逐个产出完整移动计划中的 MoveTask，不修改任何文件
+
+        先是"原图"中错误分类文件的修正，然后是扫描得到的Excel文件和其他文件的移动，
+        两者来自同一次遍历；目标文件名与实际整理时相同（已避开重名）。
+        """
+        self._dry_run = True
+        self._ready_folders = set()
+        self._name_index = NameIndex()
+        self.last_rule_stats = RuleStats(self.rules) if self.collect_metrics else None
+        self.last_dedupe_stats = None
+        try:
+            files = ScanPipeline(self.create_scanner(root_folder, self._index, correct=True))
+            tasks = self.iter_move_tasks(root_folder, files, RunSummary())
+            if self.dedupe is not None:
+                tasks = self.dedupe_tasks(tasks)
+            yield from tasks
+        finally:
+            self._dry_run = False
+
+    def plan_files(self, root_folder):
+        """计算完整的移动计划，不修改任何文件
+
+        Returns:
+            MovePlan: 可以保存为 JSONL，或交给 execute_plan() 执行
+        """
+        self.listener.status("正在生成移动计划...")
+        plan = MovePlan(root_folder, self.iter_plan(root_folder))
+        self.log_message(plan.summary())
+        self.listener.status(plan.summary())
+        return plan
+
+    def execute_plan(self, root_folder, tasks, total=None, summary=None):
+        """执行移动计划（plan_files() 的结果，或 read_plan() 读入的任务）
+
+        修正任务全部完成后才开始其他移动（见 MoveExecutor.run）。生成计划之后
+        目标位置出现了同名文件时改用新的文件名，不会覆盖。
+
+        Args:
+            root_folder: 根文件夹路径
+            tasks: MoveTask 的列表或迭代器，修正任务在前
+            total: 任务总数（用于进度条），默认为 len(tasks)
+            summary: 累加结果的 RunSummary，默认新建
+
+        Returns:
+            RunSummary: 本次整理的结果汇总
+        """
+        listener = self.listener
+        if summary is None:
+            # 单独执行计划；在 organize_files() 中调用时沿用其 Metrics
+            summary = RunSummary()
+            self.control.reset()
+            self._begin_metrics()
+        start_time = time.perf_counter()
+        listener.status("正在执行移动计划...")
+        listener.progress(0)
+
+        self._ready_folders = set()
+        self._name_index = NameIndex()
+        if total is None and hasattr(tasks, "__len__"):
+            total = len(tasks)
+        mover = self.move_func if self.move_func is not None else FileMover(count_bytes=self.metrics.enabled)
+        journal = self._journal
+
+        def record(result):
+            if journal is not None:
+                if result.ok:
+                    journal.commit(result.task)
+                else:
+                    journal.fail(result.task, result.error)
+            if not self.report_move_result(result):
+                summary.error_count += 1
+            elif result.task.is_correction:
+                summary.corrected_count += 1
+            else:
+                summary.processed_count += 1
+            listener.status(f"正在处理: {result.task.entry.name}")
+            if total:
+                listener.progress((summary.total_processed + summary.error_count) / total * 100)
+
+        executor = MoveExecutor(self.workers, mover, metrics=self._executor_metrics())
+        # 取消时不再开始新的移动，已经开始的移动完成后照常记录
+        tasks = self.control.gate(tasks)
+        for result in executor.run(self.prepare_planned_task(root_folder, task) for task in tasks):
+            record(result)
+        summary.cancelled = self.control.cancelled
+
+        if isinstance(mover, FileMover):
+            summary.transfer_stats = mover.stats
+            self.log_message(mover.stats.summary())
+            if summary.dedupe_stats is not None and self.dedupe == "hardlink":
+                summary.dedupe_stats.bytes_saved = mover.stats.bytes_linked
+        if journal is not None:
+            journal.sync()
+            summary.journal_stats = journal.stats()
+            moves = summary.total_processed + summary.error_count
+            if moves:
+                self.log_message(f"移动日志 {journal.records} 条记录，fsync {journal.syncs} 次，"
+                                 f"平均每次移动 {journal.elapsed / moves * 1e6:.0f} 微秒")
+        summary.elapsed = time.perf_counter() - start_time
+        self.record_metrics(summary)
+        self.log_finished(summary)
+        return summary
+
+    def log_finished(self, summary):
+        if summary.cancelled:
+            self.listener.status(summary.status_text())
+            if self._journal is not None:
+                self.log_message(f"整理已取消，已处理 {summary.total_processed} 个文件，下次整理时从中断处继续")
+            else:
+                self.log_message(f"整理已取消，已处理 {summary.total_processed} 个文件")
+            return
+        self.listener.progress(100)
+        self.listener.status(summary.status_text())
+        self.log_message(f"文件整理完成，共处理 {summary.total_processed} 个文件")
+
+    def prepare_planned_task(self, root_folder, task):
+        """执行计划中的任务前创建目标文件夹，并确认目标文件名仍未被占用"""
+        target_folder = os.path.dirname(task.target_path)
+        if target_folder != root_folder:
+            self.ensure_target_folder(root_folder, task.target_folder_name)
+        if task.final_name not in self._name_index.folder(target_folder):
+            self._name_index.reserve(target_folder, task.final_name)
+            return task
+        # 从原文件名重新编号，而不是在计划的文件名后再加编号
+        final_name = self._name_index.reserve(target_folder, task.entry.name)
+        self.log_message(f"文件重命名: {task.final_name} -> {final_name} (计划生成后目标位置出现了同名文件)")
+        task = MoveTask(task.entry, task.target_folder_name, os.path.join(target_folder, final_name), final_name,
+                        is_excel=task.is_excel, is_correction=task.is_correction, seq=task.seq,
+                        duplicate_of=task.duplicate_of)
+        if self._journal is not None:
+            # 新的目标位置先写入日志，撤销时才能找到文件
+            self._journal.amend(task)
+        return task
+
+    def _move_files(self, root_folder, files, summary, start_time):
+        listener = self.listener
+
+        # 目标文件名在本线程中依次确定，线程池只执行移动
+        self._name_index = NameIndex()
+        self.last_rule_stats = RuleStats(self.rules) if self.collect_metrics else None
+        mover = self.move_func if self.move_func is not None else FileMover(count_bytes=self.metrics.enabled)
+        executor = MoveExecutor(self.workers, mover, metrics=self._executor_metrics())
+        tasks = self.iter_move_tasks(root_folder, files, summary)
+        self.last_dedupe_stats = None
+        if self.dedupe is not None:
+            tasks = self.dedupe_tasks(tasks)
+        tasks = self.control.gate(tasks)
+
+        done = 0
+        for result in executor.run(tasks):
+            done += 1
+            listener.status(f"正在处理: {result.task.entry.name}")
+            # 扫描结束前文件总数未知，只有扫描结束后才更新进度条
+            if files.finished:
+                listener.progress(done / files.discovered * 100)
+            if not self.report_move_result(result):
+                summary.error_count += 1
+            elif result.task.is_correction:
+                summary.corrected_count += 1
+            else:
+                summary.processed_count += 1
+
+        summary.scan_stats = self.last_scan_stats
+        summary.cancelled = self.control.cancelled
+        if summary.corrected_count:
+            self.log_message(f"修正了 {summary.corrected_count} 个错误分类的文件")
+        summary.dedupe_stats = self.last_dedupe_stats
+
+        if not files.discovered and not summary.cancelled:
+            self.log_message("未找到任何需要处理的文件")
+            listener.status("完成")
+            summary.elapsed = time.perf_counter() - start_time
+            return summary
+
+        if isinstance(mover, FileMover):
+            summary.transfer_stats = mover.stats
+            self.log_message(mover.stats.summary())
+            if summary.dedupe_stats is not None and self.dedupe == "hardlink":
+                summary.dedupe_stats.bytes_saved = mover.stats.bytes_linked
+        self.report_rule_stats(summary)
+        summary.elapsed = time.perf_counter() - start_time
+        self.log_finished(summary)
+        return summary
+
+    def iter_move_tasks(self, root_folder, files, summary):
+        """边扫描边按规则生成移动任务
+
+        根文件夹"原图"中的文件（扫描器最先交出）只检查是否放错了分类文件夹，见 plan_correction()。
+        excel_first 为 True 时先生成全部移动到根目录（Excel）的任务，其他文件暂存到
+        扫描结束后再生成；暂存的文件保存在 FileRecords 中（每个文件只保存文件夹编号、
+        文件名和规则序号），但内存占用仍随文件数增长。
+        """
+        rules = self.rules
+        rule_stats = self.last_rule_stats
+        deferred = None
+        if self.excel_first:
+            deferred = FileRecords(self.last_scan_stats)
+            rule_list = rules.rules + [rules.default_rule]
+            rule_numbers = {id(rule): number for number, rule in enumerate(rule_list)}
+        root_count = other_count = 0
+        correction_count = in_place_count = 0
+        started = False
+
+        for batch in files.batches():
+            if not started:
+                # 在根文件夹中创建分类文件夹（如果不存在）
+                self.ensure_classification_folders(root_folder)
+                started = True
+
+            # 每批文件名只调用一次分类器，之后逐个路由时直接命中缓存
+            rules.prepare_batch([entry.name for entry in batch])
+            for entry in batch:
+                if entry.depth == 1 and entry.rel_dir == ORIGINAL_FOLDER:
+                    task = self.plan_correction(entry, root_folder)
+                    if task is None:
+                        in_place_count += 1
+                        if self._progress is not None:
+                            self._progress.handled(entry)
+                    else:
+                        correction_count += 1
+                        yield task
+                    continue
+                ext = os.path.splitext(entry.name)[1].lower()
+                rule = rules.route(entry, ext, rule_stats)
+                if self._index is not None:
+                    self._index.record_target(entry, rule.target)
+                if rule.to_root:
+                    if entry.folder == root_folder:
+                        # 已经在根目录中，无需移动
+                        self.log_message(f"文件已在正确位置: {entry.name}")
+                        if self._progress is not None:
+                            self._progress.handled(entry)
+                        continue
+                    root_count += 1
+                    if ext in EXCEL_EXTENSIONS:
+                        yield self.plan_excel_move(entry, root_folder)
+                    else:
+                        yield self.plan_move(entry, "根目录", root_folder)
+                    continue
+
+                other_count += 1
+                if deferred is not None:
+                    deferred.append(entry, rule_numbers[id(rule)])
+                else:
+                    yield self.plan_rule_move(entry, rule, root_folder)
+
+        self.log_message(self.last_scan_stats.summary())
+        if correction_count + in_place_count:
+            self.log_message(f"原图中 {in_place_count} 个文件已在正确位置，{correction_count} 个需要修正")
+        if root_count + other_count:
+            self.log_message(f"找到 {root_count + other_count} 个需要处理的文件")
+            self.log_message(f"发现 {root_count} 个Excel文件，{other_count} 个其他文件")
+
+        if deferred:
+            # 处理其他文件
+            self.log_message("开始处理其他文件...")
+            for entry, number in deferred.items():
+                yield self.plan_rule_move(entry, rule_list[number], root_folder)
+
+    def dedupe_tasks(self, tasks):
+        """找出需要重命名的文件中与目标位置的同名文件内容相同的文件，按 dedupe 处理
+
+        同一目标文件夹中原文件名相同的文件（目标文件夹中原有的文件和本次移入的文件）互相比较，
+        见 organizer.dedupe。tasks 会被完整读入内存，返回处理后的任务列表。
+        """
+        tasks = list(tasks)
+        groups = {}
+        # 有文件需要重命名的组（dict 保持插入顺序）
+        renamed_keys = {}
+        for task in tasks:
+            if task.is_correction:
+                continue
+            key = (os.path.dirname(task.target_path), os.path.normcase(task.entry.name))
+            groups.setdefault(key, []).append(task)
+            if task.renamed:
+                renamed_keys[key] = None
+        if not renamed_keys:
+            return tasks
+
+        candidate_groups = []
+        for key in renamed_keys:
+            members = []
+            group = groups[key]
+            if group[0].renamed:
+                # 原文件名被目标文件夹中原有的文件占用
+                existing = os.path.join(key[0], group[0].entry.name)
+                try:
+                    members.append(Candidate(existing, os.stat(existing).st_size))
+                except OSError:
+                    pass
+            for task in group:
+                try:
+                    members.append(Candidate(task.entry.path, task.entry.stat().st_size, task))
+                except OSError:
+                    continue
+            candidate_groups.append(members)
+
+        deduplicator = Deduplicator()
+        stats = deduplicator.stats
+        self.listener.status("正在比较同名文件的内容...")
+        skipped = set()
+        for identical in deduplicator.find_identical(candidate_groups):
+            # 目标文件夹中原有的文件、或最先分配到文件名的文件作为保留的副本
+            reference = identical[0]
+            if reference.payload is None:
+                references = (reference.path,)
+            else:
+                references = (reference.payload.target_path, reference.path)
+            for candidate in identical[1:]:
+                task = candidate.payload
+                stats.duplicates += 1
+                stats.duplicate_bytes += candidate.size
+                self.log_message(f"重复文件（{DEDUPE_POLICY_NAMES[self.dedupe]}）: {task.entry.rel_folder}/{task.entry.name} "
+                                 f"与 {task.target_folder_name}/{os.path.basename(references[0])} 内容相同")
+                if self.dedupe == "skip":
+                    skipped.add(id(task))
+                    stats.bytes_saved += candidate.size
+                elif self.dedupe == "hardlink":
+                    # 实际节省的空间在移动完成后按成功创建的硬链接统计
+                    task.duplicate_of = references
+
+        self.last_dedupe_stats = stats
+        self.log_message(stats.summary())
+        if skipped:
+            tasks = [task for task in tasks if id(task) not in skipped]
+        return tasks
+
+    def ensure_classification_folders(self, root_folder):
+        """在根文件夹中创建"原图"和"处理图"文件夹（如果不存在）"""
+        for folder_name in CLASSIFICATION_FOLDERS:
+            self.ensure_target_folder(root_folder, folder_name)
+
+    def ensure_target_folder(self, root_folder, folder_name):
+        """确保根文件夹下的目标文件夹存在，返回其路径；每个文件夹每次整理只检查一次"""
+        folder_path = os.path.join(root_folder, folder_name)
+        if folder_path in self._ready_folders or self._dry_run:
+            return folder_path
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+            self.log_message(f"在根文件夹中创建: {folder_name}/")
+            if self._index is not None:
+                self._index.add_subdir("", folder_name)
+        else:
+            self.log_message(f"根文件夹中已存在: {folder_name}/")
+        if self._index is not None:
+            # 文件将被移入，整理结束时需要更新其修改时间
+            self._index.touch(folder_name)
+        self._ready_folders.add(folder_path)
+        return folder_path
+
+    def plan_rule_move(self, entry, rule, root_folder):
+        """把文件移动到规则指定的分类文件夹"""
+        return self.plan_move(entry, rule.target, self.ensure_target_folder(root_folder, rule.target))
+
+    def plan_excel_move(self, entry, root_folder):
+        """为Excel文件确定根目录中的目标文件名"""
+        filename = entry.name
+        self.log_message(f"🔍 发现Excel文件: {filename} (来自: {entry.rel_folder})")
+        self.log_message(f"📁 文件路径: {entry.path}")
+
+        # 检查目标文件是否已存在，如果存在则重命名
+        target_file_path, final_filename = self.generate_unique_filename(root_folder, filename)
+        if final_filename != filename:
+            self.log_message(f"Excel文件重命名: {filename} -> {final_filename} (避免覆盖根目录中的同名文件)")
+        else:
+            self.log_message(f"Excel文件 {filename} 将直接移动到根目录")
+        return MoveTask(entry, "根目录", target_file_path, final_filename, is_excel=True)
+
+    def plan_move(self, entry, target_folder_name, target_folder_path):
+        """为文件确定分类文件夹中的目标文件名"""
+        filename = entry.name
+        # 检查目标文件是否已存在，如果存在则重命名
+        target_file_path, final_filename = self.generate_unique_filename(target_folder_path, filename)
+        if final_filename != filename:
+            self.log_message(f"文件重命名: {filename} -> {final_filename} (避免覆盖同名文件)")
+        return MoveTask(entry, target_folder_name, target_file_path, final_filename)
+
+    def report_move_result(self, result):
+        """记录一次移动的结果，成功返回 True"""
+        task = result.task
+        entry = task.entry
+        if task.is_excel:
+            if not result.ok:
+                self.log_message(f"❌ 移动Excel文件失败: {entry.name}, 错误: {str(result.error)}")
+            elif task.renamed:
+                self.log_message(f"✅ 成功移动Excel文件: {entry.name} -> 根目录/{task.final_name} (来自: {entry.rel_folder})")
+            else:
+                self.log_message(f"✅ 成功移动Excel文件: {entry.name} -> 根目录 (来自: {entry.rel_folder})")
+        elif task.is_correction:
+            if result.ok:
+                self.log_message(f"修正文件分类: {entry.name} -> {task.target_folder_name}/")
+            else:
+                self.log_message(f"修正文件 {entry.name} 时出错: {str(result.error)}")
+        elif not result.ok:
+            self.log_message(f"处理文件 {entry.name} 时出错: {str(result.error)}")
+        else:
+            self.log_message(f"移动文件: {entry.name} -> {task.target_folder_name}/ (来自: {entry.rel_folder})")
+        if result.ok:
+            # 源文件已移走，如果源文件夹也是目标文件夹（例如根目录），释放其文件名
+            self._name_index.release(entry.folder, entry.name)
+            if self._pruner is not None:
+                self._pruner.moved(entry.rel_dir)
+            if self._index is not None:
+                self._index.file_moved(entry)
+                if task.target_folder_name == "根目录":
+                    self._index.touch("")
+        return result.ok
+
+    def generate_unique_filename(self, target_folder, filename):
+        """生成唯一的文件名，避免覆盖同名文件
+
+        目标文件夹中已有的文件名在第一次用到时读入 NameIndex，
+        本次整理中已分配给其他文件的文件名也视为已占用。
+
+        Args:
+            target_folder: 目标文件夹路径
+            filename: 原始文件名
+
+        Returns:
+            tuple: (完整的目标文件路径, 最终文件名)
+        """
+        final_filename = self._name_index.reserve(target_folder, filename)
+        return os.path.join(target_folder, final_filename), final_filename
+
+    def create_scanner(self, root_folder, index=None, correct=False):
+        """创建扫描器，扫描中的事件写入日志；规则中的所有目标文件夹都视为分类文件夹
+
+        correct 为 True 时扫描器同时交出根文件夹"原图"中的文件，用于修正错误分类的文件。
+        """
+        if self.scan_concurrency:
+            from .async_scan import AsyncScanner
+            scanner_class, options = AsyncScanner, {"concurrency": self.scan_concurrency}
+        elif self.scan_workers > 1:
+            from .parallel_scan import ParallelScanner
+            scanner_class, options = ParallelScanner, {"workers": self.scan_workers}
+        else:
+            scanner_class, options = Scanner, {}
+        scanner = scanner_class(
+            root_folder,
+            classification_folders=self.rules.target_folders,
+            index=index,
+            correction_folder=ORIGINAL_FOLDER if correct else None,
+            on_skip=lambda rel_dir, count: self.log_message(f"跳过已分类文件夹 {rel_dir or os.curdir} 中的 {count} 个文件"),
+            on_classification_folder=lambda rel_dir: self.log_message(f"发现分类文件夹: {rel_dir}"),
+            on_error=lambda folder, e: self.log_message(f"检查文件夹 {folder} 时出错: {str(e)}"),
+            on_folder=self._pruner.listed if self._pruner is not None else None,
+            on_listing=self._progress.listed if self._progress is not None else None,
+            resume=self._progress.resume if self._progress is not None else None,
+            **options,
+        )
+        self.last_scan_stats = scanner.stats
+        return scanner
+
+    def get_all_files_to_process(self, root_folder):
+        """获取所有需要处理的文件，收集到根文件夹的分类文件夹中
+
+        Returns:
+            FileRecords: 逐个产出 ScanEntry（可按 (文件路径, 文件名, 源文件夹) 解包）；
+            用 partition(is_excel_file) 可以得到Excel文件和其他文件的下标视图
+        """
+        scanner = self.create_scanner(root_folder)
+        all_files = FileRecords(scanner.stats)
+        for entry in scanner.scan():
+            if is_excel_file(entry.name):
+                self.log_message(f"📊 收集Excel文件: {entry.name} (来自: {entry.rel_folder})")
+            all_files.append(entry)
+
+        self.log_message(f"总共收集到 {len(all_files)} 个文件需要处理")
+        self.log_message(scanner.stats.summary())
+        return all_files
+
+    def is_file_in_root_classification_folders(self, file_path, root_folder):
+        """检查文件是否已经在根文件夹的分类文件夹中（只比较路径字符串，不访问磁盘）"""
+        parent_folder = os.path.dirname(file_path)
+
+        # 如果父文件夹就是根文件夹，检查根文件夹本身是否是分类文件夹
+        if parent_folder == root_folder:
+            return os.path.basename(parent_folder) in CLASSIFICATION_FOLDERS
+
+        # 文件直接位于根文件夹的分类文件夹中；嵌套更深的分类文件夹中的文件仍需处理
+        return (os.path.dirname(parent_folder) == root_folder
+                and os.path.basename(parent_folder) in CLASSIFICATION_FOLDERS)
+
+    def is_classification_folder(self, folder_path):
+        """检查文件夹是否已经是分类文件夹（包含"原图"或"处理图"文件夹）"""
+        if not os.path.exists(folder_path):
+            return False
+
+        try:
+            items = os.listdir(folder_path)
+            # 检查是否包含分类文件夹
+            has_original = ORIGINAL_FOLDER in items and os.path.isdir(os.path.join(folder_path, ORIGINAL_FOLDER))
+            has_modified = MODIFIED_FOLDER in items and os.path.isdir(os.path.join(folder_path, MODIFIED_FOLDER))
+
+            # 如果包含任何一个分类文件夹，就认为是分类文件夹
+            if has_original or has_modified:
+                return True
+
+            # 额外检查：如果文件夹名称本身就是"原图"或"处理图"，也认为是分类文件夹
+            folder_name = os.path.basename(folder_path)
+            if folder_name in CLASSIFICATION_FOLDERS:
+                return True
+
+            return False
+
+        except Exception:
+            return False
+
+    def plan_correction(self, entry, root_folder):
+        """为"原图"中的文件生成修正任务；文件已在正确位置、或无法修正时返回 None
+
+        按规则应放到其他分类文件夹的文件移过去，不重命名；目标文件夹中已有同名文件时跳过。
+        目标文件名记入 NameIndex，并从"原图"中释放，之后的移动可以使用腾出的文件名。
+        """
+        filename = entry.name
+        try:
+            rule = self.rules.route_among_folders(entry)
+        except Exception as e:
+            self.log_message(f"修正文件 {filename} 时出错: {str(e)}")
+            return None
+
+        if rule.target == ORIGINAL_FOLDER:
+            # 这个文件已经在正确的"原图"文件夹中，无需移动
+            return None
+
+        target_folder_path = os.path.join(root_folder, rule.target)
+        if filename in self._name_index.folder(target_folder_path):
+            self.log_message(f"目标文件已存在，跳过: {filename}")
+            return None
+        if not self._dry_run:
+            self.ensure_target_folder(root_folder, rule.target)
+            if self._index is not None:
+                self._index.touch(ORIGINAL_FOLDER)
+        self._name_index.reserve(target_folder_path, filename)
+        self._name_index.release(entry.folder, filename)
+        return MoveTask(entry, rule.target, os.path.join(target_folder_path, filename), filename,
+                        is_correction=True)
+
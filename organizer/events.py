@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+工作线程与界面线程之间的事件通道
+
+工作线程只做一次 deque.append（日志）或一次属性赋值（状态、进度），
+界面线程按固定帧率调用 drain() 批量取出：日志按批追加，
+状态和进度只保留最新值。deque 的 append/popleft 本身是线程安全的，无需加锁。
+"""
+
+from collections import deque
+
+from .engine import EngineListener
+
+# 表示"自上次取出后没有新值"
+_UNSET = object()
+
+
+class EventBatch:
+    """一次 drain() 取出的事件"""
+
+    __slots__ = ("logs", "status", "progress", "calls")
+
+    def __init__(self, logs, status, progress, calls):
+        self.logs = logs
+        self.status = status
+        self.progress = progress
+        self.calls = calls
+
+    @property
+    def has_status(self):
+        return self.status is not _UNSET
+
+    @property
+    def has_progress(self):
+        return self.progress is not _UNSET
+
+    def __bool__(self):
+        return bool(self.logs or self.calls or self.has_status or self.has_progress)
+
+
+class EventChannel(EngineListener):
+    """把引擎事件合并后交给界面线程的监听器
+
+    Args:
+        max_batch: 每次 drain() 最多取出的日志行数，防止单帧阻塞界面过久
+    """
+
+    def __init__(self, max_batch=2000):
+        self.max_batch = max_batch
+        self._logs = deque()
+        self._calls = deque()
+        self._status = _UNSET
+        self._progress = _UNSET
+        # 以下两个属性只在界面线程中读写，用对象标识判断是否有新值
+        self._seen_status = _UNSET
+        self._seen_progress = _UNSET
+
+    def log(self, message):
+        self._logs.append(message)
+
+    def status(self, text):
+        self._status = text
+
+    def progress(self, percent):
+        self._progress = percent
+
+    def call(self, func, *args):
+        """请求在界面线程中执行 func(*args)，例如重新启用按钮"""
+        self._calls.append((func, args))
+
+    def pending(self):
+        """是否还有未取出的日志或调用"""
+        return bool(self._logs or self._calls)
+
+    def drain(self):
+        """取出自上次调用以来的事件（只能在界面线程中调用）"""
+        logs = []
+        popleft = self._logs.popleft
+        try:
+            for _ in range(self.max_batch):
+                logs.append(popleft())
+        except IndexError:
+            pass
+
+        calls = []
+        while self._calls:
+            calls.append(self._calls.popleft())
+
+        # 工作线程只写 _status/_progress，界面线程只写 _seen_*，因此不会丢失最后一次更新
+        status = self._status
+        if status is self._seen_status:
+            status = _UNSET
+        else:
+            self._seen_status = status
+        progress = self._progress
+        if progress is self._seen_progress:
+            progress = _UNSET
+        else:
+            self._seen_progress = progress
+        return EventBatch(logs, status, progress, calls)
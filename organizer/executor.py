@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+并行移动执行器
+
+目标文件名在提交任务的线程中依次确定（见 OrganizerEngine.generate_unique_filename），
+线程池只负责执行移动，因此多个线程不会选中同一个目标文件名。
+同时在途的任务数有上限，任务可以边生成边提交，内存占用不随文件数增长。
+"""
+
+import shutil
+import time
+
+from .metrics import task_phase
+
+
+class MoveTask:
+    """一次文件移动
+
+    Args:
+        entry: 源文件的 ScanEntry
+        target_folder_name: 目标文件夹名称（用于日志，如"原图"、"根目录"）
+        target_path: 完整的目标文件路径
+        final_name: 最终文件名（发生重名时与源文件名不同）
+        is_excel: 是否是移动到根目录的Excel文件
+        is_correction: 是否是修正"原图"中错误分类的文件
+        seq: 在移动日志中的序号（没有使用日志时为 None）
+        duplicate_of: 内容与源文件相同的文件路径（元组，按顺序尝试）；设置时用指向它的硬链接
+            代替移动，见 organizer.dedupe
+    """
+
+    __slots__ = ("entry", "target_folder_name", "target_path", "final_name", "is_excel", "is_correction", "seq",
+                 "duplicate_of")
+
+    def __init__(self, entry, target_folder_name, target_path, final_name, is_excel=False, is_correction=False,
+                 seq=None, duplicate_of=None):
+        self.entry = entry
+        self.target_folder_name = target_folder_name
+        self.target_path = target_path
+        self.final_name = final_name
+        self.is_excel = is_excel
+        self.is_correction = is_correction
+        self.seq = seq
+        self.duplicate_of = duplicate_of
+
+    @property
+    def renamed(self):
+        return self.final_name != self.entry.name
+
+
+class MoveResult:
+    """一次文件移动的结果，error 为 None 表示成功"""
+
+    __slots__ = ("task", "error")
+
+    def __init__(self, task, error=None):
+        self.task = task
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class MoveExecutor:
+    """用有界线程池执行移动任务
+
+    Args:
+        workers: 工作线程数，1 表示在当前线程中依次执行
+        move_func: 执行移动的函数 move_func(源路径, 目标路径)，默认 shutil.move
+            （OrganizerEngine 默认传入 FileMover）
+        max_pending: 同时在途的最大任务数，默认为工作线程数的 4 倍
+        metrics: organizer.metrics.Metrics 实例，记录每次移动的耗时；None 表示不计时
+    """
+
+    def __init__(self, workers=1, move_func=None, max_pending=None, metrics=None):
+        self.workers = max(1, int(workers))
+        self.move_func = move_func if move_func is not None else shutil.move
+        self.max_pending = max_pending or self.workers * 4
+        self.metrics = metrics
+
+    def execute(self, task):
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter()
+        try:
+            if task.duplicate_of and hasattr(self.move_func, "link"):
+                self.move_func.link(task.entry.path, task.target_path, task.duplicate_of)
+            else:
+                self.move_func(task.entry.path, task.target_path)
+        except Exception as e:
+            result = MoveResult(task, e)
+        else:
+            result = MoveResult(task)
+        if metrics is not None:
+            metrics.add_time(task_phase(task), time.perf_counter() - start)
+        return result
+
+    def run(self, tasks):
+        """执行移动任务，按完成顺序逐个产出 MoveResult
+
+        tasks 可以是生成器，它只会在调用 run() 的线程中被迭代。修正任务会腾出"原图"中的
+        文件名，它之后的第一个普通任务要等已提交的任务全部完成后才提交。
+        """
+        if self.workers == 1:
+            for task in tasks:
+                yield self.execute(task)
+            return
+
+        # concurrent.futures 会连带导入 logging，只在需要线程池时导入，不拖慢启动
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = set()
+            corrections_pending = False
+            for task in tasks:
+                if corrections_pending and not task.is_correction:
+                    corrections_pending = False
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                corrections_pending = corrections_pending or task.is_correction
+                pending.add(pool.submit(self.execute, task))
+                if len(pending) >= self.max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
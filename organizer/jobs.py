@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+多个根文件夹的整理队列
+
+JobQueue 按根文件夹所在的设备（st_dev）分组：不同磁盘上的任务同时进行，同一磁盘上
+最多同时进行 per_device 个任务（机械硬盘上同时整理两个文件夹只会让磁头来回寻道，
+默认 1 个）。一批任务的总耗时接近耗时最长的那块磁盘，而不是所有任务耗时之和。
+
+每个任务使用 make_engine() 新建的 OrganizerEngine（引擎在一次整理中保存名称索引等
+状态，不能同时整理两个文件夹），结果汇总保存在 Job.summary 中。引擎的 control 换成
+队列 control 的下级，暂停或取消队列时正在进行的整理同样暂停或取消。
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from .control import RunControl
+
+# 同一设备上默认同时进行的任务数
+PER_DEVICE = 1
+
+
+def device_of(path):
+    """返回路径所在设备的标识，路径不存在时返回 None"""
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return None
+
+
+def read_roots(lines):
+    """读取根文件夹列表：每行一个路径，忽略空行和以 # 开头的注释行"""
+    roots = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            roots.append(line)
+    return roots
+
+
+class Job:
+    """队列中的一个整理任务"""
+
+    __slots__ = ("root_folder", "device", "summary", "error", "elapsed")
+
+    def __init__(self, root_folder, device):
+        self.root_folder = root_folder
+        self.device = device
+        self.summary = None
+        self.error = None
+        self.elapsed = 0.0
+
+    @property
+    def done(self):
+        return self.summary is not None or self.error is not None
+
+    @property
+    def ok(self):
+        return self.error is None and self.summary is not None and not self.summary.error_count \
+            and not self.summary.cancelled
+
+    def status_text(self):
+        if self.error is not None:
+            return f"失败: {self.error}"
+        if self.summary is None:
+            return "未开始"
+        return self.summary.status_text()
+
+    def as_dict(self):
+        result = {"root": self.root_folder, "ok": self.ok, "elapsed": round(self.elapsed, 3)}
+        if self.error is not None:
+            result["error"] = self.error
+        if self.summary is not None:
+            result["summary"] = self.summary.as_dict()
+        return result
+
+
+class JobQueue:
+    """按设备限制并发、依次整理多个根文件夹
+
+    Args:
+        make_engine: 接受根文件夹、返回新的 OrganizerEngine 的函数
+        per_device: 同一设备上同时进行的任务数
+        max_jobs: 所有设备合计同时进行的任务数上限，默认不限
+        device_of: 把根文件夹映射为设备标识的函数，默认使用 st_dev
+        on_start: 任务开始时调用 on_start(job)（在任务线程中）
+        on_finish: 任务结束时调用 on_finish(job)（在任务线程中）
+    """
+
+    def __init__(self, make_engine, per_device=PER_DEVICE, max_jobs=None, device_of=device_of,
+                 on_start=None, on_finish=None):
+        self.make_engine = make_engine
+        self.per_device = max(1, int(per_device))
+        self.max_jobs = max_jobs
+        self.device_of = device_of
+        self.on_start = on_start
+        self.on_finish = on_finish
+        self.jobs = []
+        self.control = RunControl()
+        self._lock = threading.Lock()
+
+    def add(self, root_folder):
+        root_folder = os.path.abspath(root_folder)
+        job = Job(root_folder, self.device_of(root_folder))
+        self.jobs.append(job)
+        return job
+
+    def run(self):
+        """运行队列中的全部任务，返回按添加顺序排列的 Job 列表"""
+        self.control.reset()
+        queues = {}
+        for job in self.jobs:
+            if job.done:
+                continue
+            if job.device is None:
+                job.error = "文件夹不存在"
+                continue
+            queues.setdefault(job.device, deque()).append(job)
+
+        limit = threading.BoundedSemaphore(self.max_jobs) if self.max_jobs else None
+        threads = []
+        for device, pending in queues.items():
+            for _ in range(min(self.per_device, len(pending))):
+                thread = threading.Thread(target=self._worker, args=(pending, limit),
+                                          name=f"organizer-job-{device}", daemon=True)
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return self.jobs
+
+    def _worker(self, pending, limit):
+        """依次取出同一设备上的任务并运行"""
+        while self.control.wait():
+            if limit is not None:
+                limit.acquire()
+            try:
+                with self._lock:
+                    # 等待其他设备的任务让出名额时可能已经取消
+                    if not pending or self.control.cancelled:
+                        return
+                    job = pending.popleft()
+                self._run_job(job)
+            finally:
+                if limit is not None:
+                    limit.release()
+
+    def _run_job(self, job):
+        start = time.perf_counter()
+        if self.on_start is not None:
+            self.on_start(job)
+        try:
+            engine = self.make_engine(job.root_folder)
+            engine.control = RunControl(parent=self.control)
+            job.summary = engine.organize_files(job.root_folder)
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.elapsed = time.perf_counter() - start
+        if self.on_finish is not None:
+            self.on_finish(job)
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+移动日志（预写日志）
+
+整理开始时先把完整的移动计划逐行写入根文件夹下的 .organizer_journal.jsonl，
+落盘（fsync）之后才开始移动；每次移动完成后追加一条提交记录，提交记录攒够
+SYNC_EVERY 条才 fsync 一次。进程中途退出后，下一次运行直接从日志中取出
+尚未提交的移动继续执行，不需要重新扫描；撤销时按相反顺序把文件移回原处。
+
+计划先写入临时文件 .organizer_journal.jsonl.tmp，计划中至少有一个移动时才替换原来的
+日志：没有需要移动的文件时（例如再次点击"开始整理"），上一次整理的日志原样保留，
+仍然可以撤销。
+
+提交记录没有落盘也不会出错：继续执行时会检查源文件和目标文件是否存在，
+源文件已不在、目标文件存在的移动视为已经完成。
+
+日志格式（每行一个 JSON 对象，路径相对于根文件夹）：
+
+    {"run":1700000000000,"root":"/data/照片"}                      开始
+    {"i":1,"op":"move","src":"批次1/a.jpg","dst":"原图/a.jpg"}      计划的移动
+    {"planned":1}                                                   计划已全部写入
+    {"done":"批次1","sub":["a"]}                                    扫描中途取消时已经处理完的文件夹及其子文件夹
+    {"partial":1}                                                   计划在扫描中途取消，只包含已扫描到的文件
+    {"c":1}                                                         移动完成
+    {"e":1,"error":"..."}                                          移动失败
+    {"end":1700000000000}                                           整理结束
+    {"undone":1700000000000}                                        已撤销
+
+计划写入之后出现的 "i" 记录是对原计划的修改（执行时目标文件名已被占用，改用了新名字）。
+
+在扫描中途取消时，文件已经全部写入计划（或不需要移动）的文件夹记为 "done"；下次整理
+完成计划中的移动后继续扫描，这些文件夹不再列出，只从记录的子文件夹继续，见 PlanProgress。
+此后才放入这些文件夹的文件留到再下一次整理。
+"""
+
+import json
+import os
+import time
+
+from .plan import task_from_record, task_record
+from .scanner import INTERNAL_PREFIX
+
+JOURNAL_FILENAME = INTERNAL_PREFIX + "_journal.jsonl"
+
+# 每追加这么多条提交记录 fsync 一次
+SYNC_EVERY = 256
+
+_SEPARATORS = (",", ":")
+
+
+class JournalState:
+    """从日志文件中读出的上一次整理的状态"""
+
+    __slots__ = ("run_id", "root_folder", "planned", "partial", "done", "ended", "undone", "committed", "failed",
+                 "amended")
+
+    def __init__(self, run_id, root_folder):
+        self.run_id = run_id
+        self.root_folder = root_folder
+        # 计划中的移动数，计划没有写完时为 None
+        self.planned = None
+        # 计划在扫描中途取消：完成计划中的移动后还需要重新扫描
+        self.partial = False
+        # 扫描中途取消时已经处理完的文件夹：相对路径 -> 子文件夹名称列表
+        self.done = {}
+        self.ended = False
+        self.undone = False
+        self.committed = set()
+        self.failed = set()
+        # 序号 -> 修改后的计划记录
+        self.amended = {}
+
+    @property
+    def unfinished(self):
+        """计划已经写完但整理没有结束（进程中途退出）"""
+        return self.planned is not None and not self.ended and not self.undone
+
+    @property
+    def remaining(self):
+        return self.planned - len(self.committed) - len(self.failed)
+
+
+class PlanProgress:
+    """记录生成计划时哪些文件夹中的文件已经全部写入计划（或不需要移动）
+
+    扫描线程列出文件夹后调用 listed()，生成计划的线程处理完一个文件后调用 handled()；
+    文件夹中的文件全部处理完时连同子文件夹名称记入 done。
+
+    Args:
+        resume: 上次已经处理完的文件夹（JournalState.done），继续扫描时跳过
+    """
+
+    def __init__(self, resume=None):
+        self.resume = dict(resume or {})
+        self.done = dict(self.resume)
+        # 相对路径 -> [尚未处理的文件数, 子文件夹名称列表]
+        self._pending = {}
+
+    def listed(self, rel_dir, file_count, subdirs):
+        if file_count:
+            self._pending[rel_dir] = [file_count, list(subdirs)]
+        else:
+            self.done[rel_dir] = list(subdirs)
+
+    def handled(self, entry):
+        pending = self._pending.get(entry.rel_dir)
+        if pending is None:
+            return
+        pending[0] -= 1
+        if not pending[0]:
+            del self._pending[entry.rel_dir]
+            self.done[entry.rel_dir] = pending[1]
+
+    def finished(self):
+        """已经处理完的文件夹（扫描线程可能仍在运行，返回副本）"""
+        return self.done.copy()
+
+
+class MoveJournal:
+    """根文件夹的移动日志
+
+    Args:
+        root_folder: 根文件夹路径
+        path: 日志文件路径，默认为根文件夹下的 .organizer_journal.jsonl
+        sync_every: 每追加多少条提交记录 fsync 一次，默认 SYNC_EVERY
+    """
+
+    def __init__(self, root_folder, path=None, sync_every=None):
+        self.root_folder = root_folder
+        self.path = path or os.path.join(root_folder, JOURNAL_FILENAME)
+        self.sync_every = sync_every or SYNC_EVERY
+        self.run_id = None
+        self._file = None
+        # 计划先写入临时文件，publish() 之后才替换原来的日志
+        self._temp_path = self.path + ".tmp"
+        self._pending = False
+        self._seq = 0
+        self._unsynced = 0
+        # 写日志的开销统计
+        self.records = 0
+        self.syncs = 0
+        self.elapsed = 0.0
+
+    # ---- 写入 ----
+
+    def _write(self, record):
+        start = time.perf_counter()
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=_SEPARATORS).encode("utf-8") + b"\n")
+        self.records += 1
+        self._unsynced += 1
+        self.elapsed += time.perf_counter() - start
+
+    def sync(self):
+        """把已写入的记录落盘"""
+        if self._file is None or not self._unsynced:
+            return
+        start = time.perf_counter()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.syncs += 1
+        self._unsynced = 0
+        self.elapsed += time.perf_counter() - start
+
+    def _maybe_sync(self):
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def begin(self):
+        """开始新的一次整理：计划写入临时文件，publish() 之前上一次的日志保持不变"""
+        self.close()
+        self._file = open(self._temp_path, "wb")
+        self._pending = True
+        self.run_id = time.time_ns() // 1000000
+        self._seq = 0
+        self._write({"run": self.run_id, "root": self.root_folder})
+
+    def reopen(self, state):
+        """继续（或撤销）日志中记录的整理，之后的记录追加到文件末尾"""
+        self.close()
+        self._file = open(self.path, "ab")
+        self.run_id = state.run_id
+        self._seq = state.planned or 0
+
+    def write_plan(self, tasks):
+        """逐条写入计划中的移动并落盘，返回移动数；tasks 中的 MoveTask 会被设置序号"""
+        for task in tasks:
+            self._seq += 1
+            task.seq = self._seq
+            record = task_record(task, self.root_folder)
+            record["i"] = task.seq
+            self._write(record)
+        self._write({"planned": self._seq})
+        self.sync()
+        return self._seq
+
+    def publish(self):
+        """用写好计划的临时文件替换上一次的日志，之后的记录追加到新日志中"""
+        self.close(discard=False)
+        os.replace(self._temp_path, self.path)
+        self._file = open(self.path, "ab")
+
+    def discard(self):
+        """丢弃临时文件中的计划，保留上一次的日志"""
+        self.close()
+
+    def amend(self, task):
+        """执行前修改了计划中的目标位置，先落盘再移动"""
+        record = task_record(task, self.root_folder)
+        record["i"] = task.seq
+        self._write(record)
+        self.sync()
+
+    def commit(self, task):
+        self._write({"c": task.seq})
+        self._maybe_sync()
+
+    def fail(self, task, error):
+        self._write({"e": task.seq, "error": str(error)})
+        self._maybe_sync()
+
+    def mark_partial(self, done=None):
+        """计划在扫描中途取消（在 write_plan() 之后调用）
+
+        done: 已经处理完的文件夹 {相对路径: 子文件夹名称列表}，下次继续扫描时跳过
+        """
+        for rel_dir, subdirs in (done or {}).items():
+            self._write({"done": rel_dir, "sub": subdirs})
+        self._write({"partial": self._seq})
+        self.sync()
+
+    def end(self):
+        self._write({"end": self.run_id})
+        self.sync()
+
+    def mark_undone(self):
+        self._write({"undone": self.run_id})
+        self.sync()
+
+    def close(self, discard=True):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+        if self._pending:
+            self._pending = False
+            # 没有 publish() 的计划（没有移动或整理出错）不替换上一次的日志
+            if discard:
+                try:
+                    os.unlink(self._temp_path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {"records": self.records, "syncs": self.syncs, "seconds": round(self.elapsed, 6)}
+
+    # ---- 读取 ----
+
+    def _records(self):
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # 进程退出时写了一半的最后一行
+                    return
+
+    def load(self):
+        """读出日志中记录的整理状态，没有日志时返回 None"""
+        if not os.path.exists(self.path):
+            return None
+        state = None
+        for record in self._records():
+            if "run" in record:
+                state = JournalState(record["run"], record.get("root"))
+            elif state is None:
+                continue
+            elif "i" in record:
+                if state.planned is not None:
+                    state.amended[record["i"]] = record
+            elif "c" in record:
+                state.committed.add(record["c"])
+            elif "e" in record:
+                state.failed.add(record["e"])
+            elif "planned" in record:
+                state.planned = record["planned"]
+            elif "done" in record:
+                state.done[record["done"]] = record["sub"]
+            elif "partial" in record:
+                state.partial = True
+            elif "end" in record:
+                state.ended = True
+            elif "undone" in record:
+                state.undone = True
+        return state
+
+    def iter_tasks(self, state, include_done=False):
+        """按计划顺序产出 MoveTask（已应用修改）；默认跳过已提交和已失败的移动"""
+        for record in self._records():
+            if "planned" in record:
+                return
+            seq = record.get("i")
+            if seq is None:
+                continue
+            if not include_done and (seq in state.committed or seq in state.failed):
+                continue
+            task = task_from_record(state.amended.get(seq, record), self.root_folder)
+            task.seq = seq
+            yield task
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+整理过程的阶段耗时和计数器
+
+阶段耗时在运行中累加：correction（修正"原图"中的文件）、scan（扫描线程列出文件夹的时间）、
+plan（使用移动日志时生成计划）、excel_moves 和 other_moves（各移动线程耗时之和）、
+total（整次整理）。计数器在整理结束时从已有的统计对象（ScanStats、TransferStats、
+NameIndex）中一次性读取，不在每个文件上增加开销。
+
+没有启用时引擎使用 NULL_METRICS，执行器不计时，只多一次 None 判断。
+
+结果可以写成 JSON（RunSummary.as_dict() 中的 "metrics"），也可以写成 Prometheus
+文本格式，供 node exporter 的 textfile collector 读取。
+"""
+
+import os
+import threading
+import time
+
+# Prometheus 指标名前缀
+PROMETHEUS_PREFIX = "file_organizer"
+
+PHASES = ("correction", "scan", "plan", "excel_moves", "other_moves", "total")
+
+# 计数器名称 -> Prometheus 说明
+COUNTERS = {
+    "files_corrected": "修正分类的文件数",
+    "files_processed": "新整理的文件数",
+    "errors": "出错的文件数",
+    "pruned_dirs": "删除的已清空文件夹数",
+    "directories": "扫描的文件夹数",
+    "scandir_calls": "scandir 调用次数",
+    "stat_calls": "stat 调用次数",
+    "renames": "同盘重命名次数",
+    "copies": "跨盘复制次数",
+    "links": "用硬链接代替移动的次数",
+    "bytes_copied": "跨盘复制的字节数",
+    "bytes_moved": "移动的字节数（同盘重命名和跨盘复制）",
+    "bytes_linked": "改为硬链接的文件字节数",
+    "name_reservations": "分配目标文件名的次数",
+    "name_collisions": "目标文件名重名的次数",
+    "name_collision_probes": "重名时检查的候选文件名总数",
+}
+
+
+def task_phase(task):
+    """移动任务计入的阶段"""
+    if task.is_correction:
+        return "correction"
+    return "excel_moves" if task.is_excel else "other_moves"
+
+
+class PhaseTimer:
+    """with 块结束时把耗时累加到阶段上"""
+
+    __slots__ = ("metrics", "phase", "start")
+
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_time(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """一次整理的阶段耗时和计数器（多线程安全）"""
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.counters = {}
+
+    def timer(self, phase):
+        return PhaseTimer(self, phase)
+
+    def add_time(self, phase, seconds):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def set(self, name, value):
+        self.counters[name] = value
+
+    def as_dict(self):
+        return {
+            "phases": {phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullMetrics:
+    """不记录任何内容的 Metrics"""
+
+    enabled = False
+    phases = {}
+    counters = {}
+
+    def timer(self, phase):
+        return _NULL_TIMER
+
+    def add_time(self, phase, seconds):
+        pass
+
+    def set(self, name, value):
+        pass
+
+    def as_dict(self):
+        return None
+
+
+NULL_METRICS = NullMetrics()
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def prometheus_text(metrics, labels=None, prefix=PROMETHEUS_PREFIX, timestamp=None):
+    """把 Metrics 转换为 Prometheus 文本格式
+
+    每次整理的结果都是一份快照（下一次整理重新计数），因此全部使用 gauge 类型。
+
+    Args:
+        metrics: Metrics 实例
+        labels: 附加到每个指标上的标签 dict，例如 {"root": "/data/照片"}
+        prefix: 指标名前缀
+        timestamp: 整理结束的 Unix 时间，默认为当前时间
+    """
+    base = ",".join(f'{key}="{_escape_label(value)}"' for key, value in sorted((labels or {}).items()))
+
+    def series(name, value, extra=None):
+        label_text = ",".join(part for part in (base, extra) if part)
+        return f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}"
+
+    lines = [f"# HELP {prefix}_phase_seconds 各阶段耗时（移动阶段为各线程耗时之和）",
+             f"# TYPE {prefix}_phase_seconds gauge"]
+    for phase, seconds in sorted(metrics.phases.items()):
+        lines.append(series("phase_seconds", f"{seconds:.6f}", f'phase="{phase}"'))
+    for name, value in sorted(metrics.counters.items()):
+        lines.append(f"# HELP {prefix}_{name} {COUNTERS.get(name, name)}")
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(series(name, value))
+    lines.append(f"# HELP {prefix}_last_run_timestamp_seconds 整理结束的时间")
+    lines.append(f"# TYPE {prefix}_last_run_timestamp_seconds gauge")
+    lines.append(series("last_run_timestamp_seconds", f"{timestamp if timestamp is not None else time.time():.3f}"))
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, metrics, labels=None):
+    """写入 Prometheus 文本文件；先写临时文件再替换，采集器不会读到写了一半的文件"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(metrics, labels))
+    os.replace(temp_path, path)
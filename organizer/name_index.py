@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+目标文件夹的文件名索引
+
+每个目标文件夹第一次用到时用一次 os.scandir 读入已有的文件名，之后的重名判断
+都在内存中完成。对每个基础文件名记录下一个待尝试的编号，
+上千个 IMG_0001.jpg 进入同一个文件夹时，每个文件只需检查一两个候选名，
+不再从 _1 开始逐个调用 os.path.exists。
+"""
+
+import os
+
+
+def _key(name):
+    # Windows 下文件名不区分大小写
+    return os.path.normcase(name)
+
+
+class FolderNameIndex:
+    """单个文件夹中已占用的文件名"""
+
+    __slots__ = ("folder", "names", "counters")
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.names = set()
+        # (基础名, 扩展名) -> 下一个待尝试的编号
+        self.counters = {}
+        try:
+            with os.scandir(folder) as it:
+                for dir_entry in it:
+                    self.names.add(_key(dir_entry.name))
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, name):
+        return _key(name) in self.names
+
+    def reserve(self, filename):
+        """为 filename 分配一个未被占用的文件名并标记为已占用
+
+        Returns:
+            tuple: (最终文件名, 检查过的候选名数量)
+        """
+        names = self.names
+        key = _key(filename)
+        if key not in names:
+            names.add(key)
+            return filename, 1
+
+        base_name, ext = os.path.splitext(filename)
+        counter_key = (_key(base_name), _key(ext))
+        counter = self.counters.get(counter_key, 1)
+        probes = 1
+        while True:
+            candidate = f"{base_name}_{counter}{ext}"
+            counter += 1
+            probes += 1
+            if _key(candidate) not in names:
+                break
+        self.counters[counter_key] = counter
+        names.add(_key(candidate))
+        return candidate, probes
+
+    def release(self, name):
+        """文件被移出该文件夹后释放其文件名"""
+        self.names.discard(_key(name))
+
+
+class NameIndex:
+    """按目标文件夹懒加载的文件名索引（只能在一个线程中使用）"""
+
+    def __init__(self):
+        self.folders = {}
+        self.loads = 0
+        self.reservations = 0
+        self.probes = 0
+        # 发生重名的次数，以及这些重名检查过的候选名总数
+        self.collisions = 0
+        self.collision_probes = 0
+
+    def folder(self, folder):
+        index = self.folders.get(folder)
+        if index is None:
+            index = FolderNameIndex(folder)
+            self.folders[folder] = index
+            self.loads += 1
+        return index
+
+    def reserve(self, folder, filename):
+        """为 folder 中的 filename 分配唯一文件名，返回最终文件名"""
+        final_name, probes = self.folder(folder).reserve(filename)
+        self.reservations += 1
+        self.probes += probes
+        if probes > 1:
+            self.collisions += 1
+            self.collision_probes += probes
+        return final_name
+
+    def release(self, folder, name):
+        """文件从 folder 中移走后调用；只有已加载的文件夹需要更新"""
+        index = self.folders.get(folder)
+        if index is not None:
+            index.release(name)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+扫描 → 分类 → 移动 流水线
+
+扫描在后台线程中进行，发现的文件按批放入有界队列；调用线程从队列中取出文件、
+确定目标位置并交给 MoveExecutor。队列满时扫描线程等待，执行器在途任务满时
+分类阶段等待，因此内存占用只取决于队列和线程池的容量，与文件总数无关，
+而且扫描深层子文件夹的同时，已经发现的文件就可以开始移动。
+"""
+
+import queue
+import threading
+
+# 每批放入队列的文件条目数
+BATCH_SIZE = 256
+
+# 队列中最多积压的批数
+QUEUE_BATCHES = 16
+
+_DONE = object()
+
+
+class _ScanFailed:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class ScanPipeline:
+    """在后台线程中运行 Scanner，以迭代器的形式逐个（或用 batches() 逐批）交出 ScanEntry
+
+    Args:
+        scanner: Scanner 实例
+        batch_size: 每批条目数
+        max_batches: 队列中最多积压的批数
+    """
+
+    def __init__(self, scanner, batch_size=BATCH_SIZE, max_batches=QUEUE_BATCHES):
+        self.scanner = scanner
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_batches)
+        self.finished = False
+        self.discovered = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _put(self, item):
+        # 带超时地等待，使消费者提前退出时扫描线程也能结束
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        batch = []
+        try:
+            for entry in self.scanner.scan():
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    if not self._put(batch):
+                        return
+                    batch = []
+            if batch and not self._put(batch):
+                return
+            self._put(_DONE)
+        except BaseException as e:
+            self._put(_ScanFailed(e))
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
+
+    def batches(self):
+        """逐批交出 ScanEntry 列表"""
+        self._thread = threading.Thread(target=self._produce, name="organizer-scan", daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _DONE:
+                    self.finished = True
+                    return
+                if isinstance(item, _ScanFailed):
+                    raise item.error
+                self.discovered += len(item)
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        """停止扫描线程（消费者提前退出时调用）"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class EntryBatches:
+    """与 ScanPipeline 接口相同的已知文件列表（监视模式只处理事先确定的文件）
+
+    Args:
+        entries: ScanEntry 列表
+        batch_size: 每批条目数
+    """
+
+    def __init__(self, entries, batch_size=BATCH_SIZE):
+        self.entries = entries
+        self.batch_size = batch_size
+        self.finished = True
+        self.discovered = len(entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def batches(self):
+        for start in range(0, len(self.entries), self.batch_size):
+            yield self.entries[start:start + self.batch_size]
+
+    def close(self):
+        pass
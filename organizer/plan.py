@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+移动计划的 JSONL 格式
+
+第一行是计划头，之后每行一次移动，路径都相对于根文件夹并使用 "/" 分隔，
+计划可以交给另一台机器或另一个进程执行：
+
+    {"format":1,"root":"/data/照片"}
+    {"op":"fix","src":"原图/精修.jpg","dst":"处理图/精修.jpg"}
+    {"op":"excel","src":"批次1/汇总.xlsx","dst":"汇总_1.xlsx"}
+    {"op":"move","src":"批次1/IMG_0001.jpg","dst":"原图/IMG_0001.jpg"}
+
+op 为 fix（修正"原图"中错误分类的文件，执行时最先完成）、excel（Excel文件移回根目录）
+或 move（其他按规则的移动）。查重发现内容相同的文件时，可选的 link 字段给出
+目标位置改用硬链接指向的文件：
+
+    {"op":"move","src":"批次2/IMG_0001.jpg","dst":"原图/IMG_0001_1.jpg","link":"原图/IMG_0001.jpg"}
+"""
+
+import json
+import os
+
+from .executor import MoveTask
+from .scanner import ScanEntry
+
+PLAN_FORMAT = 1
+
+# 移动到根目录的任务在日志中显示的目标文件夹名称
+ROOT_TARGET_NAME = "根目录"
+
+_SEPARATORS = (",", ":")
+
+
+class PlanError(ValueError):
+    """计划文件格式错误"""
+
+
+def _to_plan_path(path, root_folder):
+    return os.path.relpath(path, root_folder).replace(os.sep, "/")
+
+
+def _from_plan_path(rel_path, root_folder):
+    return os.path.join(root_folder, *rel_path.split("/"))
+
+
+def task_record(task, root_folder):
+    """把 MoveTask 转换为计划中的一行（dict）"""
+    if task.is_correction:
+        op = "fix"
+    elif task.is_excel:
+        op = "excel"
+    else:
+        op = "move"
+    record = {"op": op, "src": _to_plan_path(task.entry.path, root_folder),
+              "dst": _to_plan_path(task.target_path, root_folder)}
+    if task.duplicate_of:
+        record["link"] = _to_plan_path(task.duplicate_of[0], root_folder)
+    return record
+
+
+def task_from_record(record, root_folder):
+    """把计划中的一行还原为 MoveTask"""
+    try:
+        op, src, dst = record["op"], record["src"], record["dst"]
+    except (KeyError, TypeError):
+        raise PlanError(f"无效的计划行: {record!r}")
+    if op not in ("fix", "excel", "move"):
+        raise PlanError(f"未知的操作: {op}")
+    link = record.get("link")
+    for path in (src, dst) if link is None else (src, dst, link):
+        # 计划只能移动根文件夹内的文件
+        if not path or os.path.isabs(path) or os.pardir in path.replace("\\", "/").split("/"):
+            raise PlanError(f"计划中的路径必须位于根文件夹内: {path}")
+
+    rel_dir, name = os.path.split(src.replace("/", os.sep))
+    folder = os.path.join(root_folder, rel_dir) if rel_dir else root_folder
+    depth = len(rel_dir.split(os.sep)) if rel_dir else 0
+    entry = ScanEntry(os.path.join(folder, name), name, folder, rel_dir, depth)
+
+    target_path = _from_plan_path(dst, root_folder)
+    target_dir, final_name = os.path.split(dst)
+    return MoveTask(entry, target_dir or ROOT_TARGET_NAME, target_path, final_name,
+                    is_excel=op == "excel", is_correction=op == "fix",
+                    duplicate_of=(_from_plan_path(link, root_folder),) if link else None)
+
+
+def write_plan(stream, root_folder, tasks):
+    """把任务逐行写入文本流，返回写入的任务数（tasks 可以是生成器）"""
+    stream.write(json.dumps({"format": PLAN_FORMAT, "root": root_folder}, ensure_ascii=False,
+                            separators=_SEPARATORS) + "\n")
+    count = 0
+    for task in tasks:
+        stream.write(json.dumps(task_record(task, root_folder), ensure_ascii=False, separators=_SEPARATORS) + "\n")
+        count += 1
+    return count
+
+
+def read_plan_header(stream):
+    """读取并检查计划头，返回计划头 dict"""
+    header_line = stream.readline()
+    try:
+        header = json.loads(header_line)
+    except ValueError:
+        raise PlanError("计划文件缺少计划头")
+    if not isinstance(header, dict) or header.get("format") != PLAN_FORMAT or "root" not in header:
+        raise PlanError(f"不支持的计划格式: {header_line.strip()}")
+    return header
+
+
+def read_plan(stream, root_folder=None):
+    """逐行读取计划，产出 MoveTask
+
+    Args:
+        stream: 文本流
+        root_folder: 执行计划的根文件夹，默认使用计划头中记录的根文件夹
+    """
+    header = read_plan_header(stream)
+    root_folder = root_folder or header["root"]
+    for line_number, line in enumerate(stream, 2):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise PlanError(f"第 {line_number} 行: {str(e)}")
+        yield task_from_record(record, root_folder)
+
+
+class MovePlan:
+    """一次整理的完整移动计划
+
+    Args:
+        root_folder: 根文件夹路径
+        tasks: MoveTask 列表，修正任务在前
+    """
+
+    def __init__(self, root_folder, tasks=None):
+        self.root_folder = root_folder
+        self.tasks = list(tasks) if tasks is not None else []
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def counts(self):
+        """返回 {"fix": 修正数, "excel": Excel文件数, "move": 其他文件数, "renamed": 重命名数}"""
+        counts = {"fix": 0, "excel": 0, "move": 0, "renamed": 0}
+        for task in self.tasks:
+            counts["fix" if task.is_correction else "excel" if task.is_excel else "move"] += 1
+            if task.renamed:
+                counts["renamed"] += 1
+        return counts
+
+    def summary(self):
+        counts = self.counts()
+        text = (f"计划移动 {len(self.tasks)} 个文件（修正 {counts['fix']} 个，Excel {counts['excel']} 个，"
+                f"其他 {counts['move']} 个，其中 {counts['renamed']} 个需要重命名")
+        links = sum(1 for task in self.tasks if task.duplicate_of)
+        if links:
+            text += f"，{links} 个改用硬链接"
+        return text + "）"
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            write_plan(f, self.root_folder, self.tasks)
+
+    @classmethod
+    def load(cls, path, root_folder=None):
+        """读取计划文件，root_folder 默认使用计划头中记录的根文件夹"""
+        with open(path, encoding="utf-8") as f:
+            root_folder = root_folder or read_plan_header(f)["root"]
+            f.seek(0)
+            return cls(root_folder, read_plan(f, root_folder))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+删除整理后已经清空的源文件夹
+
+整理后被移空的子文件夹如果留下来，下次整理仍要逐个列出。FolderPruner 在扫描时记录
+每个文件夹中的名称数（文件、子文件夹和跳过的文件），每移走一个文件减一；整理结束后
+从最深的文件夹开始，名称数为 0 的文件夹用 os.rmdir 删除，并把上级文件夹的名称数减一，
+一次完成，不需要重新遍历文件夹树。
+
+os.rmdir 只能删除空文件夹：整理期间新到达的文件、扫描器没有计数的特殊文件都会使删除
+失败，这些文件夹照常保留。根文件夹、根文件夹中的分类文件夹和整理前就是空的文件夹
+不会删除。
+"""
+
+import os
+
+
+class FolderPruner:
+    """记录文件夹中剩余的名称数，删除已经清空的文件夹
+
+    Args:
+        root_folder: 根文件夹路径
+        keep: 不删除的文件夹（相对路径），通常是根文件夹中的分类文件夹
+    """
+
+    def __init__(self, root_folder, keep=()):
+        self.root_folder = root_folder
+        self.keep = set(keep)
+        # 相对路径 -> 剩余的名称数
+        self._remaining = {}
+        self.removed = 0
+        self.kept = 0
+
+    def listed(self, rel_dir, depth, count):
+        """扫描器列出了一个文件夹（Scanner 的 on_folder 回调）
+
+        整理前就是空的文件夹不记录（可能是特意建好的），它的上级文件夹也因此不会删除。
+        """
+        if depth and count:
+            self._remaining[rel_dir] = count
+
+    def moved(self, rel_dir):
+        """rel_dir 中的一个文件已经移走"""
+        remaining = self._remaining
+        if rel_dir in remaining:
+            remaining[rel_dir] -= 1
+
+    def empty_folders(self):
+        """按记录已经清空的文件夹数（删除前）"""
+        return sum(1 for count in self._remaining.values() if count == 0)
+
+    def prune(self, on_removed=None):
+        """从最深的文件夹开始删除已经清空的文件夹
+
+        Args:
+            on_removed: 删除一个文件夹后调用 on_removed(相对路径)
+
+        Returns:
+            int: 删除的文件夹数
+        """
+        remaining = self._remaining
+        keep = self.keep
+        removed = 0
+        # 上级文件夹的相对路径总是比下级短，按路径分隔符个数从多到少处理即可自底向上
+        for rel_dir in sorted(remaining, key=lambda rel: rel.count(os.sep), reverse=True):
+            if remaining[rel_dir] or rel_dir in keep:
+                continue
+            try:
+                os.rmdir(os.path.join(self.root_folder, rel_dir))
+            except OSError:
+                # 整理期间有新文件到达，或有扫描器没有计数的文件
+                self.kept += 1
+                continue
+            removed += 1
+            parent = os.path.dirname(rel_dir)
+            if parent in remaining:
+                remaining[parent] -= 1
+            if on_removed is not None:
+                on_removed(rel_dir)
+        self._remaining = {}
+        self.removed += removed
+        return removed
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+紧凑的文件记录表
+
+数百万个文件时，为每个文件保存一个 (文件路径, 文件名, 源文件夹) 元组或 ScanEntry
+会占用数 GB 内存，其中完整路径对每个文件都是一个新的字符串。FileRecords 中每个
+文件夹的路径只保存一次，每个文件只保存文件夹编号（array 中的 4 个字节）和文件名，
+需要时再组合出 ScanEntry。按条件划分出的部分（例如Excel文件和其他文件）是只保存
+下标的 RecordView，不复制记录。
+"""
+
+import os
+from array import array
+
+from .scanner import ScanEntry
+
+
+class FileRecords:
+    """按列保存的文件记录
+
+    组合出的 ScanEntry 不再带有 DirEntry，第一次 stat() 时会产生一次系统调用。
+
+    Args:
+        stats: 可选的 ScanStats，组合出的 ScanEntry 调用 stat() 时计数
+    """
+
+    __slots__ = ("_folders", "_rel_dirs", "_depths", "_folder_ids", "dir_ids", "names", "tags", "stats")
+
+    def __init__(self, stats=None):
+        # 文件夹表：完整路径、相对路径和深度，按文件夹编号索引
+        self._folders = []
+        self._rel_dirs = []
+        self._depths = array("H")
+        self._folder_ids = {}
+        # 文件表：每个文件一个文件夹编号、一个文件名和一个调用者自定义的小整数
+        self.dir_ids = array("I")
+        self.names = []
+        self.tags = array("H")
+        self.stats = stats
+
+    @classmethod
+    def from_entries(cls, entries, stats=None):
+        records = cls(stats)
+        records.extend(entries)
+        return records
+
+    def folder_id(self, folder, rel_dir, depth):
+        """返回文件夹的编号，第一次出现时加入文件夹表"""
+        folder_id = self._folder_ids.get(folder)
+        if folder_id is None:
+            folder_id = len(self._folders)
+            self._folder_ids[folder] = folder_id
+            self._folders.append(folder)
+            self._rel_dirs.append(rel_dir)
+            self._depths.append(depth)
+        return folder_id
+
+    def append(self, entry, tag=0):
+        """添加一个 ScanEntry，返回它的下标
+
+        Args:
+            entry: ScanEntry（只使用 name、folder、rel_dir 和 depth）
+            tag: 与记录一起保存的 0-65535 的整数（例如规则的序号）
+        """
+        self.dir_ids.append(self.folder_id(entry.folder, entry.rel_dir, entry.depth))
+        self.names.append(entry.name)
+        self.tags.append(tag)
+        return len(self.names) - 1
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    @property
+    def folder_count(self):
+        return len(self._folders)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        return self.entry(index)
+
+    def entry(self, index):
+        """组合出第 index 个文件的 ScanEntry"""
+        folder_id = self.dir_ids[index]
+        folder = self._folders[folder_id]
+        name = self.names[index]
+        return ScanEntry(os.path.join(folder, name), name, folder, self._rel_dirs[folder_id],
+                         self._depths[folder_id], stats=self.stats)
+
+    def __iter__(self):
+        for index in range(len(self.names)):
+            yield self.entry(index)
+
+    def items(self):
+        """逐个产出 (ScanEntry, tag)"""
+        tags = self.tags
+        for index in range(len(self.names)):
+            yield self.entry(index), tags[index]
+
+    def view(self, indices=()):
+        return RecordView(self, indices)
+
+    def partition(self, predicate):
+        """按 predicate(文件名) 把记录划分为 (满足条件的, 其余的) 两个 RecordView，不复制记录"""
+        matched = RecordView(self)
+        others = RecordView(self)
+        for index, name in enumerate(self.names):
+            (matched if predicate(name) else others).indices.append(index)
+        return matched, others
+
+
+class RecordView:
+    """FileRecords 中部分记录的视图，只保存下标（每个文件 4 个字节）"""
+
+    __slots__ = ("records", "indices")
+
+    def __init__(self, records, indices=()):
+        self.records = records
+        self.indices = array("I", indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, position):
+        return self.records.entry(self.indices[position])
+
+    def __iter__(self):
+        entry = self.records.entry
+        for index in self.indices:
+            yield entry(index)
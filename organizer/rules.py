@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+可配置的分类规则
+
+规则从 JSON 或 TOML 文件读入，启动时编译成按扩展名索引的分发表：
+每个扩展名对应一串按配置顺序排列、且可能适用于该扩展名的规则，
+第一个条件全部满足的规则决定目标文件夹。只看扩展名的规则（如Excel）
+编译后就是一次字典查找；文件名条件在文件大小、修改时间等需要 stat 的条件之前检查。
+
+配置文件示例（JSON）：
+
+    {
+      "default": "原图",
+      "rules": [
+        {"name": "excel", "extensions": [".xlsx", ".xls"], "target": "."},
+        {"name": "raw", "extensions": [".cr2", ".nef"], "min_size": 1048576, "target": "RAW"},
+        {"name": "modified", "keywords": ["修改后", "拷贝"], "chinese": true, "target": "处理图"},
+        {"name": "old", "older_than_days": 365, "target": "归档"}
+      ]
+    }
+
+target 为 "." 表示根文件夹本身，其他值是根文件夹下的一级分类文件夹名称。
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+from .classifier import CJK_RANGE, KEYWORDS, FilenameClassifier
+from .scanner import CLASSIFICATION_FOLDERS
+
+ROOT_TARGET = "."
+
+# 直接移动到根目录的Excel文件扩展名
+EXCEL_EXTENSIONS = ['.xlsx', '.xls']
+
+_DAY = 24 * 60 * 60
+
+_KNOWN_KEYS = {"name", "target", "extensions", "keywords", "chinese", "name_pattern",
+               "min_size", "max_size", "older_than_days", "newer_than_days"}
+
+
+class RuleError(ValueError):
+    """规则配置错误"""
+
+
+class Rule:
+    """编译后的单条规则
+
+    name_checks 只看文件名，stat_checks 需要文件状态；每项都是 check(entry) -> bool。
+    """
+
+    __slots__ = ("name", "target", "extensions", "name_checks", "stat_checks", "classifier")
+
+    def __init__(self, name, target, extensions=None, name_checks=(), stat_checks=(), classifier=None):
+        self.name = name
+        self.target = target
+        self.extensions = extensions
+        self.name_checks = tuple(name_checks)
+        self.stat_checks = tuple(stat_checks)
+        self.classifier = classifier
+
+    @property
+    def to_root(self):
+        return self.target == ROOT_TARGET
+
+    @property
+    def unconditional(self):
+        """除扩展名外没有其他条件"""
+        return not self.name_checks and not self.stat_checks
+
+    def matches_entry(self, entry):
+        for check in self.name_checks:
+            if not check(entry):
+                return False
+        for check in self.stat_checks:
+            if not check(entry):
+                return False
+        return True
+
+
+
+class RuleSet:
+    """按扩展名分发的规则集合
+
+    Args:
+        rules: 按优先级排列的 Rule 列表
+        default_target: 没有规则命中时的目标文件夹
+        fingerprint: 规则内容的指纹，compile_rules() 由配置计算；省略时由规则名称、目标和扩展名计算
+    """
+
+    def __init__(self, rules, default_target=CLASSIFICATION_FOLDERS[0], fingerprint=None):
+        self.rules = list(rules)
+        self.default_rule = Rule("default", default_target)
+        if fingerprint is None:
+            fingerprint = _fingerprint([(rule.name, rule.target, sorted(rule.extensions or ()))
+                                        for rule in self.rules + [self.default_rule]])
+        # 规则变化后扫描索引中"原图"的缓存失效，见 ScanIndex 的 rules_key
+        self.fingerprint = fingerprint
+        self.dispatch, self.fallback = self._compile()
+
+    def _compile(self):
+        # 没有扩展名限制的规则适用于所有扩展名
+        extensions = set()
+        for rule in self.rules:
+            if rule.extensions:
+                extensions.update(rule.extensions)
+
+        def chain_for(ext):
+            chain = []
+            for rule in self.rules:
+                if rule.extensions is None or ext in rule.extensions:
+                    chain.append(rule)
+                    # 无条件规则之后的规则不可能被评估到
+                    if rule.unconditional:
+                        return tuple(chain)
+            chain.append(self.default_rule)
+            return tuple(chain)
+
+        dispatch = {ext: chain_for(ext) for ext in extensions}
+        return dispatch, chain_for(None)
+
+    @property
+    def target_folders(self):
+        """根文件夹下的全部分类文件夹名称（不含根文件夹本身），按首次出现的顺序排列"""
+        folders = []
+        for rule in self.rules + [self.default_rule]:
+            if not rule.to_root and rule.target not in folders:
+                folders.append(rule.target)
+        return tuple(folders)
+
+    def route(self, entry, ext=None, stats=None):
+        """返回第一条命中的规则（没有规则命中时返回默认规则）
+
+        Args:
+            entry: ScanEntry，需要 name 属性；大小/时间条件还需要 stat()
+            ext: 已经算好的小写扩展名，省略时由文件名计算
+            stats: RuleStats，给出时记录每条规则的评估次数、命中次数和耗时（每次评估两次计时）
+        """
+        if ext is None:
+            ext = os.path.splitext(entry.name)[1].lower()
+        chain = self.dispatch.get(ext, self.fallback)
+
+        if stats is None:
+            for rule in chain:
+                if rule.unconditional or rule.matches_entry(entry):
+                    return rule
+            return self.default_rule
+
+        counts = stats.counts
+        for rule in chain:
+            start = time.perf_counter()
+            matched = rule.unconditional or rule.matches_entry(entry)
+            row = counts[rule]
+            row[2] += time.perf_counter() - start
+            row[0] += 1
+            if matched:
+                row[1] += 1
+                return rule
+        return self.default_rule
+
+    def route_among_folders(self, entry):
+        """忽略目标为根文件夹的规则进行路由，用于修正分类文件夹中已有的文件"""
+        ext = os.path.splitext(entry.name)[1].lower()
+        for rule in self.rules:
+            if rule.to_root or (rule.extensions is not None and ext not in rule.extensions):
+                continue
+            if rule.matches_entry(entry):
+                return rule
+        return self.default_rule
+
+    def prepare_batch(self, names):
+        """批量预先计算文件名条件（结果缓存在各规则的分类器中）"""
+        for rule in self.rules:
+            if rule.classifier is not None:
+                rule.classifier.is_modified_batch(names)
+
+
+class RuleStats:
+    """一次整理中每条规则的评估次数、命中次数和耗时
+
+    统计不保存在 RuleSet 中：同一个 RuleSet 可以被同时进行的多个整理共用，
+    每次整理各用一个 RuleStats（只在生成移动任务的线程中更新）。
+    """
+
+    def __init__(self, rule_set):
+        self.rules = rule_set.rules + [rule_set.default_rule]
+        # 规则 -> [评估次数, 命中次数, 耗时]
+        self.counts = {rule: [0, 0, 0.0] for rule in self.rules}
+
+    def as_list(self):
+        result = []
+        for rule in self.rules:
+            evaluations, matches, seconds = self.counts[rule]
+            result.append({"name": rule.name, "target": rule.target, "evaluations": evaluations,
+                           "matches": matches, "seconds": round(seconds, 6)})
+        return result
+
+    def report_lines(self):
+        lines = []
+        for rule in self.rules:
+            evaluations, matches, seconds = self.counts[rule]
+            lines.append(f"规则 {rule.name} -> {rule.target}: 评估 {evaluations} 次，"
+                         f"命中 {matches} 次，耗时 {seconds * 1000:.1f} ms")
+        return lines
+
+
+def compile_rule(config, index=0):
+    """把一条规则的配置编译成 Rule"""
+    unknown = set(config) - _KNOWN_KEYS
+    if unknown:
+        raise RuleError(f"第 {index + 1} 条规则包含未知字段: {', '.join(sorted(unknown))}")
+    name = str(config.get("name", f"rule{index + 1}"))
+    target = config.get("target")
+    if not target or not isinstance(target, str):
+        raise RuleError(f"规则 {name} 缺少 target")
+    if target != ROOT_TARGET and (os.sep in target or "/" in target or target in ("..", "")):
+        raise RuleError(f"规则 {name} 的 target 必须是根文件夹下的一级文件夹名称: {target}")
+
+    extensions = None
+    if config.get("extensions"):
+        extensions = frozenset(_normalize_extension(ext) for ext in config["extensions"])
+
+    name_checks = []
+    classifier = None
+    keywords = config.get("keywords") or []
+    chinese = bool(config.get("chinese", False))
+    if keywords or chinese:
+        classifier = FilenameClassifier(keywords, CJK_RANGE if chinese else None)
+        is_modified = classifier.is_modified
+        name_checks.append(lambda entry: is_modified(entry.name))
+    if config.get("name_pattern"):
+        search = re.compile(config["name_pattern"]).search
+        name_checks.append(lambda entry: search(entry.name) is not None)
+
+    stat_checks = []
+    if "min_size" in config:
+        min_size = int(config["min_size"])
+        stat_checks.append(lambda entry: entry.stat().st_size >= min_size)
+    if "max_size" in config:
+        max_size = int(config["max_size"])
+        stat_checks.append(lambda entry: entry.stat().st_size <= max_size)
+    if "older_than_days" in config:
+        seconds = float(config["older_than_days"]) * _DAY
+        stat_checks.append(lambda entry: time.time() - entry.stat().st_mtime >= seconds)
+    if "newer_than_days" in config:
+        seconds = float(config["newer_than_days"]) * _DAY
+        stat_checks.append(lambda entry: time.time() - entry.stat().st_mtime < seconds)
+
+    return Rule(name, target, extensions, name_checks, stat_checks, classifier)
+
+
+def compile_rules(config):
+    """把整个配置（已解析的字典）编译成 RuleSet"""
+    if not isinstance(config, dict) or not isinstance(config.get("rules", []), list):
+        raise RuleError("规则配置必须是包含 rules 列表的对象")
+    rules = [compile_rule(rule, i) for i, rule in enumerate(config.get("rules", []))]
+    default_target = config.get("default", CLASSIFICATION_FOLDERS[0])
+    if default_target == ROOT_TARGET:
+        raise RuleError("default 不能是根文件夹")
+    return RuleSet(rules, default_target, fingerprint=_fingerprint(config))
+
+
+def load_rules(path):
+    """从 .json 或 .toml 文件读入规则"""
+    if path.lower().endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise RuleError("读取 TOML 规则需要 Python 3.11+ 或安装 tomli，也可以改用 JSON 格式")
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    return compile_rules(config)
+
+
+def default_rules():
+    """内置规则：Excel文件放到根目录，包含关键词或中文字符的文件放到"处理图"，其余放到"原图\""""
+    return compile_rules({
+        "default": CLASSIFICATION_FOLDERS[0],
+        "rules": [
+            {"name": "excel", "extensions": EXCEL_EXTENSIONS, "target": ROOT_TARGET},
+            {"name": "modified", "keywords": KEYWORDS, "chinese": True, "target": CLASSIFICATION_FOLDERS[1]},
+        ],
+    })
+
+
+def _fingerprint(value):
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _normalize_extension(ext):
+    ext = str(ext).lower()
+    return ext if ext.startswith(".") else "." + ext
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+持久化的扫描索引
+
+索引保存在根文件夹下的 SQLite 文件中，记录每个文件夹的修改时间、子文件夹，
+以及其中待处理文件的大小、修改时间和分类结果。再次运行时，修改时间没有变化的
+文件夹只需一次 stat，不再列出其内容；子文件夹仍会逐个检查，因为深层的变化
+不会改变上层文件夹的修改时间。
+
+整理结束时重新读取被移入或移出文件的文件夹的修改时间，并从索引中删除已移走的文件，
+因此对一棵没有变化的树重复运行时，每个文件夹只需一次 stat。
+
+"原图"只记录文件数（其中的文件按上次的规则都已放对）。分类规则变化后这个结论不再成立，
+因此索引同时记录规则的指纹（rules_key），指纹不同时清空索引，所有文件夹重新列出。
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from .scanner import INTERNAL_PREFIX
+
+INDEX_FILENAME = INTERNAL_PREFIX + "_index.sqlite"
+
+SCHEMA_VERSION = 1
+
+# 修改时间与记录时间过于接近时不信任索引：记录之后同一时间戳内的修改无法被发现。
+# 时间戳只精确到秒的文件系统（如 FAT 的 2 秒）使用较大的窗口
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+FINE_RACY_WINDOW_NS = 50 * 1000 * 1000
+
+# 缓冲的写操作达到这个数量时写入数据库
+FLUSH_THRESHOLD = 5000
+
+_SEP = "\0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS dirs (
+    rel TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    recorded_ns INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    skipped INTEGER NOT NULL,
+    run_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    target TEXT,
+    PRIMARY KEY (dir, name)
+) WITHOUT ROWID;
+"""
+
+
+class ScanIndex:
+    """根文件夹的扫描索引（多线程安全：扫描线程写入，整理线程记录移动结果）
+
+    Args:
+        root_folder: 根文件夹路径
+        path: 索引文件路径，默认为根文件夹下的 .organizer_index.sqlite
+        rules_key: 分类规则的指纹（RuleSet.fingerprint），与索引中记录的不同时清空索引；
+            None 表示不检查
+    """
+
+    def __init__(self, root_folder, path=None, rules_key=None):
+        self.root_folder = root_folder
+        self.path = path or os.path.join(root_folder, INDEX_FILENAME)
+        self.rules_key = rules_key
+        self._lock = threading.Lock()
+        self._dir_rows = []
+        self._file_rows = []
+        self._seen = []
+        self._targets = []
+        self._moved = []
+        self._touched = set()
+        self.lookups = 0
+        self.hits = 0
+        self.conn = self._connect()
+        self.run_id = self._next_run_id()
+
+    def _connect(self):
+        try:
+            conn = self._open()
+        except sqlite3.DatabaseError:
+            # 索引只是缓存，损坏时删除重建
+            for suffix in ("", "-journal"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+            conn = self._open()
+        return conn
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # 日志文件保留在根文件夹中：WAL 或默认模式每次关闭都会删除日志文件，
+        # 从而改变根文件夹的修改时间，使下次运行无法命中索引
+        conn.execute("PRAGMA journal_mode=PERSIST")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row is None or int(row[0]) != SCHEMA_VERSION:
+            conn.executescript("DELETE FROM dirs; DELETE FROM files; DELETE FROM meta;")
+            conn.execute("INSERT INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        if self.rules_key is not None:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+            if row is None or row[0] != self.rules_key:
+                # 规则变化后"原图"中的文件需要重新检查
+                conn.executescript("DELETE FROM dirs; DELETE FROM files;")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (self.rules_key,))
+        return conn
+
+    def _next_run_id(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'run_id'").fetchone()
+        run_id = int(row[0]) + 1 if row else 1
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('run_id', ?)", (str(run_id),))
+        return run_id
+
+    def lookup(self, rel_dir, mtime_ns):
+        """文件夹未变化时返回 (文件名列表, 子文件夹名称列表, 跳过的文件数)，否则返回 None"""
+        with self._lock:
+            self.lookups += 1
+            row = self.conn.execute(
+                "SELECT mtime_ns, recorded_ns, subdirs, skipped FROM dirs WHERE rel = ?", (rel_dir,)).fetchone()
+            if row is None or row[0] != mtime_ns or _is_racy(mtime_ns, row[1]):
+                return None
+            names = [name for (name,) in self.conn.execute("SELECT name FROM files WHERE dir = ?", (rel_dir,))]
+            self.hits += 1
+            self._seen.append((self.run_id, rel_dir))
+            self._maybe_flush()
+        subdirs = row[2].split(_SEP) if row[2] else []
+        return names, subdirs, row[3]
+
+    def record_dir(self, rel_dir, mtime_ns, entries, subdirs, skipped):
+        """记录刚列出的文件夹（entries 中的文件会各 stat 一次以记录大小和修改时间）"""
+        file_rows = []
+        for entry in entries:
+            st = entry.stat()
+            file_rows.append((rel_dir, entry.name, st.st_size, st.st_mtime_ns))
+        with self._lock:
+            self._dir_rows.append((rel_dir, mtime_ns, time.time_ns(), _SEP.join(subdirs), skipped, self.run_id))
+            self._file_rows.append((rel_dir, file_rows))
+            self._maybe_flush()
+
+    def record_target(self, entry, target):
+        """记录文件的分类结果"""
+        with self._lock:
+            self._targets.append((target, entry.rel_dir, entry.name))
+            self._maybe_flush()
+
+    def file_moved(self, entry):
+        """文件已从源文件夹移走"""
+        with self._lock:
+            self._moved.append((entry.rel_dir, entry.name))
+            self._touched.add(entry.rel_dir)
+            self._maybe_flush()
+
+    def touch(self, rel_dir):
+        """标记文件夹的内容被本工具改变过（例如有文件移入），结束时更新其修改时间"""
+        with self._lock:
+            self._touched.add(rel_dir)
+
+    def add_subdir(self, rel_dir, name):
+        """本工具在 rel_dir 中创建了子文件夹"""
+        self.flush()
+        with self._lock:
+            row = self.conn.execute("SELECT subdirs FROM dirs WHERE rel = ?", (rel_dir,)).fetchone()
+            if row is not None:
+                subdirs = row[0].split(_SEP) if row[0] else []
+                if name not in subdirs:
+                    subdirs.append(name)
+                    self.conn.execute("UPDATE dirs SET subdirs = ? WHERE rel = ?", (_SEP.join(subdirs), rel_dir))
+            self._touched.add(rel_dir)
+
+    def remove_dir(self, rel_dir):
+        """本工具删除了已经清空的文件夹 rel_dir"""
+        self.flush()
+        parent, name = os.path.split(rel_dir)
+        with self._lock:
+            row = self.conn.execute("SELECT subdirs FROM dirs WHERE rel = ?", (parent,)).fetchone()
+            if row is not None and row[0]:
+                subdirs = [subdir for subdir in row[0].split(_SEP) if subdir != name]
+                self.conn.execute("UPDATE dirs SET subdirs = ? WHERE rel = ?", (_SEP.join(subdirs), parent))
+            self.conn.execute("DELETE FROM dirs WHERE rel = ?", (rel_dir,))
+            self.conn.execute("DELETE FROM files WHERE dir = ?", (rel_dir,))
+            self._touched.discard(rel_dir)
+            self._touched.add(parent)
+
+    def _maybe_flush(self):
+        pending = (len(self._dir_rows) + len(self._seen) + len(self._targets) + len(self._moved)
+                   + sum(len(rows) for _, rows in self._file_rows))
+        if pending >= FLUSH_THRESHOLD:
+            self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            if self._dir_rows:
+                conn.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?)", self._dir_rows)
+            for rel_dir, rows in self._file_rows:
+                # 重新列出的文件夹以本次结果为准
+                conn.execute("DELETE FROM files WHERE dir = ?", (rel_dir,))
+                if rows:
+                    conn.executemany("INSERT INTO files (dir, name, size, mtime_ns) VALUES (?, ?, ?, ?)", rows)
+            if self._seen:
+                conn.executemany("UPDATE dirs SET run_id = ? WHERE rel = ?", self._seen)
+            if self._targets:
+                conn.executemany("UPDATE files SET target = ? WHERE dir = ? AND name = ?", self._targets)
+            if self._moved:
+                conn.executemany("DELETE FROM files WHERE dir = ? AND name = ?", self._moved)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._dir_rows = []
+        self._file_rows = []
+        self._seen = []
+        self._targets = []
+        self._moved = []
+
+    def finish(self):
+        """整理结束：更新被改动文件夹的修改时间，删除本次没有访问到的文件夹，关闭数据库"""
+        self.flush()
+        with self._lock:
+            now_ns = time.time_ns()
+            updates = []
+            for rel_dir in self._touched:
+                try:
+                    mtime_ns = os.stat(os.path.join(self.root_folder, rel_dir)).st_mtime_ns
+                except OSError:
+                    continue
+                updates.append((mtime_ns, now_ns, rel_dir))
+            conn = self.conn
+            conn.execute("BEGIN")
+            conn.executemany("UPDATE dirs SET mtime_ns = ?, recorded_ns = ? WHERE rel = ?", updates)
+            stale = [rel for (rel,) in conn.execute("SELECT rel FROM dirs WHERE run_id != ?", (self.run_id,))]
+            conn.executemany("DELETE FROM dirs WHERE rel = ?", [(rel,) for rel in stale])
+            conn.executemany("DELETE FROM files WHERE dir = ?", [(rel,) for rel in stale])
+            conn.execute("COMMIT")
+            self._touched = set()
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _is_racy(mtime_ns, recorded_ns):
+    window = RACY_WINDOW_NS if mtime_ns % 1000000000 == 0 else FINE_RACY_WINDOW_NS
+    return mtime_ns >= recorded_ns - window
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""
+基于 os.scandir 的目录扫描器
+
+DirEntry 在读取目录时已经带回了条目类型，is_file()/is_dir() 不再需要
+额外的 stat 系统调用；扫描过程中同时携带相对路径和深度，
+判断文件是否位于根分类文件夹时无需再计算 os.path.relpath。
+"""
+
+import itertools
+import os
+import stat
+import threading
+import time
+from collections import deque
+
+# 根文件夹中的分类文件夹名称
+CLASSIFICATION_FOLDERS = ("原图", "处理图")
+
+# 根文件夹中以此开头的文件是本工具自己的数据文件（扫描索引等），不参与整理
+INTERNAL_PREFIX = ".organizer"
+
+
+class ScanStats:
+    """扫描过程中的系统调用计数，seconds 为列出文件夹所用的时间（不含等待消费者的时间）
+
+    列出文件夹时的计数只由一个线程修改（并行扫描时每个线程各用一个 ScanStats，在扫描线程中
+    合并）。条目的 stat() 可能发生在任意线程（消费者、写扫描索引的线程池），每个线程累加
+    自己的计数，读取 stat_calls 时求和，见 count_stat()。
+    """
+
+    FIELDS = ("directories", "cached_dirs", "resumed_dirs", "entries", "files", "scandir_calls", "dir_stat_calls",
+              "errors", "seconds")
+
+    __slots__ = FIELDS + ("_local", "_stat_counts")
+
+    def __init__(self):
+        self.directories = 0
+        self.cached_dirs = 0
+        # 继续上次中断的整理时，已经处理完、不再列出的文件夹数
+        self.resumed_dirs = 0
+        self.entries = 0
+        self.files = 0
+        self.scandir_calls = 0
+        # 列出文件夹时的 stat（跟随符号链接、读取文件夹修改时间）
+        self.dir_stat_calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self._local = threading.local()
+        # 各线程的条目 stat 计数，每个线程一个 [次数]
+        self._stat_counts = []
+
+    def count_stat(self):
+        """记录一次条目 stat；只修改当前线程的计数，不需要加锁"""
+        count = getattr(self._local, "count", None)
+        if count is None:
+            count = self._local.count = [0]
+            self._stat_counts.append(count)
+        count[0] += 1
+
+    @property
+    def stat_calls(self):
+        return self.dir_stat_calls + sum(count[0] for count in self._stat_counts)
+
+    @property
+    def syscalls(self):
+        """本次扫描实际产生的系统调用次数"""
+        return self.scandir_calls + self.stat_calls
+
+    @property
+    def legacy_syscalls(self):
+        """旧实现（listdir + isfile + isdir）扫描同一棵树所需的系统调用次数估算"""
+        # 每个文件夹一次 listdir，每个条目一次 isfile，非文件条目再一次 isdir
+        return self.directories + self.entries + (self.entries - self.files)
+
+    def merge(self, other):
+        """把另一个 ScanStats（例如其他线程列出文件夹时的计数）加到本对象上"""
+        for name in self.FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self._stat_counts.extend(other._stat_counts)
+
+    def as_dict(self):
+        result = {name: getattr(self, name) for name in self.FIELDS if name != "dir_stat_calls"}
+        result["stat_calls"] = self.stat_calls
+        result["seconds"] = round(self.seconds, 6)
+        result["syscalls"] = self.syscalls
+        result["legacy_syscalls"] = self.legacy_syscalls
+        return result
+
+    def summary(self):
+        text = (f"扫描 {self.directories} 个文件夹、{self.entries} 个条目，"
+                f"系统调用 {self.syscalls} 次（旧实现约 {self.legacy_syscalls} 次）")
+        if self.cached_dirs:
+            text += f"，跳过 {self.cached_dirs} 个未变化的文件夹"
+        if self.resumed_dirs:
+            text += f"，跳过 {self.resumed_dirs} 个上次已处理的文件夹"
+        return text
+
+
+class ScanEntry:
+    """扫描得到的文件条目
+
+    可以按 (文件路径, 文件名, 源文件夹) 解包，与旧的元组格式兼容。
+    """
+
+    __slots__ = ("path", "name", "folder", "rel_dir", "depth", "_dir_entry", "_stat", "_stats")
+
+    def __init__(self, path, name, folder, rel_dir, depth, dir_entry=None, stats=None):
+        self.path = path
+        self.name = name
+        self.folder = folder
+        self.rel_dir = rel_dir
+        self.depth = depth
+        self._dir_entry = dir_entry
+        self._stat = None
+        self._stats = stats
+
+    @classmethod
+    def from_dir_entry(cls, dir_entry, folder, rel_dir, depth, stats=None):
+        return cls(dir_entry.path, dir_entry.name, folder, rel_dir, depth, dir_entry, stats)
+
+    @property
+    def rel_folder(self):
+        """源文件夹相对于根文件夹的路径（根文件夹本身为 "."）"""
+        return self.rel_dir or os.curdir
+
+    def stat(self):
+        """返回文件状态并缓存，同一条目最多产生一次系统调用"""
+        if self._stat is None:
+            if self._stats is not None:
+                self._stats.count_stat()
+            if self._dir_entry is not None:
+                self._stat = self._dir_entry.stat()
+            else:
+                self._stat = os.stat(self.path)
+        return self._stat
+
+    def __iter__(self):
+        return iter((self.path, self.name, self.folder))
+
+    def __repr__(self):
+        return f"ScanEntry({self.path!r}, depth={self.depth})"
+
+
+class Scanner:
+    """广度优先遍历根文件夹，逐个产出需要处理的文件
+
+    Args:
+        root_folder: 根文件夹路径
+        on_skip: 跳过根分类文件夹时的回调 on_skip(相对路径, 跳过的文件数)
+        on_classification_folder: 发现名为分类文件夹的子文件夹时的回调 (相对路径)
+        on_error: 读取文件夹出错（权限错误除外）时的回调 on_error(文件夹路径, 异常)
+        on_folder: 列出一个文件夹后的回调 on_folder(相对路径, 深度, 名称数)，名称数包括文件、
+            子文件夹和跳过的文件（在扫描线程中调用，先于该文件夹中的文件产出）
+        classification_folders: 根文件夹下的分类文件夹名称，其中的文件不再处理
+        index: 可选的 ScanIndex；修改时间未变的文件夹直接使用索引中的内容，不再列出
+        correction_folder: 可选的根分类文件夹名称（通常是"原图"），其中的文件不跳过，
+            而是最先产出，由调用者检查是否放错了分类文件夹
+        on_listing: 列出一个文件夹后的回调 on_listing(相对路径, 产出的文件数, 子文件夹名称列表)
+            （在扫描线程中调用，先于该文件夹中的文件产出），用于记录哪些文件夹已经处理完
+        resume: 继续上次中断的扫描：{相对路径: 子文件夹名称列表}，其中的文件夹已经处理完，
+            不再列出，也不产出其中的文件，直接从记录的子文件夹继续
+    """
+
+    def __init__(self, root_folder, on_skip=None, on_classification_folder=None, on_error=None,
+                 classification_folders=CLASSIFICATION_FOLDERS, index=None, correction_folder=None,
+                 on_folder=None, on_listing=None, resume=None):
+        self.root_folder = root_folder
+        self.index = index
+        self.correction_folder = correction_folder
+        self.classification_folders = frozenset(classification_folders)
+        self.on_skip = on_skip
+        self.on_classification_folder = on_classification_folder
+        self.on_error = on_error
+        self.on_folder = on_folder
+        self.on_listing = on_listing
+        self.resume = resume or {}
+        self.stats = ScanStats()
+
+    def is_root_classification_dir(self, rel_dir, depth):
+        """判断相对路径为 rel_dir 的文件夹是否是根文件夹的分类文件夹"""
+        if depth == 0:
+            return os.path.basename(self.root_folder) in self.classification_folders
+        return depth == 1 and rel_dir in self.classification_folders
+
+    def entry_for_path(self, path):
+        """为根文件夹中的单个文件创建 ScanEntry；不需要处理的文件（在根分类文件夹中、
+        不在根文件夹内、不存在或不是普通文件）返回 None"""
+        try:
+            rel_path = os.path.relpath(path, self.root_folder)
+        except ValueError:
+            # Windows 上不同盘符的路径
+            return None
+        if rel_path in (os.curdir, os.pardir) or rel_path.startswith(os.pardir + os.sep):
+            return None
+        rel_dir, name = os.path.split(rel_path)
+        depth = len(rel_dir.split(os.sep)) if rel_dir else 0
+        if self.is_root_classification_dir(rel_dir, depth):
+            return None
+        if depth == 0 and name.startswith(INTERNAL_PREFIX):
+            return None
+
+        folder = os.path.join(self.root_folder, rel_dir) if rel_dir else self.root_folder
+        entry = ScanEntry(os.path.join(folder, name), name, folder, rel_dir, depth, stats=self.stats)
+        try:
+            if not stat.S_ISREG(entry.stat().st_mode):
+                return None
+        except OSError:
+            return None
+        self.stats.files += 1
+        return entry
+
+    def scan(self):
+        """遍历根文件夹，产出 ScanEntry
+
+        设置了 correction_folder 时，根文件夹列出后立即列出该文件夹，其中的文件
+        在根文件夹和其他文件夹的文件之前产出。
+        """
+        queue = deque()
+        self._enqueue_folder(queue, self.root_folder, "", 0)
+        correction_folder = self.correction_folder
+        # 等"原图"中的文件产出后再产出的根文件夹中的文件
+        held = None
+
+        while queue:
+            (current_folder, rel_dir, depth), listing = self._next_listing(queue)
+            if listing is None:
+                if held is not None:
+                    yield from held
+                    held = None
+                continue
+            entries, subdirs, skipped = listing
+            if skipped and self.on_skip is not None:
+                self.on_skip(rel_dir, skipped)
+            if self.on_folder is not None:
+                self.on_folder(rel_dir, depth, len(entries) + len(subdirs) + skipped)
+            if self.on_listing is not None:
+                self.on_listing(rel_dir, len(entries), subdirs)
+
+            if depth == 0 and correction_folder is not None and correction_folder in subdirs:
+                # 修正会腾出该文件夹中的文件名，其中的文件必须最先交给调用者
+                subdirs = [name for name in subdirs if name != correction_folder]
+                self._enqueue(queue, correction_folder, rel_dir, current_folder, depth, first=True)
+                held = entries
+                entries = ()
+            elif held is not None:
+                entries = itertools.chain(entries, held)
+                held = None
+
+            yield from entries
+
+            # 所有子文件夹都加入队列，包括分类文件夹，确保嵌套分类文件夹中的文件也能被处理
+            for name in subdirs:
+                self._enqueue(queue, name, rel_dir, current_folder, depth)
+
+        if held is not None:
+            # "原图"上次已经处理完，没有再列出
+            yield from held
+
+    def _enqueue(self, queue, name, rel_dir, current_folder, depth, first=False):
+        child_rel = os.path.join(rel_dir, name) if rel_dir else name
+        if name in self.classification_folders and self.on_classification_folder is not None:
+            self.on_classification_folder(child_rel)
+        self._enqueue_folder(queue, os.path.join(current_folder, name), child_rel, depth + 1, first)
+
+    def _enqueue_folder(self, queue, folder, rel_dir, depth, first=False):
+        subdirs = self.resume.get(rel_dir)
+        if subdirs is None:
+            item = (folder, rel_dir, depth)
+            if first:
+                queue.appendleft(item)
+            else:
+                queue.append(item)
+            return
+        # 上次已经处理完的文件夹：不列出，直接加入记录的子文件夹（"原图"仍然最先列出）
+        self.stats.resumed_dirs += 1
+        correction_folder = self.correction_folder
+        if depth == 0 and correction_folder is not None and correction_folder in subdirs:
+            self._enqueue(queue, correction_folder, rel_dir, folder, depth, first=True)
+        for name in subdirs:
+            if depth == 0 and name == correction_folder:
+                continue
+            self._enqueue(queue, name, rel_dir, folder, depth)
+
+    def _next_listing(self, queue):
+        """取出队首的文件夹并列出，返回 ((文件夹路径, 相对路径, 深度), _visit() 的结果)"""
+        item = queue.popleft()
+        return item, self._visit(*item)
+
+    def _visit(self, current_folder, rel_dir, depth, stats=None):
+        """列出一个文件夹（或从索引中读出）
+
+        Args:
+            stats: 记录列出过程的 ScanStats，默认为 self.stats
+
+        Returns:
+            (文件条目列表, 子文件夹名称列表, 跳过的文件数)，出错时返回 None
+        """
+        if stats is None:
+            stats = self.stats
+        index = self.index
+        # 每个文件夹计时一次，相对于 scandir 本身可以忽略
+        start = time.perf_counter()
+
+        try:
+            listing = None
+            if index is not None:
+                stats.dir_stat_calls += 1
+                mtime_ns = os.stat(current_folder).st_mtime_ns
+                listing = self._cached_listing(current_folder, rel_dir, depth, mtime_ns, stats)
+            if listing is None:
+                listing = self._list_folder(current_folder, rel_dir, depth, stats)
+                if index is not None:
+                    self._record_listing(rel_dir, depth, mtime_ns, listing)
+            return listing
+        except PermissionError:
+            # 跳过没有权限访问的文件夹
+            stats.errors += 1
+            return None
+        except OSError as e:
+            stats.errors += 1
+            if self.on_error is not None:
+                self.on_error(current_folder, e)
+            return None
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+    def _list_folder(self, current_folder, rel_dir, depth, stats):
+        """用一次 scandir 列出文件夹，返回 (文件条目列表, 子文件夹名称列表, 跳过的文件数)"""
+        stats.scandir_calls += 1
+        with os.scandir(current_folder) as it:
+            return self._collect(it, current_folder, rel_dir, depth, stats)
+
+    def _is_correction_dir(self, rel_dir, depth):
+        return depth == 1 and rel_dir == self.correction_folder
+
+    def _cached_listing(self, current_folder, rel_dir, depth, mtime_ns, stats):
+        """文件夹自上次扫描以来没有变化时，用索引中的内容组合出列出结果，否则返回 None"""
+        return self._index_listing(current_folder, rel_dir, depth, self.index.lookup(rel_dir, mtime_ns), stats)
+
+    def _index_listing(self, current_folder, rel_dir, depth, cached, stats):
+        """把 ScanIndex.lookup() 的结果组合成列出结果；cached 为 None（文件夹有变化）时返回 None"""
+        if cached is None:
+            return None
+        stats.cached_dirs += 1
+        names, subdirs, skipped = cached
+        entries = [ScanEntry(os.path.join(current_folder, name), name, current_folder, rel_dir, depth)
+                   for name in names]
+        return entries, subdirs, skipped
+
+    def _record_listing(self, rel_dir, depth, mtime_ns, listing):
+        entries, subdirs, skipped = listing
+        if self._is_correction_dir(rel_dir, depth):
+            # 只记录文件数：上次整理后没有变化的"原图"中没有放错的文件，不必逐个 stat
+            self.index.record_dir(rel_dir, mtime_ns, [], subdirs, len(entries))
+        else:
+            self.index.record_dir(rel_dir, mtime_ns, entries, subdirs, skipped)
+
+    def _collect(self, dir_entries, current_folder, rel_dir, depth, stats):
+        """把一个文件夹的 DirEntry 分为文件条目和子文件夹
+
+        列出过程计入 stats；条目之后的 stat() 总是计入 self.stats（见 ScanStats.count_stat()）。
+
+        Returns:
+            (文件条目列表, 子文件夹名称列表, 跳过的文件数)
+        """
+        skip_files = self.is_root_classification_dir(rel_dir, depth) and not self._is_correction_dir(rel_dir, depth)
+        entries = []
+        subdirs = []
+        skipped = 0
+
+        for dir_entry in dir_entries:
+            stats.entries += 1
+            # 符号链接需要跟随一次 stat 才能确定目标类型
+            if dir_entry.is_symlink():
+                stats.dir_stat_calls += 1
+            if dir_entry.is_file():
+                stats.files += 1
+                if skip_files:
+                    skipped += 1
+                elif depth == 0 and dir_entry.name.startswith(INTERNAL_PREFIX):
+                    continue
+                else:
+                    entries.append(ScanEntry.from_dir_entry(dir_entry, current_folder, rel_dir, depth, self.stats))
+            elif dir_entry.is_dir():
+                subdirs.append(dir_entry.name)
+        stats.directories += 1
+        return entries, subdirs, skipped
+
+
+def scan_files(root_folder, **callbacks):
+    """便捷函数：扫描根文件夹并返回 (文件条目列表, 扫描统计)"""
+    scanner = Scanner(root_folder, **callbacks)
+    entries = list(scanner.scan())
+    return entries, scanner.stats
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+文件移动层
+
+shutil.move 不会告诉调用者一次移动是廉价的 rename 还是复制加删除。
+FileMover 对每个源文件夹只比较一次 st_dev：同一设备直接 os.rename，
+不同设备时用内核复制（os.copy_file_range，其次 os.sendfile），
+两者都不可用时退回固定大小缓冲区的读写，内存占用与文件大小无关。
+"""
+
+import errno
+import os
+import shutil
+import threading
+
+# 每次内核复制调用传输的字节数
+KERNEL_CHUNK_SIZE = 64 * 1024 * 1024
+
+# 退回用户态复制时的缓冲区大小
+BUFFER_SIZE = 1024 * 1024
+
+# 这些错误表示当前文件系统不支持该内核复制方式，应换用下一种方式
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF,
+                       getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+                       getattr(errno, "ENOTSUP", errno.EINVAL)}
+
+
+class TransferStats:
+    """移动方式计数（多线程安全）"""
+
+    FIELDS = ("renames", "copies", "bytes_copied", "bytes_moved", "copy_file_range", "sendfile", "buffered", "links",
+              "bytes_linked")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def summary(self):
+        text = (f"同盘重命名 {self.renames} 次，跨盘复制 {self.copies} 次，"
+                f"复制 {format_bytes(self.bytes_copied)}")
+        if self.links:
+            text += f"，硬链接 {self.links} 次（{format_bytes(self.bytes_linked)}）"
+        if self.bytes_moved:
+            text += f"，共移动 {format_bytes(self.bytes_moved)}"
+        return text
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class FileMover:
+    """带设备判断的文件移动，可作为 MoveExecutor 的 move_func 使用
+
+    Args:
+        count_bytes: 是否统计移动的字节数（bytes_moved，包括同盘重命名的文件大小）；
+            重命名前要多 stat 一次源文件，只在记录运行指标时开启
+    """
+
+    def __init__(self, count_bytes=False):
+        self.count_bytes = count_bytes
+        self.stats = TransferStats()
+        # 文件夹路径 -> st_dev，每个文件夹只 stat 一次
+        self._devices = {}
+
+    def device_of(self, folder):
+        device = self._devices.get(folder)
+        if device is None:
+            device = os.stat(folder).st_dev
+            self._devices[folder] = device
+        return device
+
+    def same_device(self, src, dst):
+        return self.device_of(os.path.dirname(src)) == self.device_of(os.path.dirname(dst))
+
+    def __call__(self, src, dst):
+        self.move(src, dst)
+
+    def move(self, src, dst):
+        """把 src 移动到 dst，返回 "rename" 或 "copy\""""
+        if self.same_device(src, dst):
+            size = os.lstat(src).st_size if self.count_bytes else 0
+            try:
+                os.rename(src, dst)
+                self.stats.add(renames=1, bytes_moved=size)
+                return "rename"
+            except OSError as e:
+                # 绑定挂载等情况下 st_dev 相同但仍不能跨挂载点重命名
+                if e.errno != errno.EXDEV:
+                    raise
+
+        if os.path.islink(src):
+            size = os.lstat(src).st_size if self.count_bytes else 0
+            shutil.move(src, dst)
+            self.stats.add(copies=1, bytes_moved=size)
+            return "copy"
+
+        method, copied = self.copy_file(src, dst)
+        try:
+            shutil.copystat(src, dst)
+            os.unlink(src)
+        except BaseException:
+            os.unlink(dst)
+            raise
+        self.stats.add(copies=1, bytes_copied=copied, bytes_moved=copied if self.count_bytes else 0, **{method: 1})
+        return "copy"
+
+    def link(self, src, dst, references):
+        """用硬链接代替移动：dst 链接到 references 中第一个可用且大小相同的文件，然后删除 src
+
+        references 中的文件都不可用（已不存在、大小变化、跨设备或文件系统不支持硬链接）时普通移动。
+        返回 "link"、"rename" 或 "copy"。
+        """
+        size = os.stat(src).st_size
+        for reference in references:
+            try:
+                if os.stat(reference).st_size != size:
+                    continue
+                os.link(reference, dst)
+            except OSError:
+                continue
+            os.unlink(src)
+            self.stats.add(links=1, bytes_linked=size)
+            return "link"
+        return self.move(src, dst)
+
+    def copy_file(self, src, dst):
+        """复制文件内容，返回 (使用的方式, 复制的字节数)；失败时删除不完整的目标文件"""
+        with open(src, "rb") as fsrc:
+            # 目标已存在时 open 抛出 FileExistsError，此时 dst 不是本次创建的，不能删除
+            with open(dst, "xb") as fdst:
+                try:
+                    return self._copy_fileobj(fsrc, fdst)
+                except BaseException:
+                    fdst.close()
+                    os.unlink(dst)
+                    raise
+
+    def _copy_fileobj(self, fsrc, fdst):
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+
+        if hasattr(os, "copy_file_range"):
+            copied = _kernel_copy(lambda offset: os.copy_file_range(infd, outfd, KERNEL_CHUNK_SIZE))
+            if copied is not None:
+                return "copy_file_range", copied
+
+        if hasattr(os, "sendfile") and os.name == "posix":
+            copied = _kernel_copy(lambda offset: os.sendfile(outfd, infd, offset, KERNEL_CHUNK_SIZE))
+            if copied is not None:
+                return "sendfile", copied
+
+        # 用户态复制，复用同一个缓冲区
+        buffer = bytearray(BUFFER_SIZE)
+        view = memoryview(buffer)
+        copied = 0
+        readinto = fsrc.readinto
+        write = fdst.write
+        while True:
+            n = readinto(buffer)
+            if not n:
+                break
+            write(view[:n])
+            copied += n
+        return "buffered", copied
+
+
+def _kernel_copy(step):
+    """循环调用内核复制直到文件结束，返回复制的字节数；第一次调用就不受支持时返回 None"""
+    copied = 0
+    while True:
+        try:
+            n = step(copied)
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED_ERRNOS:
+                return None
+            raise
+        if n == 0:
+            return copied
+        copied += n
@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+"""
+监视模式：持续整理新到达的文件
+
+Linux 上使用 inotify（通过 ctypes 调用 libc，不需要第三方依赖）；其他平台或 inotify
+不可用时退回到轮询：每隔一段时间 stat 一次每个文件夹，只重新列出修改时间变化的
+文件夹，并与缓存的文件大小和修改时间比较，找出新文件。
+
+新文件不会立即移动：一连串的事件会被合并，文件在 latency 秒内没有新的事件、并且
+大小和修改时间不再变化之后，才按与整理相同的规则移动。没有待处理的文件时，
+inotify 后端一直阻塞在 select 上，不占用 CPU。
+"""
+
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+
+# 文件最后一次变化后等待多少秒再移动
+DEFAULT_LATENCY = 2.0
+
+# 轮询后端的检查间隔（秒）
+POLL_INTERVAL = 2.0
+
+# 修改时间距当前时间在此范围内的文件夹下次轮询时重新列出：
+# 同一时间戳内稍后创建的文件不会改变文件夹的修改时间
+POLL_RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+# inotify 事件丢失（队列溢出）时 wait() 的返回值，需要重新整理整个文件夹
+RESCAN = object()
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+
+# struct inotify_event 的固定部分：wd, mask, cookie, len
+_EVENT = struct.Struct("iIII")
+
+_READ_SIZE = 64 * 1024
+
+
+def _load_libc():
+    """加载提供 inotify 的 libc，不支持时返回 None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def _last_error(path=None):
+    import ctypes
+
+    errno = ctypes.get_errno()
+    return OSError(errno, os.strerror(errno), path)
+
+
+class InotifyBackend:
+    """用 inotify 递归监视根文件夹（根文件夹中的分类文件夹除外）
+
+    Args:
+        root_folder: 根文件夹路径
+        excluded: 根文件夹中不监视的子文件夹名称
+    """
+
+    name = "inotify"
+
+    def __init__(self, root_folder, excluded=()):
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("当前系统不支持 inotify")
+        self._libc = libc
+        self.root_folder = root_folder
+        self.excluded = frozenset(excluded)
+        self._watches = {}
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise _last_error()
+        self._wake_r, self._wake_w = os.pipe()
+        try:
+            self._add_tree(root_folder, None)
+        except BaseException:
+            self.close()
+            raise
+
+    def _add_tree(self, folder, found):
+        """监视 folder 及其所有子文件夹；found 不为 None 时把其中已有的文件加入 found
+
+        先添加监视再列出内容，列出期间新建的文件也不会遗漏。
+        """
+        stack = [folder]
+        while stack:
+            folder = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), WATCH_MASK)
+            if wd < 0:
+                error = _last_error(folder)
+                if isinstance(error, (FileNotFoundError, NotADirectoryError, PermissionError)):
+                    continue
+                raise error
+            self._watches[wd] = folder
+            try:
+                with os.scandir(folder) as it:
+                    for dir_entry in it:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            if not self._is_excluded(folder, dir_entry.name):
+                                stack.append(dir_entry.path)
+                        elif found is not None and dir_entry.is_file():
+                            found.append(dir_entry.path)
+            except OSError:
+                continue
+
+    def _is_excluded(self, folder, name):
+        return folder == self.root_folder and name in self.excluded
+
+    def wait(self, timeout):
+        """等待事件，返回变化的文件路径列表；timeout 为 None 时一直等到有事件或 wake()"""
+        readable, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+        if self._wake_r in readable:
+            os.read(self._wake_r, _READ_SIZE)
+        if self._fd not in readable:
+            return []
+        return self._read_events()
+
+    def _read_events(self):
+        changed = []
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & IN_IGNORED:
+                    # 文件夹已被删除
+                    self._watches.pop(wd, None)
+                    continue
+                folder = self._watches.get(wd)
+                if folder is None or not name:
+                    continue
+                path = os.path.join(folder, name)
+                if not mask & IN_ISDIR:
+                    changed.append(path)
+                elif mask & (IN_CREATE | IN_MOVED_TO) and not self._is_excluded(folder, name):
+                    # 新建或移入的文件夹：监视它，并把其中已有的文件当作新文件
+                    # （移动到别处的文件夹重新添加监视时会得到同一个 wd，路径随之更新）
+                    self._add_tree(path, changed)
+        return RESCAN if overflow else changed
+
+    def wake(self):
+        """让正在 wait() 的线程立即返回"""
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            # 已经关闭
+            pass
+
+    def close(self):
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._watches = {}
+
+
+class PollingBackend:
+    """定期检查文件夹修改时间的轮询监视
+
+    每次轮询对每个文件夹 stat 一次，只重新列出修改时间变化的文件夹，
+    新出现的文件以及大小或修改时间与缓存不同的文件视为变化。
+
+    Args:
+        root_folder: 根文件夹路径
+        excluded: 根文件夹中不监视的子文件夹名称
+        interval: 轮询间隔（秒）
+    """
+
+    name = "poll"
+
+    def __init__(self, root_folder, excluded=(), interval=POLL_INTERVAL):
+        self.root_folder = root_folder
+        self.excluded = frozenset(excluded)
+        self.interval = interval
+        # 文件夹路径 -> (修改时间, {文件名: (大小, 修改时间)})
+        self._dirs = {}
+        self._wake = threading.Event()
+        self._refresh(root_folder, None)
+        self._next_poll = time.monotonic() + interval
+
+    def _is_excluded(self, folder, name):
+        return folder == self.root_folder and name in self.excluded
+
+    def _refresh(self, folder, changed):
+        """重新列出文件夹，把新出现或变化的文件加入 changed；新的子文件夹递归列出"""
+        stack = [folder]
+        while stack:
+            folder = stack.pop()
+            previous = self._dirs.get(folder)
+            old_files = previous[1] if previous is not None else {}
+            files = {}
+            new_dirs = []
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+                with os.scandir(folder) as it:
+                    for dir_entry in it:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            if dir_entry.path not in self._dirs and not self._is_excluded(folder, dir_entry.name):
+                                new_dirs.append(dir_entry.path)
+                        elif dir_entry.is_file():
+                            st = dir_entry.stat()
+                            signature = (st.st_size, st.st_mtime_ns)
+                            files[dir_entry.name] = signature
+                            if changed is not None and old_files.get(dir_entry.name) != signature:
+                                changed.append(dir_entry.path)
+            except OSError:
+                self._dirs.pop(folder, None)
+                continue
+            if time.time_ns() - mtime_ns < POLL_RACY_WINDOW_NS:
+                # 修改时间过新，下次轮询时再列出一次
+                mtime_ns = -1
+            self._dirs[folder] = (mtime_ns, files)
+            stack.extend(new_dirs)
+
+    def poll(self):
+        """检查一遍所有文件夹，返回变化的文件路径列表"""
+        changed = []
+        for folder, (mtime_ns, _files) in list(self._dirs.items()):
+            try:
+                current = os.stat(folder).st_mtime_ns
+            except OSError:
+                # 文件夹已被删除
+                self._dirs.pop(folder, None)
+                continue
+            if current != mtime_ns:
+                self._refresh(folder, changed)
+        return changed
+
+    def wait(self, timeout):
+        """等到下一次轮询（或 timeout 先到）后返回变化的文件路径列表"""
+        delay = self._next_poll - time.monotonic()
+        if timeout is not None and timeout < delay:
+            self._wake.wait(max(timeout, 0))
+            self._wake.clear()
+            return []
+        if delay > 0 and self._wake.wait(delay):
+            self._wake.clear()
+            return []
+        self._next_poll = time.monotonic() + self.interval
+        return self.poll()
+
+    def wake(self):
+        self._wake.set()
+
+    def close(self):
+        self._dirs = {}
+
+
+def file_signature(path):
+    """返回普通文件的 (大小, 修改时间)，文件不存在或不是普通文件时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class PendingFiles:
+    """等待稳定的新文件
+
+    文件在 latency 秒内没有新的事件，并且大小和修改时间与上次检查时相同，才算就绪；
+    否则重新计时。检查时文件已不存在（临时文件被改名等）则直接丢弃。
+
+    Args:
+        latency: 文件最后一次变化后等待的秒数
+    """
+
+    def __init__(self, latency=DEFAULT_LATENCY):
+        self.latency = latency
+        # 路径 -> [截止时间, 上次检查时的 (大小, 修改时间)]
+        self._files = {}
+
+    def __len__(self):
+        return len(self._files)
+
+    def add(self, path, now):
+        item = self._files.get(path)
+        if item is None:
+            self._files[path] = [now + self.latency, file_signature(path)]
+        else:
+            item[0] = now + self.latency
+
+    def next_deadline(self):
+        """最早的截止时间，没有待处理文件时返回 None"""
+        if not self._files:
+            return None
+        return min(item[0] for item in self._files.values())
+
+    def pop_ready(self, now):
+        """取出所有已稳定的文件路径"""
+        ready = []
+        for path, item in list(self._files.items()):
+            if item[0] > now:
+                continue
+            signature = file_signature(path)
+            if signature is None:
+                del self._files[path]
+            elif signature != item[1]:
+                # 仍在写入，重新计时
+                item[0] = now + self.latency
+                item[1] = signature
+            else:
+                del self._files[path]
+                ready.append(path)
+        return ready
+
+
+class FolderWatcher:
+    """持续监视根文件夹，把新到达的文件按整理规则移动
+
+    Args:
+        engine: OrganizerEngine 实例，日志和状态通过它的监听器输出
+        root_folder: 根文件夹路径
+        latency: 文件最后一次变化后等待多少秒再移动
+        backend: "auto"（优先 inotify）、"inotify" 或 "poll"
+        poll_interval: 轮询后端的检查间隔（秒）
+        initial_pass: 开始监视前是否先完整整理一次
+    """
+
+    def __init__(self, engine, root_folder, latency=DEFAULT_LATENCY, backend="auto",
+                 poll_interval=POLL_INTERVAL, initial_pass=True):
+        if backend not in ("auto", "inotify", "poll"):
+            raise ValueError(f"未知的监视方式: {backend}")
+        self.engine = engine
+        self.root_folder = root_folder
+        self.latency = latency
+        self.backend_name = backend
+        self.poll_interval = poll_interval
+        self.initial_pass = initial_pass
+        self.pending = PendingFiles(latency)
+        self.backend = None
+        self.processed_count = 0
+        self.error_count = 0
+        self._stopped = threading.Event()
+
+    def create_backend(self):
+        excluded = self.engine.rules.target_folders
+        if self.backend_name != "poll":
+            try:
+                return InotifyBackend(self.root_folder, excluded)
+            except OSError as e:
+                if self.backend_name == "inotify":
+                    raise
+                self.engine.log_message(f"无法使用 inotify（{str(e)}），改用轮询")
+        return PollingBackend(self.root_folder, excluded, self.poll_interval)
+
+    def run(self):
+        """监视根文件夹，直到 stop() 被调用"""
+        engine = self.engine
+        # 先开始监视再做首次整理，整理期间到达的文件不会遗漏
+        self.backend = self.create_backend()
+        try:
+            engine.log_message(f"👀 开始监视: {self.root_folder}（{self.backend.name}，延迟 {self.latency:g} 秒）")
+            if self.initial_pass:
+                self._organize_all()
+            engine.listener.status("正在监视新文件...")
+            while not self._stopped.is_set():
+                self.step()
+        finally:
+            self.backend.close()
+            engine.log_message("停止监视")
+
+    def step(self):
+        """等待一次事件，并整理已经稳定的文件"""
+        deadline = self.pending.next_deadline()
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            changed = self.backend.wait(timeout)
+        except OSError as e:
+            # 例如子文件夹太多，超过了 inotify 监视数量的上限
+            self.engine.log_message(f"监视出错（{str(e)}），改用轮询")
+            self.backend_name = "poll"
+            changed = RESCAN
+
+        if changed is RESCAN:
+            # 重新建立监视（期间新建的文件夹可能还没有被监视），再完整整理一次
+            self.engine.log_message("部分文件变化未能记录，重新整理整个文件夹")
+            self.backend.close()
+            self.backend = self.create_backend()
+            self._organize_all()
+            changed = []
+
+        now = time.monotonic()
+        for path in changed:
+            self.pending.add(path, now)
+        ready = self.pending.pop_ready(now)
+        if ready:
+            self._organize_paths(ready)
+
+    def _organize_all(self):
+        try:
+            summary = self.engine.organize_files(self.root_folder)
+        except Exception as e:
+            self.engine.log_message(f"发生错误: {str(e)}")
+            self.error_count += 1
+            return
+        self.processed_count += summary.total_processed
+        self.error_count += summary.error_count
+
+    def _organize_paths(self, paths):
+        try:
+            summary = self.engine.organize_paths(self.root_folder, paths)
+        except Exception as e:
+            self.engine.log_message(f"发生错误: {str(e)}")
+            self.error_count += 1
+            return
+        if summary.processed_count or summary.error_count:
+            self.processed_count += summary.processed_count
+            self.error_count += summary.error_count
+            self.engine.listener.status(f"正在监视新文件...（已整理 {self.processed_count} 个文件）")
+
+    def stop(self):
+        """停止监视（可在其他线程中调用）"""
+        self._stopped.set()
+        if self.backend is not None:
+            self.backend.wake()
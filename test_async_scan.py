@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 asyncio 扫描：在模拟网络延迟的文件系统替身上，结果与串行扫描相同，
+同时进行的调用数不超过上限，耗时远小于串行扫描
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from organizer.async_scan import AsyncScanner, LatencyFileSystem
+from organizer.engine import OrganizerEngine
+from organizer.scan_index import ScanIndex
+from organizer.scanner import Scanner
+
+# 每次文件系统调用的模拟延迟（秒）
+LATENCY = 0.02
+
+
+def create_tree(root_folder, batches=6, subfolders=8):
+    """batches 个批次文件夹，每个有 subfolders 个子文件夹，每个子文件夹 3 个文件"""
+    for batch in range(batches):
+        for sub in range(subfolders):
+            folder = os.path.join(root_folder, f"批次{batch}", f"子文件夹{sub}")
+            os.makedirs(folder)
+            for name in ("IMG_0001.jpg", "调色.jpg", "汇总.xlsx"):
+                with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+                    f.write(name)
+    os.makedirs(os.path.join(root_folder, "原图"))
+    with open(os.path.join(root_folder, "原图", "精修.jpg"), 'w', encoding='utf-8') as f:
+        f.write("精修")
+
+
+def test_bounded_concurrency_on_slow_filesystem():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        create_tree(temp_dir)
+        serial = Scanner(temp_dir, correction_folder="原图")
+        expected = [entry.path for entry in serial.scan()]
+        folders = serial.stats.directories
+        assert folders == 56
+
+        filesystem = LatencyFileSystem(latency=LATENCY, jitter=LATENCY / 2, seed=1)
+        scanner = AsyncScanner(temp_dir, concurrency=8, filesystem=filesystem, correction_folder="原图")
+        start = time.perf_counter()
+        found = [entry.path for entry in scanner.scan()]
+        elapsed = time.perf_counter() - start
+
+        # 条目和顺序与串行扫描相同，"原图"中的文件最先产出
+        assert found == expected
+        assert os.path.basename(found[0]) == "精修.jpg"
+        assert scanner.stats.directories == folders
+        assert filesystem.calls == folders
+        assert 1 < filesystem.max_in_flight <= 8
+        # 串行至少需要 folders * LATENCY 秒；层与层之间不能重叠，留出足够的余量
+        assert elapsed < folders * LATENCY / 2
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+class FailingFileSystem(LatencyFileSystem):
+    """列出指定文件夹时出错的替身"""
+
+    def __init__(self, failing, **kwargs):
+        super().__init__(**kwargs)
+        self.failing = failing
+
+    async def scandir(self, path):
+        if path == self.failing:
+            await self._wait()
+            raise OSError(5, "模拟的网络错误", path)
+        return await super().scandir(path)
+
+
+def test_async_scan_with_index_and_errors():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        create_tree(temp_dir, batches=2, subfolders=2)
+        # 刚创建的文件夹修改时间与记录时间过近，索引不会信任
+        time.sleep(0.1)
+        failing = os.path.join(temp_dir, "批次1")
+        errors = []
+        index = ScanIndex(temp_dir)
+        scanner = AsyncScanner(temp_dir, concurrency=4, filesystem=FailingFileSystem(failing, latency=0.001),
+                               index=index, on_error=lambda folder, e: errors.append(folder))
+        found = list(scanner.scan())
+        index.finish()
+        # 出错的文件夹报告后跳过，其他文件夹照常扫描并记入索引
+        assert errors == [failing]
+        assert scanner.stats.errors == 1
+        assert sorted({entry.rel_dir for entry in found}) == [os.path.join("批次0", "子文件夹0"),
+                                                             os.path.join("批次0", "子文件夹1")]
+
+        # 第二次扫描时没有变化的文件夹直接使用索引；查询索引不在事件循环所在的线程中进行
+        index = ThreadRecordingIndex(temp_dir)
+        scanner = AsyncScanner(temp_dir, concurrency=4, filesystem=LatencyFileSystem(latency=0.001), index=index)
+        assert len(list(scanner.scan())) == 12
+        index.finish()
+        assert scanner.stats.cached_dirs > 0
+        assert index.threads and threading.get_ident() not in index.threads
+
+        # 消费者提前停止时事件循环正常关闭
+        iterator = AsyncScanner(temp_dir, concurrency=2).scan()
+        next(iterator)
+        iterator.close()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+class ThreadRecordingIndex(ScanIndex):
+    """记录 lookup() 和 record_dir() 在哪些线程中调用的 ScanIndex"""
+
+    def __init__(self, root_folder):
+        super().__init__(root_folder)
+        self.threads = set()
+
+    def lookup(self, rel_dir, mtime_ns):
+        self.threads.add(threading.get_ident())
+        return super().lookup(rel_dir, mtime_ns)
+
+    def record_dir(self, rel_dir, mtime_ns, entries, subdirs, skipped):
+        self.threads.add(threading.get_ident())
+        super().record_dir(rel_dir, mtime_ns, entries, subdirs, skipped)
+
+
+def test_engine_with_scan_concurrency():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        create_tree(temp_dir, batches=2, subfolders=3)
+        summary = OrganizerEngine(scan_concurrency=8).organize_files(temp_dir)
+        assert summary.error_count == 0
+        assert summary.corrected_count == 1
+        assert summary.processed_count == 18
+        assert summary.scan_stats.directories == 1 + 1 + 2 + 6
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_bounded_concurrency_on_slow_filesystem()
+    test_async_scan_with_index_and_errors()
+    test_engine_with_scan_concurrency()
+    print("asyncio 扫描测试通过")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试编译后的文件名分类器与原来的内联判断结果一致
+"""
+
+import random
+
+from organizer.classifier import KEYWORDS, FilenameClassifier
+
+
+def inline_is_modified(filename, keywords=KEYWORDS):
+    """原来在 organize_files 中内联的判断"""
+    has_keywords = any(keyword in filename for keyword in keywords)
+    has_chinese = any('\u4e00' <= char <= '\u9fff' for char in filename)
+    return has_keywords or has_chinese
+
+
+def test_matches_inline_logic():
+    names = ["IMG_0001.jpg", "修改后.png", "a增加b.jpg", "照片.JPG", "scan.tif", "",
+             "䷿.jpg", "一.jpg", "鿿.jpg", "ꀀ.jpg", "ｆｕｌｌ.jpg", "report.xlsx"]
+    rng = random.Random(3)
+    alphabet = "abcXYZ_-.0123一鿿あ가改后拷贝"
+    names += ["".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 12))) for _ in range(2000)]
+
+    classifier = FilenameClassifier()
+    expected = [inline_is_modified(name) for name in names]
+    assert [classifier.is_modified(name) for name in names] == expected
+    assert FilenameClassifier().is_modified_batch(names) == expected
+    # 缓存命中后结果不变
+    assert classifier.is_modified_batch(names) == expected
+
+
+def test_custom_keywords_without_chinese():
+    classifier = FilenameClassifier(keywords=["_edit", "final"], cjk_range=None)
+    assert classifier.classify_batch(["a_edit.jpg", "b.jpg", "照片.jpg", "final.png"]) == ["处理图", "原图", "原图", "处理图"]
+    assert classifier.pattern.pattern.count("|") == 1
+
+
+def test_empty_rules_match_nothing():
+    classifier = FilenameClassifier(keywords=[], cjk_range=None)
+    assert classifier.is_modified_batch(["修改后.jpg", "a.jpg"]) == [False, False]
+
+
+if __name__ == "__main__":
+    test_matches_inline_logic()
+    test_custom_keywords_without_chinese()
+    test_empty_rules_match_nothing()
+    print("分类器测试通过")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试暂停、继续和取消：取消后已完成的移动保留，使用移动日志时下次整理从中断处继续
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from organizer.control import RunControl
+from organizer.engine import CallbackListener, OrganizerEngine
+from organizer.journal import JOURNAL_FILENAME, MoveJournal
+from organizer.transfer import FileMover
+
+
+def write_file(path, content="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def create_tree(root_folder):
+    write_file(os.path.join(root_folder, "原图", "精修.jpg"))
+    for i in range(4):
+        write_file(os.path.join(root_folder, f"批次{i}", "总表.xlsx"))
+        write_file(os.path.join(root_folder, f"批次{i}", "IMG_0001.jpg"))
+        write_file(os.path.join(root_folder, f"批次{i}", "子文件夹", f"调色{i}.jpg"))
+
+
+def snapshot(root_folder):
+    result = set()
+    for folder, _dirs, files in os.walk(root_folder):
+        for name in files:
+            if name != JOURNAL_FILENAME:
+                result.add(os.path.relpath(os.path.join(folder, name), root_folder))
+    return result
+
+
+def test_cancel_during_moves_then_resume():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        expected_folder = os.path.join(temp_dir, "expected")
+        create_tree(root_folder)
+        create_tree(expected_folder)
+        OrganizerEngine().organize_files(expected_folder)
+
+        mover = FileMover()
+        moved = []
+        engine = OrganizerEngine(journal=True)
+
+        def cancelling_move(src, dst):
+            mover(src, dst)
+            moved.append(src)
+            if len(moved) == 3:
+                engine.control.cancel()
+
+        engine.move_func = cancelling_move
+        summary = engine.organize_files(root_folder)
+        assert summary.cancelled and summary.error_count == 0
+        assert summary.total_processed == len(moved) == 3
+        assert summary.status_text().startswith("已取消")
+        state = MoveJournal(root_folder).load()
+        assert state.unfinished and state.remaining == 13 - 3
+
+        # 下次整理只执行日志中剩余的移动，已经完成的移动不会重做
+        logs = []
+        summary = OrganizerEngine(CallbackListener(log=logs.append), journal=True).organize_files(root_folder)
+        assert not summary.cancelled
+        assert summary.total_processed == 10 and summary.error_count == 0
+        assert any(line.startswith("发现未完成的整理") for line in logs)
+        assert snapshot(root_folder) == snapshot(expected_folder)
+        assert not MoveJournal(root_folder).load().unfinished
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+class CancelDuringPlan(OrganizerEngine):
+    """生成几个移动后取消，模拟扫描大文件夹时按下取消"""
+
+    def iter_plan(self, root_folder):
+        for count, task in enumerate(super().iter_plan(root_folder)):
+            if count == 3:
+                self.control.cancel()
+            yield task
+
+
+def test_cancel_during_planning():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        expected_folder = os.path.join(temp_dir, "expected")
+        create_tree(root_folder)
+        create_tree(expected_folder)
+        OrganizerEngine().organize_files(expected_folder)
+        before = snapshot(root_folder)
+
+        summary = CancelDuringPlan(journal=True).organize_files(root_folder)
+        assert summary.cancelled and summary.total_processed == 0
+        # 扫描中途取消时还没有移动任何文件，已计划的移动留在日志中
+        assert snapshot(root_folder) == before
+        state = MoveJournal(root_folder).load()
+        assert state.unfinished and state.partial and state.planned == 4
+        # 根文件夹、"原图"和最先列出的批次中的文件都已写入计划，第二个批次只计划了一个文件
+        batches = [rel_dir for rel_dir in state.done if rel_dir.startswith("批次")]
+        assert len(state.done) == 3 and "" in state.done and "原图" in state.done
+        assert len(batches) == 1 and state.done[batches[0]] == ["子文件夹"]
+
+        logs = []
+        summary = OrganizerEngine(CallbackListener(log=logs.append), journal=True).organize_files(root_folder)
+        assert "上次整理在扫描中途取消，继续扫描剩余的文件..." in logs
+        assert summary.total_processed == 13 and summary.error_count == 0
+        # 继续扫描时不再列出已经处理完的文件夹
+        assert summary.scan_stats.resumed_dirs == 3
+        assert summary.scan_stats.directories == 7
+        assert snapshot(root_folder) == snapshot(expected_folder)
+        assert not MoveJournal(root_folder).load().unfinished
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+class Tasks:
+    """记录是否被关闭的任务迭代器"""
+
+    def __init__(self):
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_pause_and_resume():
+    control = RunControl()
+    control.pause()
+    taken = []
+
+    def consume():
+        for item in control.gate(range(5)):
+            taken.append(item)
+
+    thread = threading.Thread(target=consume)
+    thread.start()
+    time.sleep(0.05)
+    # 暂停时不取出任何任务
+    assert taken == [] and thread.is_alive()
+    control.resume()
+    thread.join(timeout=5)
+    assert taken == [0, 1, 2, 3, 4]
+
+    # 暂停中取消会唤醒等待的线程
+    control.pause()
+    taken = []
+    thread = threading.Thread(target=consume)
+    thread.start()
+    time.sleep(0.05)
+    control.cancel()
+    thread.join(timeout=5)
+    assert not thread.is_alive() and taken == []
+    assert not control.wait()
+    # 取消后关闭任务生成器（关闭生成器会同时停止扫描）
+    tasks = Tasks()
+    assert list(control.gate(tasks)) == [] and tasks.closed
+
+    control.reset()
+    assert not control.paused and not control.cancelled
+
+
+if __name__ == "__main__":
+    test_cancel_during_moves_then_resume()
+    test_cancel_during_planning()
+    test_pause_and_resume()
+    print("暂停和取消测试通过")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试重复文件查找：分阶段哈希，以及整理时跳过、硬链接和报告重复文件
+"""
+
+import os
+import shutil
+import tempfile
+
+from organizer.dedupe import PARTIAL_BLOCK, Candidate, Deduplicator
+from organizer.engine import CallbackListener, OrganizerEngine
+from organizer.plan import MovePlan
+
+
+def write_file(path, content=b"x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def test_staged_hashing():
+    """测试只有大小和首尾数据块都相同的大文件才计算完整哈希"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        size = 3 * PARTIAL_BLOCK
+        base = bytes(range(256)) * (size // 256)
+        middle = bytearray(base)
+        middle[size // 2] ^= 0xFF
+        tail = bytearray(base)
+        tail[-1] ^= 0xFF
+        files = {
+            "a.bin": base, "a_copy.bin": base,
+            "middle.bin": bytes(middle), "tail.bin": bytes(tail),
+            "short.bin": base[:100], "small.txt": b"hello", "small_copy.txt": b"hello",
+            "empty1": b"", "empty2": b"",
+        }
+        for name, content in files.items():
+            write_file(os.path.join(temp_dir, name), content)
+
+        group = [Candidate(os.path.join(temp_dir, name), len(content), name) for name, content in files.items()]
+        deduplicator = Deduplicator(workers=2)
+        identical = deduplicator.find_identical([group])
+        assert sorted(sorted(c.payload for c in bucket) for bucket in identical) == [
+            ["a.bin", "a_copy.bin"], ["empty1", "empty2"], ["small.txt", "small_copy.txt"]]
+
+        stats = deduplicator.stats
+        assert stats.candidates == 9
+        # short.bin 大小唯一，不读取
+        assert stats.partial_hashed == 8
+        # tail.bin 在比较首尾数据块时已经排除
+        assert stats.full_hashed == 3
+        assert stats.bytes_hashed == 4 * 2 * PARTIAL_BLOCK + 10 + 3 * size
+        assert stats.throughput > 0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def create_tree(root_folder, big):
+    write_file(os.path.join(root_folder, "原图", "IMG_0001.jpg"), big)
+    write_file(os.path.join(root_folder, "批次1", "IMG_0001.jpg"), big)
+    write_file(os.path.join(root_folder, "批次2", "IMG_0001.jpg"), big[:-1] + bytes([big[-1] ^ 1]))
+    write_file(os.path.join(root_folder, "批次2", "IMG_0002.jpg"), b"2")
+    write_file(os.path.join(root_folder, "批次3", "IMG_0002.jpg"), b"2")
+
+
+def list_folder(root_folder, folder_name):
+    return sorted(os.listdir(os.path.join(root_folder, folder_name)))
+
+
+def test_organize_with_dedupe():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        big = os.urandom(3 * PARTIAL_BLOCK)
+        results = {}
+        for policy in ("report", "skip", "hardlink"):
+            root_folder = os.path.join(temp_dir, policy)
+            create_tree(root_folder, big)
+            logs = []
+            engine = OrganizerEngine(CallbackListener(log=logs.append), workers=2, dedupe=policy)
+            summary = engine.organize_files(root_folder)
+            assert summary.error_count == 0
+            assert summary.dedupe_stats.duplicates == 2
+            assert summary.dedupe_stats.duplicate_bytes == len(big) + 1
+            assert sum(line.startswith("重复文件") for line in logs) == 2
+            results[policy] = summary
+            original = os.path.join(root_folder, "原图")
+            assert os.path.exists(os.path.join(original, "IMG_0001_1.jpg"))
+
+        report = os.path.join(temp_dir, "report")
+        assert list_folder(report, "原图") == ["IMG_0001.jpg", "IMG_0001_1.jpg", "IMG_0001_2.jpg",
+                                             "IMG_0002.jpg", "IMG_0002_1.jpg"]
+        assert results["report"].dedupe_stats.bytes_saved == 0
+
+        # 重复文件留在原处
+        skip = os.path.join(temp_dir, "skip")
+        assert os.path.exists(os.path.join(skip, "批次1", "IMG_0001.jpg"))
+        assert os.path.exists(os.path.join(skip, "批次3", "IMG_0002.jpg"))
+        assert results["skip"].processed_count == 2
+        assert results["skip"].dedupe_stats.bytes_saved == len(big) + 1
+
+        # 目标位置是指向保留副本的硬链接，内容不同的文件正常移动
+        hardlink = os.path.join(temp_dir, "hardlink")
+        original = os.path.join(hardlink, "原图")
+        assert list_folder(hardlink, "原图") == list_folder(report, "原图")
+        kept = os.path.join(original, "IMG_0001.jpg")
+        # 批次1 和 批次2 的扫描顺序不固定，重命名后的编号也不固定
+        assert sorted(os.path.samefile(kept, os.path.join(original, name))
+                      for name in ("IMG_0001_1.jpg", "IMG_0001_2.jpg")) == [False, True]
+        assert os.path.samefile(os.path.join(original, "IMG_0002.jpg"), os.path.join(original, "IMG_0002_1.jpg"))
+        assert not os.path.exists(os.path.join(hardlink, "批次1", "IMG_0001.jpg"))
+        assert results["hardlink"].transfer_stats.links == 2
+        assert results["hardlink"].dedupe_stats.bytes_saved == len(big) + 1
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_dedupe_in_plan():
+    """测试查重结果写入移动计划，执行计划时同样使用硬链接"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        create_tree(root_folder, b"same")
+        plan_path = os.path.join(temp_dir, "plan.jsonl")
+        OrganizerEngine(dedupe="hardlink").plan_files(root_folder).save(plan_path)
+        with open(plan_path, encoding='utf-8') as f:
+            assert sum('"link":' in line for line in f) == 2
+
+        summary = OrganizerEngine().execute_plan(root_folder, MovePlan.load(plan_path))
+        assert summary.error_count == 0
+        assert summary.transfer_stats.links == 2
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_staged_hashing()
+    test_organize_with_dedupe()
+    test_dedupe_in_plan()
+    print("重复文件测试通过")
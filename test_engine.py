@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试无界面的整理引擎和命令行入口
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from organizer.engine import CallbackListener, OrganizerEngine
+from organizer.events import EventChannel
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def create_files(folder, names):
+    os.makedirs(folder, exist_ok=True)
+    for name in names:
+        with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+            f.write(f"这是{name}的内容")
+
+
+def build_tree(root_folder):
+    create_files(root_folder, ["root.jpg", "总表.xlsx"])
+    create_files(os.path.join(root_folder, "原图"), ["photo.jpg", "拷贝.jpg"])
+    create_files(os.path.join(root_folder, "a", "b"), ["photo.jpg", "图片.png", "IMG_修改后.jpg", "表格.xlsx"])
+    create_files(os.path.join(root_folder, "a"), ["报表.xls", "note.txt"])
+
+
+def test_engine_organize_files():
+    """测试引擎把文件移动到正确的位置"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "用户指定文件夹")
+        build_tree(root_folder)
+
+        events = {"log": [], "status": [], "progress": []}
+        listener = CallbackListener(
+            log=events["log"].append,
+            status=events["status"].append,
+            progress=events["progress"].append,
+        )
+        summary = OrganizerEngine(listener).organize_files(root_folder)
+
+        assert summary.corrected_count == 1
+        assert summary.processed_count == 7
+        assert summary.error_count == 0
+        assert sorted(os.listdir(os.path.join(root_folder, "原图"))) == ["note.txt", "photo.jpg", "photo_1.jpg", "root.jpg"]
+        assert sorted(os.listdir(os.path.join(root_folder, "处理图"))) == ["IMG_修改后.jpg", "图片.png", "拷贝.jpg"]
+        assert os.path.isfile(os.path.join(root_folder, "表格.xlsx"))
+        assert os.path.isfile(os.path.join(root_folder, "报表.xls"))
+        # 已经在根目录中的Excel文件保持原名
+        assert os.path.isfile(os.path.join(root_folder, "总表.xlsx"))
+        assert not os.path.exists(os.path.join(root_folder, "总表_1.xlsx"))
+        assert events["status"][-1] == summary.status_text()
+        assert events["progress"][-1] == 100
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_cli_runs_without_tkinter():
+    """测试命令行入口可以运行且不导入 tkinter"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        build_tree(root_folder)
+        summary_path = os.path.join(temp_dir, "summary.json")
+
+        code = (
+            "import sys; from organizer.cli import main; "
+            "rc = main(sys.argv[1:]); "
+            "assert 'tkinter' not in sys.modules; sys.exit(rc)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code, root_folder, "--quiet", "--summary-json", summary_path],
+            cwd=PROJECT_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        assert result.returncode == 0, result.stderr.decode('utf-8', 'replace')
+        with open(summary_path, encoding='utf-8') as f:
+            summary = json.load(f)
+        assert summary["total"] == 8
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_headless_imports_are_lazy():
+    """测试命令行的导入链只导入用到的模块，命令行入口 file_organizer_cli.py 不加载 tkinter"""
+    code = (
+        "import sys; import organizer.cli; "
+        "heavy = [name for name in ('tkinter', 'asyncio', 'sqlite3', 'concurrent.futures') if name in sys.modules]; "
+        "assert not heavy, heavy; "
+        "import organizer; organizer.ScanIndex; assert 'sqlite3' in sys.modules"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert result.returncode == 0, result.stderr.decode('utf-8', 'replace')
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        build_tree(root_folder)
+        code = (
+            "import runpy, sys; sys.argv = ['file_organizer_cli.py', sys.argv[1], '--quiet']\n"
+            "try:\n"
+            "    runpy.run_path('file_organizer_cli.py', run_name='__main__')\n"
+            "except SystemExit as e:\n"
+            "    assert e.code == 0, e.code\n"
+            "assert 'tkinter' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code, root_folder], cwd=PROJECT_DIR,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        assert result.returncode == 0, result.stderr.decode('utf-8', 'replace')
+        assert os.path.isfile(os.path.join(root_folder, "总表.xlsx"))
+        assert os.path.isfile(os.path.join(root_folder, "原图", "root.jpg"))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_gui_worker_without_display():
+    """测试界面在工作线程中调用的方法驱动真实的引擎（不创建窗口，不需要显示器）"""
+    try:
+        import file_organizer
+    except ImportError:
+        # 没有安装 tkinter
+        return
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        build_tree(root_folder)
+
+        app = file_organizer.FileOrganizer.__new__(file_organizer.FileOrganizer)
+        app.events = EventChannel()
+        # 勾选了"记录移动日志"，之后可以撤销
+        app.engine = OrganizerEngine(app.events, workers=file_organizer.MOVE_WORKERS, journal=True)
+        app.organize_files(root_folder)
+        batch = app.events.drain()
+        assert batch.status.startswith("完成！共处理 8 个文件")
+        assert batch.progress == 100
+        assert batch.calls == [(app.organizing_stopped, ())]
+
+        app.undo_last_run(root_folder)
+        batch = app.events.drain()
+        assert batch.status == "撤销完成，共移回 8 个文件"
+        assert os.path.isfile(os.path.join(root_folder, "a", "b", "photo.jpg"))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_engine_organize_files()
+    test_cli_runs_without_tkinter()
+    test_headless_imports_are_lazy()
+    test_gui_worker_without_display()
+    print("引擎测试通过")
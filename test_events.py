@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试工作线程与界面线程之间的事件通道
+"""
+
+import threading
+
+from organizer.events import EventChannel
+
+
+def test_status_and_progress_are_coalesced():
+    """测试状态和进度只保留最新值"""
+    channel = EventChannel()
+    for i in range(100):
+        channel.status(f"正在处理: {i}.jpg")
+        channel.progress(i)
+
+    batch = channel.drain()
+    assert batch.status == "正在处理: 99.jpg"
+    assert batch.progress == 99
+
+    # 没有新值时不再重复返回
+    batch = channel.drain()
+    assert not batch.has_status and not batch.has_progress
+    assert not batch
+
+
+def test_logs_are_batched():
+    """测试日志按批取出且顺序不变"""
+    channel = EventChannel(max_batch=30)
+    for i in range(70):
+        channel.log(f"移动文件: {i}")
+
+    sizes = []
+    lines = []
+    while channel.pending():
+        batch = channel.drain()
+        sizes.append(len(batch.logs))
+        lines.extend(batch.logs)
+    assert sizes == [30, 30, 10]
+    assert lines == [f"移动文件: {i}" for i in range(70)]
+
+
+def test_concurrent_producer():
+    """测试工作线程写入时界面线程取出不会丢失日志和最终状态"""
+    channel = EventChannel(max_batch=100)
+    received = []
+    calls = []
+    last_status = None
+
+    def worker():
+        for i in range(20000):
+            channel.log(i)
+            channel.status(f"正在处理: {i}")
+        channel.status("完成")
+        channel.call(calls.append, "done")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    while True:
+        finished = not thread.is_alive()
+        batch = channel.drain()
+        received.extend(batch.logs)
+        if batch.has_status:
+            last_status = batch.status
+        for func, args in batch.calls:
+            func(*args)
+        if finished and not channel.pending():
+            break
+
+    assert received == list(range(20000))
+    assert calls == ["done"]
+    assert last_status == "完成"
+
+
+if __name__ == "__main__":
+    test_status_and_progress_are_coalesced()
+    test_logs_are_batched()
+    test_concurrent_producer()
+    print("事件通道测试通过")
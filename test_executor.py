@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试并行移动执行器
+验证多线程移动时目标文件名不冲突，Excel文件和分类规则保持不变
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from organizer.engine import OrganizerEngine
+from organizer.executor import MoveExecutor, MoveTask
+from organizer.scanner import scan_files
+
+
+def create_files(folder, names):
+    os.makedirs(folder, exist_ok=True)
+    for name in names:
+        with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+            f.write(f"{folder}/{name}")
+
+
+def test_parallel_organize_keeps_names_unique():
+    """测试 8 个线程同时移动大量同名文件"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        for i in range(40):
+            create_files(os.path.join(root_folder, f"dir{i}"), ["IMG_0001.jpg", "图片.jpg", "表格.xlsx"])
+
+        summary = OrganizerEngine(workers=8).organize_files(root_folder)
+        assert summary.processed_count == 120
+        assert summary.error_count == 0
+
+        originals = os.listdir(os.path.join(root_folder, "原图"))
+        modified = os.listdir(os.path.join(root_folder, "处理图"))
+        excel = [name for name in os.listdir(root_folder) if name.endswith(".xlsx")]
+        assert len(originals) == len(set(originals)) == 40
+        assert len(modified) == 40
+        assert len(excel) == 40
+
+        # 每个文件的内容都被保留
+        contents = set()
+        for name in originals:
+            with open(os.path.join(root_folder, "原图", name), encoding='utf-8') as f:
+                contents.add(f.read())
+        assert len(contents) == 40
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_executor_bounds_pending_tasks():
+    """测试同时在途的任务数不超过上限，且每个任务都返回结果"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        create_files(temp_dir, [f"{i}.jpg" for i in range(30)])
+        entries, _ = scan_files(temp_dir)
+
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def slow_move(src, dst):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.005)
+            with lock:
+                state["running"] -= 1
+            if src.endswith("13.jpg"):
+                raise OSError("模拟失败")
+
+        executor = MoveExecutor(workers=4, move_func=slow_move, max_pending=6)
+        tasks = (MoveTask(entry, "原图", entry.path + ".moved", entry.name) for entry in entries)
+        results = list(executor.run(tasks))
+
+        assert len(results) == 30
+        assert [r.task.entry.name for r in results if not r.ok] == ["13.jpg"]
+        assert state["peak"] <= 4
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_parallel_organize_keeps_names_unique()
+    test_executor_bounds_pending_tasks()
+    print("并行移动测试通过")
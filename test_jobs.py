@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试多个根文件夹的整理队列：同一设备上的任务依次进行，不同设备上的任务同时进行
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from organizer.cli import main
+from organizer.engine import OrganizerEngine
+from organizer.jobs import JobQueue, read_roots
+from organizer.rules import default_rules
+from organizer.transfer import FileMover
+
+# 每次移动的模拟耗时（秒）
+MOVE_DELAY = 0.01
+
+
+def create_tree(root_folder):
+    for i in range(3):
+        folder = os.path.join(root_folder, f"批次{i}")
+        os.makedirs(folder)
+        for name in ("IMG_0001.jpg", "调色.jpg", "汇总.xlsx"):
+            with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+                f.write(name)
+
+
+def fake_device(path):
+    """文件夹名的第一个字符作为设备，在同一个临时文件夹中模拟多块磁盘"""
+    return os.path.basename(path)[0]
+
+
+def test_per_device_concurrency():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        roots = [os.path.join(temp_dir, name) for name in ("A1", "A2", "B1", "B2", "C1")]
+        for root_folder in roots:
+            create_tree(root_folder)
+
+        mover = FileMover()
+        lock = threading.Lock()
+        running = {}
+        overlaps = {"same": 0, "max": 0}
+
+        def slow_move(src, dst):
+            time.sleep(MOVE_DELAY)
+            mover(src, dst)
+
+        # 同时进行的任务共用一个 RuleSet（命令行只读入一次规则文件），规则统计各自独立
+        rules = default_rules()
+
+        def make_engine(root_folder):
+            return OrganizerEngine(move_func=slow_move, rules=rules, metrics=True)
+
+        def on_start(job):
+            with lock:
+                if running.get(job.device):
+                    overlaps["same"] += 1
+                running[job.device] = running.get(job.device, 0) + 1
+                overlaps["max"] = max(overlaps["max"], sum(running.values()))
+
+        def on_finish(job):
+            with lock:
+                running[job.device] -= 1
+
+        queue = JobQueue(make_engine, device_of=fake_device, on_start=on_start, on_finish=on_finish)
+        for root_folder in roots:
+            queue.add(root_folder)
+        start = time.perf_counter()
+        jobs = queue.run()
+        elapsed = time.perf_counter() - start
+
+        assert [job.root_folder for job in jobs] == roots
+        assert all(job.ok for job in jobs)
+        assert all(job.summary.processed_count == 9 for job in jobs)
+        assert all(sum(row["matches"] for row in job.summary.rule_stats) == 9 for job in jobs)
+        # 同一设备上的任务从不重叠，三个设备同时进行
+        assert overlaps["same"] == 0
+        assert overlaps["max"] == 3
+        # 总耗时接近最慢的设备（2 个任务），而不是 5 个任务之和
+        assert elapsed < sum(job.elapsed for job in jobs) * 0.7
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_missing_folder_and_cancel():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        roots = [os.path.join(temp_dir, name) for name in ("A1", "A2")]
+        for root_folder in roots:
+            create_tree(root_folder)
+
+        queue = None
+
+        def make_engine(root_folder):
+            # 第一个任务开始后取消：正在进行的整理停止，之后的任务不再开始
+            queue.control.cancel()
+            return OrganizerEngine()
+
+        queue = JobQueue(make_engine, device_of=lambda path: fake_device(path) if os.path.isdir(path) else None)
+        for root_folder in roots + [os.path.join(temp_dir, "不存在")]:
+            queue.add(root_folder)
+        first, second, missing = queue.run()
+        assert first.summary.cancelled and first.summary.total_processed == 0 and not first.ok
+        assert second.summary is None and second.status_text() == "未开始"
+        assert missing.error == "文件夹不存在" and not missing.ok
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_cli_roots_file():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        roots = [os.path.join(temp_dir, name) for name in ("甲", "乙")]
+        for root_folder in roots:
+            create_tree(root_folder)
+        roots_file = os.path.join(temp_dir, "roots.txt")
+        with open(roots_file, 'w', encoding='utf-8') as f:
+            f.write("# 每晚整理的文件夹\n\n" + "\n".join(roots) + "\n")
+        with open(roots_file, encoding='utf-8') as f:
+            assert read_roots(f) == roots
+
+        summary_path = os.path.join(temp_dir, "summary.json")
+        assert main(["--roots-file", roots_file, "--quiet", "--summary-json", summary_path]) == 0
+        with open(summary_path, encoding='utf-8') as f:
+            result = json.load(f)
+        assert [job["root"] for job in result["jobs"]] == roots
+        assert all(job["ok"] and job["summary"]["total"] == 9 for job in result["jobs"])
+
+        # 整理多个文件夹时不支持只对单个文件夹有意义的选项
+        assert main(roots + ["--undo"]) == 2
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_per_device_concurrency()
+    test_missing_folder_and_cancel()
+    test_cli_roots_file()
+    print("整理队列测试通过")
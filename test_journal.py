@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试移动日志：中途退出后继续执行、撤销
+"""
+
+import os
+import shutil
+import tempfile
+
+from organizer.engine import CallbackListener, OrganizerEngine
+from organizer.journal import JOURNAL_FILENAME, MoveJournal
+from organizer.transfer import FileMover
+
+
+def write_file(path, content="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def create_tree(root_folder):
+    write_file(os.path.join(root_folder, "总表.xlsx"))
+    write_file(os.path.join(root_folder, "原图", "精修.jpg"))
+    for i in range(3):
+        write_file(os.path.join(root_folder, f"批次{i}", "总表.xlsx"))
+        write_file(os.path.join(root_folder, f"批次{i}", "IMG_0001.jpg"))
+        write_file(os.path.join(root_folder, f"批次{i}", "子文件夹", f"调色{i}.jpg"))
+
+
+def snapshot(root_folder):
+    result = set()
+    for folder, _dirs, files in os.walk(root_folder):
+        for name in files:
+            if name != JOURNAL_FILENAME:
+                result.add(os.path.relpath(os.path.join(folder, name), root_folder))
+    return result
+
+
+class Crash(BaseException):
+    """模拟进程在移动中途被终止"""
+
+
+def test_journaled_run_and_undo():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        create_tree(root_folder)
+        before = snapshot(root_folder)
+
+        summary = OrganizerEngine(workers=4, journal=True).organize_files(root_folder)
+        assert summary.corrected_count == 1
+        assert summary.processed_count == 9
+        # 开始、10 个计划、计划结束、10 个提交
+        assert summary.journal_stats["records"] == 1 + 10 + 1 + 10
+        # 计划一次、提交若干次合并落盘
+        assert summary.journal_stats["syncs"] <= 3
+
+        state = MoveJournal(root_folder).load()
+        assert state.planned == 10 and state.ended and not state.unfinished
+        # 日志文件本身不会被整理
+        assert os.path.exists(os.path.join(root_folder, JOURNAL_FILENAME))
+
+        summary = OrganizerEngine().undo_last_run(root_folder)
+        assert summary.processed_count == 10 and summary.error_count == 0
+        assert snapshot(root_folder) == before
+        assert OrganizerEngine().undo_last_run(root_folder).processed_count == 0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_resume_after_crash_without_rescan():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        expected_folder = os.path.join(temp_dir, "expected")
+        create_tree(root_folder)
+        create_tree(expected_folder)
+        OrganizerEngine().organize_files(expected_folder)
+
+        mover = FileMover()
+        calls = []
+
+        def crashing_move(src, dst):
+            if len(calls) == 5:
+                raise Crash()
+            calls.append(src)
+            mover(src, dst)
+
+        try:
+            OrganizerEngine(move_func=crashing_move, journal=True).organize_files(root_folder)
+        except Crash:
+            pass
+        else:
+            raise AssertionError("应在第 6 次移动时退出")
+
+        # 模拟提交记录没有落盘：删除计划之后的所有记录
+        journal_path = os.path.join(root_folder, JOURNAL_FILENAME)
+        with open(journal_path, encoding='utf-8') as f:
+            lines = f.readlines()
+        planned_line = next(i for i, line in enumerate(lines) if line.startswith('{"planned"'))
+        with open(journal_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:planned_line + 1])
+        state = MoveJournal(root_folder).load()
+        assert state.unfinished and state.remaining == 10
+
+        # 继续执行只处理日志中的移动，中断后新到达的文件留给下一次整理
+        write_file(os.path.join(root_folder, "新批次", "new.jpg"))
+        logs = []
+        summary = OrganizerEngine(CallbackListener(log=logs.append), journal=True).organize_files(root_folder)
+        assert any(line.startswith("发现未完成的整理") for line in logs)
+        assert "5 个文件在中断前已经移动" in logs
+        assert summary.total_processed == 5 and summary.error_count == 0
+        assert os.path.exists(os.path.join(root_folder, "新批次", "new.jpg"))
+
+        os.remove(os.path.join(root_folder, "新批次", "new.jpg"))
+        assert snapshot(root_folder) == snapshot(expected_folder)
+        assert not MoveJournal(root_folder).load().unfinished
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_noop_run_keeps_journal_for_undo():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        create_tree(root_folder)
+        before = snapshot(root_folder)
+
+        assert OrganizerEngine(journal=True).organize_files(root_folder).processed_count == 9
+        # 再次整理没有需要移动的文件，上一次的日志保留，不留下临时文件
+        summary = OrganizerEngine(journal=True).organize_files(root_folder)
+        assert summary.total_processed == 0
+        assert not os.path.exists(os.path.join(root_folder, JOURNAL_FILENAME + ".tmp"))
+
+        summary = OrganizerEngine().undo_last_run(root_folder)
+        assert summary.processed_count == 10 and summary.error_count == 0
+        assert snapshot(root_folder) == before
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_journaled_run_and_undo()
+    test_resume_after_crash_without_rescan()
+    test_noop_run_keeps_journal_for_undo()
+    print("移动日志测试通过")
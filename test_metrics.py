@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试各阶段耗时和计数器：JSON 汇总、Prometheus 文本格式，以及未启用时不记录
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+from organizer.engine import OrganizerEngine
+from organizer.metrics import Metrics, prometheus_text, write_prometheus
+
+
+def write_file(path, content="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def create_tree(root_folder):
+    write_file(os.path.join(root_folder, "原图", "精修.jpg"))
+    write_file(os.path.join(root_folder, "原图", "IMG_0001.jpg"))
+    write_file(os.path.join(root_folder, "批次1", "IMG_0001.jpg"))
+    write_file(os.path.join(root_folder, "批次1", "总表.xlsx"))
+    write_file(os.path.join(root_folder, "批次2", "IMG_0001.jpg"))
+    write_file(os.path.join(root_folder, "批次2", "调色.jpg"))
+
+
+def test_metrics_disabled_by_default():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        create_tree(temp_dir)
+        engine = OrganizerEngine()
+        summary = engine.organize_files(temp_dir)
+        assert summary.metrics is None
+        assert summary.as_dict()["metrics"] is None
+        assert engine._executor_metrics() is None
+        assert summary.rule_stats is None
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_metrics_of_a_run():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for journal in (False, True):
+            root_folder = os.path.join(temp_dir, f"journal_{journal}")
+            create_tree(root_folder)
+            summary = OrganizerEngine(workers=2, journal=journal, metrics=True).organize_files(root_folder)
+            metrics = summary.as_dict()["metrics"]
+            # 使用日志时在生成计划的过程中统计
+            assert sum(row["matches"] for row in summary.rule_stats) == 4
+            counters = metrics["counters"]
+            assert counters["files_corrected"] == 1
+            assert counters["files_processed"] == 4
+            assert counters["errors"] == 0
+            # 修正与其他移动一样由 FileMover 执行
+            assert counters["renames"] == 5
+            # 同盘重命名也计入移动的字节数，每个文件 1 字节
+            assert counters["bytes_moved"] == 5 and counters["bytes_copied"] == 0
+            # 两个 IMG_0001.jpg 与"原图"中已有的文件重名，记住了编号，各检查 2 个候选名
+            assert counters["name_collisions"] == 2
+            assert counters["name_collision_probes"] == 4
+            # 根文件夹、"原图"和两个批次文件夹各列出一次，"原图"不再单独列出
+            assert counters["directories"] == 4
+
+            phases = metrics["phases"]
+            expected = {"correction", "scan", "excel_moves", "other_moves", "total"}
+            if journal:
+                expected.add("plan")
+            assert set(phases) == expected
+            assert all(seconds >= 0 for seconds in phases.values())
+            assert phases["total"] >= phases["other_moves"] / 2
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_prometheus_text():
+    metrics = Metrics()
+    metrics.add_time("scan", 0.25)
+    metrics.add_time("scan", 0.25)
+    metrics.set("renames", 3)
+    text = prometheus_text(metrics, labels={"root": 'C:\\照片 "新"'}, timestamp=1700000000)
+    lines = text.splitlines()
+    assert 'file_organizer_phase_seconds{root="C:\\\\照片 \\"新\\"",phase="scan"} 0.500000' in lines
+    assert 'file_organizer_renames{root="C:\\\\照片 \\"新\\""} 3' in lines
+    assert "# TYPE file_organizer_renames gauge" in lines
+    assert lines[-1].endswith(" 1700000000.000")
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "organizer.prom")
+        write_prometheus(path, metrics)
+        assert os.listdir(temp_dir) == ["organizer.prom"]
+        with open(path, encoding='utf-8') as f:
+            assert "file_organizer_renames 3\n" in f.read()
+        json.dumps(metrics.as_dict())
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_metrics_disabled_by_default()
+    test_metrics_of_a_run()
+    test_prometheus_text()
+    print("阶段耗时和计数器测试通过")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试目标文件夹的文件名索引
+"""
+
+import os
+import shutil
+import tempfile
+
+from organizer.name_index import NameIndex
+
+
+def original_unique_name(folder, filename):
+    """旧实现：从 _1 开始逐个检查 os.path.exists"""
+    path = os.path.join(folder, filename)
+    if not os.path.exists(path):
+        return filename
+    base_name, ext = os.path.splitext(filename)
+    counter = 1
+    while os.path.exists(path):
+        path = os.path.join(folder, f"{base_name}_{counter}{ext}")
+        counter += 1
+    return os.path.basename(path)
+
+
+def test_same_names_as_original_algorithm():
+    """测试分配结果与旧实现逐个移动时得到的文件名相同"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for name in ["IMG_0001.jpg", "IMG_0001_2.jpg", "IMG_0001_3.jpg", "a.png"]:
+            open(os.path.join(temp_dir, name), 'w').close()
+
+        requests = ["IMG_0001.jpg"] * 6 + ["a.png", "b.png", "a.png", "IMG_0001_1.jpg"]
+        index = NameIndex()
+        names = []
+        for filename in requests:
+            expected = original_unique_name(temp_dir, filename)
+            actual = index.reserve(temp_dir, filename)
+            assert actual == expected, (filename, actual, expected)
+            open(os.path.join(temp_dir, actual), 'w').close()
+            names.append(actual)
+
+        assert names[:6] == ["IMG_0001_1.jpg", "IMG_0001_4.jpg", "IMG_0001_5.jpg",
+                             "IMG_0001_6.jpg", "IMG_0001_7.jpg", "IMG_0001_8.jpg"]
+        assert index.loads == 1
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_collisions_cost_constant_probes():
+    """测试大量同名文件时每个文件的候选检查次数不随重名数量增长"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        index = NameIndex()
+        for _ in range(5000):
+            index.reserve(temp_dir, "IMG_0001.jpg")
+        assert index.reservations == 5000
+        # 第一个文件检查 1 次，之后每个文件检查 2 次（原名 + 下一个编号）
+        assert index.probes == 1 + 2 * 4999
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_release_frees_name():
+    """测试文件移出文件夹后其文件名可以再次使用"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        open(os.path.join(temp_dir, "表.xlsx"), 'w').close()
+        index = NameIndex()
+        assert index.reserve(temp_dir, "表.xlsx") == "表_1.xlsx"
+        index.release(temp_dir, "表.xlsx")
+        assert index.reserve(temp_dir, "表.xlsx") == "表.xlsx"
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_same_names_as_original_algorithm()
+    test_collisions_cost_constant_probes()
+    test_release_frees_name()
+    print("文件名索引测试通过")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试多线程扫描：产出的条目、顺序和计数都与串行扫描相同
+"""
+
+import os
+import shutil
+import tempfile
+
+from benchmarks.synthetic_tree import generate_tree
+from organizer.engine import OrganizerEngine
+from organizer.parallel_scan import ParallelScanner
+from organizer.scan_index import INDEX_FILENAME, ScanIndex
+from organizer.scanner import Scanner
+
+
+def scan_paths(scanner):
+    return [(entry.path, entry.rel_dir, entry.depth) for entry in scanner.scan()]
+
+
+def test_same_order_as_serial():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for shape in ("wide", "deep"):
+            root_folder = os.path.join(temp_dir, shape)
+            generate_tree(root_folder, files=2000, shape=shape, files_per_folder=20, seed=3)
+            os.makedirs(os.path.join(root_folder, "原图", "嵌套"))
+            for name in ("精修.jpg", "IMG_9999.jpg"):
+                with open(os.path.join(root_folder, "原图", name), 'w', encoding='utf-8') as f:
+                    f.write(name)
+
+            serial = Scanner(root_folder, correction_folder="原图")
+            expected = scan_paths(serial)
+            # 窗口很小时也必须保持顺序
+            for workers, window in ((4, None), (3, 2), (16, 1)):
+                parallel = ParallelScanner(root_folder, workers=workers, window=window, correction_folder="原图")
+                assert scan_paths(parallel) == expected
+                for name in ("directories", "entries", "files", "scandir_calls", "errors"):
+                    assert getattr(parallel.stats, name) == getattr(serial.stats, name)
+            # "原图"中的文件最先产出
+            in_original = [rel == "原图" and depth == 1 for _path, rel, depth in expected]
+            first_other = in_original.index(False)
+            assert first_other >= 2 and not any(in_original[first_other:])
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_stat_calls_counted_across_threads():
+    """写扫描索引时各扫描线程 stat 文件，消费者也 stat 文件，计数不因并发丢失"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        generate_tree(root_folder, files=2000, files_per_folder=5, seed=7)
+
+        counts = []
+        for scanner_class, options in ((Scanner, {}), (ParallelScanner, {"workers": 8})):
+            index = ScanIndex(root_folder)
+            scanner = scanner_class(root_folder, index=index, **options)
+            yielded = 0
+            for entry in scanner.scan():
+                entry.stat()
+                yielded += 1
+            index.finish()
+            os.unlink(os.path.join(root_folder, INDEX_FILENAME))
+            # 每个文件夹 stat 一次读取修改时间，产出的每个文件 stat 一次
+            assert scanner.stats.stat_calls == scanner.stats.directories + yielded
+            counts.append(scanner.stats.as_dict()["stat_calls"])
+        assert counts[0] == counts[1]
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_engine_with_scan_workers():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        tree = generate_tree(root_folder, files=1000, seed=5)
+        summary = OrganizerEngine(scan_workers=4, workers=2).organize_files(root_folder)
+        assert summary.error_count == 0
+        assert summary.processed_count + summary.corrected_count > 0
+        assert summary.scan_stats.files >= tree["files"]
+
+        # 消费者提前停止时扫描线程池能正常结束
+        scanner = ParallelScanner(temp_dir, workers=4)
+        iterator = scanner.scan()
+        next(iterator)
+        iterator.close()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_same_order_as_serial()
+    test_stat_calls_counted_across_threads()
+    test_engine_with_scan_workers()
+    print("多线程扫描测试通过")
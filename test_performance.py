@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能回归测试：在固定的合成文件树上测量扫描和移动的吞吐量，低于基准时失败；
+命令行的导入时间超过 benchmarks/bench_startup.py 中的目标时失败
+
+基准保存在 benchmarks/baseline.json，吞吐量低于 基准 × tolerance 时测试失败。基准是在某一台
+机器上测得的绝对吞吐量，在其他机器上没有意义，因此这些测试默认跳过：设置环境变量
+ORGANIZER_PERF=1 运行（直接运行本文件时总是运行）。在新机器上先重新生成基准：
+
+    python test_performance.py --update-baseline
+
+ORGANIZER_PERF_TOLERANCE 覆盖基准文件中的 tolerance。
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pytest
+
+from benchmarks.synthetic_tree import generate_tree
+from organizer.engine import OrganizerEngine
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(PROJECT_DIR, "benchmarks", "baseline.json")
+
+# 固定的文件树：文件数和随机种子都不能改变，否则与基准不可比
+PERF_FILES = 5000
+PERF_SEED = 1
+
+# 每项测量重复的次数，取最快的一次
+REPEAT = 3
+
+# 设置为 "1" 时运行性能测试
+PERF_ENV = "ORGANIZER_PERF"
+
+
+def load_baseline():
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def perf_enabled():
+    return os.environ.get(PERF_ENV) == "1"
+
+
+# 没有设置 ORGANIZER_PERF=1 时报告为跳过（直接运行本文件时不经过 pytest，标记不起作用）
+requires_perf = pytest.mark.skipif(not perf_enabled(), reason=f"设置 {PERF_ENV}=1 时运行性能测试")
+
+
+def make_perf_tree(temp_dir):
+    root_folder = tempfile.mkdtemp(dir=temp_dir)
+    tree = generate_tree(root_folder, files=PERF_FILES, seed=PERF_SEED)
+    return root_folder, tree["files"]
+
+
+def measure_scan():
+    """扫描吞吐量（文件/秒）：同一棵树扫描 REPEAT 次"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder, _files = make_perf_tree(temp_dir)
+        engine = OrganizerEngine()
+        best = None
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            scanned = sum(1 for _entry in engine.create_scanner(root_folder).scan())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return scanned / best
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def measure_move():
+    """移动吞吐量（文件/秒）：每次在新生成的树上执行预先生成的计划"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        best = None
+        for _ in range(REPEAT):
+            root_folder, _files = make_perf_tree(temp_dir)
+            engine = OrganizerEngine()
+            plan = engine.plan_files(root_folder)
+            start = time.perf_counter()
+            summary = engine.execute_plan(root_folder, plan)
+            elapsed = time.perf_counter() - start
+            assert summary.error_count == 0
+            rate = len(plan) / elapsed
+            best = rate if best is None else max(best, rate)
+        return best
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def check_against_baseline(name, measured):
+    baseline = load_baseline()
+    tolerance = float(os.environ.get("ORGANIZER_PERF_TOLERANCE", baseline["tolerance"]))
+    expected = baseline[name]
+    assert measured >= expected * tolerance, (
+        f"{name} 为 {measured:,.0f} 文件/秒，低于基准 {expected:,.0f} 的 {tolerance:.0%}")
+
+
+@requires_perf
+def test_scan_throughput():
+    check_against_baseline("scan_files_per_second", measure_scan())
+
+
+@requires_perf
+def test_move_throughput():
+    check_against_baseline("move_files_per_second", measure_move())
+
+
+# 墙钟时间受缓存和机器负载影响，与吞吐量测试一样默认跳过；
+# 命令行不导入哪些模块由 test_engine.py 检查
+@requires_perf
+def test_startup_import_time():
+    """命令行的导入时间不超过 benchmarks/bench_startup.py 中的目标"""
+    from benchmarks.bench_startup import TARGETS, measure_import
+    elapsed, _loaded = measure_import("organizer.cli", repeat=REPEAT)
+    target = TARGETS["import_cli"]
+    assert elapsed is not None and elapsed <= target, (
+        f"import organizer.cli 用时 {elapsed * 1000:.0f} ms，超过目标 {target * 1000:.0f} ms")
+
+
+def update_baseline():
+    baseline = load_baseline() if os.path.exists(BASELINE_PATH) else {"tolerance": 0.5}
+    baseline.update({
+        "files": PERF_FILES,
+        "seed": PERF_SEED,
+        "scan_files_per_second": round(measure_scan()),
+        "move_files_per_second": round(measure_move()),
+    })
+    with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+    print(f"已更新基准: 扫描 {baseline['scan_files_per_second']:,} 文件/秒，"
+          f"移动 {baseline['move_files_per_second']:,} 文件/秒")
+
+
+if __name__ == "__main__":
+    if "--update-baseline" in sys.argv[1:]:
+        update_baseline()
+    else:
+        os.environ[PERF_ENV] = "1"
+        test_scan_throughput()
+        test_move_throughput()
+        test_startup_import_time()
+        print("性能回归测试通过")
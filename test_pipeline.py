@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试扫描 → 分类 → 移动 流水线
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from organizer.engine import CallbackListener, OrganizerEngine
+from organizer.pipeline import ScanPipeline
+
+
+class CountingScanner:
+    """产出大量假条目并记录已产出数量的扫描器"""
+
+    def __init__(self, total):
+        self.total = total
+        self.produced = 0
+
+    def scan(self):
+        for i in range(self.total):
+            self.produced += 1
+            yield i
+
+
+def test_pipeline_applies_backpressure():
+    """测试消费者变慢时扫描线程被有界队列阻塞"""
+    scanner = CountingScanner(100000)
+    pipeline = ScanPipeline(scanner, batch_size=10, max_batches=4)
+    iterator = iter(pipeline)
+    assert next(iterator) == 0
+    time.sleep(0.2)
+
+    # 队列中最多 4 批，另有一批正在被消费、一批正在组装
+    assert scanner.produced <= 10 * 6
+    assert not pipeline.finished
+
+    rest = list(iterator)
+    assert rest == list(range(1, 100000))
+    assert pipeline.finished and pipeline.discovered == 100000
+
+
+def test_pipeline_stops_scanner_when_consumer_exits():
+    """测试消费者提前退出后扫描线程也会结束"""
+    scanner = CountingScanner(100000)
+    pipeline = ScanPipeline(scanner, batch_size=10, max_batches=2)
+    for item in pipeline:
+        if item == 5:
+            break
+    assert pipeline._thread is None
+    assert scanner.produced < 100000
+
+
+def test_excel_first_option():
+    """测试 excel_first 选项保持先移动Excel文件的顺序"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        for i in range(5):
+            folder = os.path.join(root_folder, f"dir{i}")
+            os.makedirs(folder)
+            for name in ("a.jpg", "图.png", f"表{i}.xlsx"):
+                with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+                    f.write(name)
+
+        logs = []
+        engine = OrganizerEngine(CallbackListener(log=logs.append), excel_first=True)
+        summary = engine.organize_files(root_folder)
+        assert summary.processed_count == 15
+
+        moved = [line for line in logs if line.startswith(("✅ 成功移动Excel文件", "移动文件:"))]
+        assert all(line.startswith("✅") for line in moved[:5])
+        assert not any(line.startswith("✅") for line in moved[5:])
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_pipeline_applies_backpressure()
+    test_pipeline_stops_scanner_when_consumer_exits()
+    test_excel_first_option()
+    print("流水线测试通过")
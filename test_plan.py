@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试移动计划：生成计划不修改文件，执行计划与直接整理结果一致
+"""
+
+import io
+import os
+import shutil
+import tempfile
+
+from organizer.engine import OrganizerEngine
+from organizer.plan import MovePlan, PlanError, read_plan, write_plan
+
+
+def write_file(path, content="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def create_tree(root_folder):
+    write_file(os.path.join(root_folder, "总表.xlsx"))
+    write_file(os.path.join(root_folder, "原图", "精修.jpg"))
+    write_file(os.path.join(root_folder, "原图", "IMG_0001.jpg"))
+    write_file(os.path.join(root_folder, "处理图", "调色.jpg"))
+    write_file(os.path.join(root_folder, "批次1", "总表.xlsx"))
+    write_file(os.path.join(root_folder, "批次1", "IMG_0001.jpg"))
+    write_file(os.path.join(root_folder, "批次1", "调色.jpg"))
+    write_file(os.path.join(root_folder, "批次2", "子文件夹", "IMG_0001.jpg"))
+    write_file(os.path.join(root_folder, "批次2", "精修.jpg"))
+
+
+def snapshot(root_folder):
+    result = set()
+    for folder, _dirs, files in os.walk(root_folder):
+        for name in files:
+            result.add(os.path.relpath(os.path.join(folder, name), root_folder))
+    return result
+
+
+def test_planning_does_not_touch_files():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        create_tree(root_folder)
+        shutil.rmtree(os.path.join(root_folder, "处理图"))
+        before = snapshot(root_folder)
+        dirs_before = sorted(folder for folder, _dirs, _files in os.walk(root_folder))
+
+        plan = OrganizerEngine().plan_files(root_folder)
+        assert snapshot(root_folder) == before
+        # 也不会创建目标文件夹
+        assert sorted(folder for folder, _dirs, _files in os.walk(root_folder)) == dirs_before
+
+        assert plan.counts() == {"fix": 1, "excel": 1, "move": 4, "renamed": 4}
+        # 修正任务排在最前面
+        assert plan.tasks[0].is_correction
+        targets = {os.path.relpath(task.target_path, root_folder) for task in plan}
+        assert targets == {
+            os.path.join("处理图", "精修.jpg"),
+            "总表_1.xlsx",
+            os.path.join("原图", "IMG_0001_1.jpg"),
+            os.path.join("原图", "IMG_0001_2.jpg"),
+            os.path.join("处理图", "调色.jpg"),
+            # 修正任务已占用 处理图/精修.jpg
+            os.path.join("处理图", "精修_1.jpg"),
+        }
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_executed_plan_matches_direct_run():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        planned = os.path.join(temp_dir, "planned")
+        direct = os.path.join(temp_dir, "direct")
+        create_tree(planned)
+        create_tree(direct)
+
+        # 计划经过 JSONL 序列化后由另一个引擎执行
+        stream = io.StringIO()
+        count = write_plan(stream, planned, OrganizerEngine().iter_plan(planned))
+        assert count == 6
+        assert len(stream.getvalue().splitlines()) == 7
+        stream.seek(0)
+        summary = OrganizerEngine(workers=4).execute_plan(planned, read_plan(stream))
+        assert summary.corrected_count == 1
+        assert summary.processed_count == 5
+        assert summary.error_count == 0
+
+        OrganizerEngine().organize_files(direct)
+        assert snapshot(planned) == snapshot(direct)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_stale_plan_does_not_overwrite():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        create_tree(root_folder)
+        plan_path = os.path.join(temp_dir, "plan.jsonl")
+        OrganizerEngine().plan_files(root_folder).save(plan_path)
+
+        # 生成计划之后目标位置出现了同名文件
+        write_file(os.path.join(root_folder, "原图", "IMG_0001_1.jpg"), "新到达")
+        plan = MovePlan.load(plan_path)
+        assert plan.root_folder == root_folder and len(plan) == 6
+        summary = OrganizerEngine().execute_plan(root_folder, plan)
+        assert summary.error_count == 0
+
+        with open(os.path.join(root_folder, "原图", "IMG_0001_1.jpg"), encoding='utf-8') as f:
+            assert f.read() == "新到达"
+        original = os.listdir(os.path.join(root_folder, "原图"))
+        assert sorted(original) == ["IMG_0001.jpg", "IMG_0001_1.jpg", "IMG_0001_2.jpg", "IMG_0001_3.jpg"]
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_plan_rejects_paths_outside_root():
+    lines = ['{"format":1,"root":"/data"}', '{"op":"move","src":"../etc/passwd","dst":"原图/passwd"}']
+    try:
+        list(read_plan(io.StringIO("\n".join(lines))))
+    except PlanError:
+        pass
+    else:
+        raise AssertionError("应拒绝根文件夹之外的路径")
+
+    try:
+        list(read_plan(io.StringIO('{"op":"move"}\n')))
+    except PlanError:
+        pass
+    else:
+        raise AssertionError("应拒绝缺少计划头的文件")
+
+
+if __name__ == "__main__":
+    test_planning_does_not_touch_files()
+    test_executed_plan_matches_direct_run()
+    test_stale_plan_does_not_overwrite()
+    test_plan_rejects_paths_outside_root()
+    print("移动计划测试通过")
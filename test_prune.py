@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试删除被移空的文件夹：按扫描结果自底向上删除，不重新遍历；下次整理扫描的文件夹更少
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from organizer.engine import OrganizerEngine
+from organizer.transfer import FileMover
+
+
+def write_file(path, content="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def create_tree(root_folder):
+    write_file(os.path.join(root_folder, "原图", "精修.jpg"))
+    for i in range(3):
+        write_file(os.path.join(root_folder, f"批次{i}", "总表.xlsx"))
+        write_file(os.path.join(root_folder, f"批次{i}", "IMG_0001.jpg"))
+        write_file(os.path.join(root_folder, f"批次{i}", "子文件夹", "更深", f"调色{i}.jpg"))
+    # 整理前就是空的文件夹保留，它的上级也保留
+    os.makedirs(os.path.join(root_folder, "模板", "空文件夹"))
+    write_file(os.path.join(root_folder, "模板", "说明.jpg"))
+
+
+def folders(root_folder):
+    result = set()
+    for folder, dirs, _files in os.walk(root_folder):
+        for name in dirs:
+            result.add(os.path.relpath(os.path.join(folder, name), root_folder))
+    return result
+
+
+def test_prune_emptied_folders():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        create_tree(root_folder)
+        # 移动失败的文件留在原处，所在文件夹和上级文件夹都保留
+        failing = os.path.join(root_folder, "批次2", "子文件夹", "更深", "调色2.jpg")
+        mover = FileMover()
+
+        def move(src, dst):
+            if src == failing:
+                raise OSError(13, "模拟的权限错误", src)
+            mover(src, dst)
+
+        summary = OrganizerEngine(move_func=move, prune=True, metrics=True).organize_files(root_folder)
+        assert summary.error_count == 1
+        assert summary.pruned_dirs == 2 * 3
+        assert summary.metrics.counters["pruned_dirs"] == 6
+        assert "prune" in summary.metrics.phases
+        assert folders(root_folder) == {
+            "原图", "处理图", "模板", os.path.join("模板", "空文件夹"),
+            "批次2", os.path.join("批次2", "子文件夹"), os.path.join("批次2", "子文件夹", "更深"),
+        }
+
+        # 下次整理只需列出剩下的文件夹
+        summary = OrganizerEngine(prune=True).organize_files(root_folder)
+        assert summary.pruned_dirs == 3
+        assert summary.scan_stats.directories == 1 + 7
+        assert folders(root_folder) == {"原图", "处理图", "模板", os.path.join("模板", "空文件夹")}
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_prune_keeps_folders_with_new_files():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        create_tree(root_folder)
+        mover = FileMover()
+        late = os.path.join(root_folder, "批次0", "新到达.jpg")
+
+        def move(src, dst):
+            mover(src, dst)
+            # 最深一层的文件移动时，整理期间有新文件到达已经扫描过的文件夹
+            if os.path.basename(src) == "调色0.jpg":
+                write_file(late)
+
+        summary = OrganizerEngine(move_func=move, prune=True).organize_files(root_folder)
+        assert os.path.isfile(late)
+        assert summary.pruned_dirs == 3 * 3 - 1
+        assert not os.path.exists(os.path.join(root_folder, "批次0", "子文件夹"))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_prune_with_index_and_undo():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        create_tree(root_folder)
+        # 刚创建的文件夹修改时间与记录时间过近，索引不会信任
+        time.sleep(0.1)
+        summary = OrganizerEngine(prune=True, use_index=True, journal=True).organize_files(root_folder)
+        assert summary.pruned_dirs == 9
+
+        # 索引中删除的文件夹已经去掉，下次整理不会去列出不存在的文件夹
+        logs = []
+        engine = OrganizerEngine(use_index=True)
+        engine.log_message = logs.append
+        summary = engine.organize_files(root_folder)
+        assert summary.scan_stats.errors == 0
+        assert not any("出错" in line for line in logs)
+        stats = summary.scan_stats
+        assert stats.directories + stats.cached_dirs == 1 + 4
+
+        # 撤销时重新创建被删除的文件夹
+        OrganizerEngine().undo_last_run(root_folder)
+        assert os.path.isfile(os.path.join(root_folder, "批次1", "子文件夹", "更深", "调色1.jpg"))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_prune_emptied_folders()
+    test_prune_keeps_folders_with_new_files()
+    test_prune_with_index_and_undo()
+    print("删除空文件夹测试通过")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试紧凑的文件记录表：文件夹只保存一次，划分得到的视图不复制记录
+"""
+
+import os
+import shutil
+import tempfile
+
+from organizer.engine import OrganizerEngine, is_excel_file
+from organizer.records import FileRecords
+from organizer.scanner import scan_files
+
+
+def create_files(folder, names):
+    os.makedirs(folder, exist_ok=True)
+    for name in names:
+        with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+            f.write(name)
+
+
+def test_records_round_trip():
+    """测试组合出的条目与扫描得到的条目一致，每个文件夹只保存一次"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        create_files(os.path.join(temp_dir, "批次1"), ["IMG_0001.jpg", "IMG_0002.jpg", "汇总.xlsx"])
+        create_files(os.path.join(temp_dir, "批次2", "子文件夹"), ["IMG_0001.jpg"])
+        create_files(temp_dir, ["说明.txt"])
+
+        entries, stats = scan_files(temp_dir)
+        records = FileRecords.from_entries(entries, stats)
+        assert len(records) == 5
+        assert records.folder_count == 3
+        for entry, record in zip(entries, records):
+            assert tuple(record) == tuple(entry)
+            assert (record.rel_dir, record.depth) == (entry.rel_dir, entry.depth)
+            assert record.stat().st_size == entry.stat().st_size
+        assert records[2].name == entries[2].name
+
+        # 暂存时附带的小整数
+        tagged = FileRecords()
+        tagged.append(entries[0], 7)
+        assert [(entry.name, tag) for entry, tag in tagged.items()] == [(entries[0].name, 7)]
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_partition_views():
+    """测试Excel文件和其他文件的划分只保存下标"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        create_files(os.path.join(temp_dir, "批次1"), ["IMG_0001.jpg", "汇总.xlsx", "明细.xls"])
+        create_files(os.path.join(temp_dir, "批次2"), ["IMG_0002.jpg"])
+
+        records = OrganizerEngine().get_all_files_to_process(temp_dir)
+        assert isinstance(records, FileRecords)
+        excel, others = records.partition(is_excel_file)
+        assert sorted(entry.name for entry in excel) == ["明细.xls", "汇总.xlsx"]
+        assert sorted(entry.name for entry in others) == ["IMG_0001.jpg", "IMG_0002.jpg"]
+        assert len(excel) + len(others) == len(records)
+        assert excel.records is records
+        assert excel.indices.itemsize == 4
+        assert excel[0].path == records[excel.indices[0]].path
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_records_round_trip()
+    test_partition_views()
+    print("文件记录表测试通过")
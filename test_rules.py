@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试可配置的分类规则
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+from organizer.engine import OrganizerEngine
+from organizer.rules import RuleError, RuleStats, compile_rules, default_rules, load_rules
+from organizer.scanner import scan_files
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class FakeEntry:
+    def __init__(self, name, size=0):
+        self.name = name
+        self.size = size
+
+    def stat(self):
+        return os.stat_result((0, 0, 0, 0, 0, 0, self.size, 0, 0, 0))
+
+
+def test_default_rules_dispatch():
+    """测试内置规则与原来的硬编码分类一致，Excel只需一次字典查找"""
+    rules = default_rules()
+    rule_stats = RuleStats(rules)
+    for name in ("报表.XLSX", "a.xls", "图片.jpg", "IMG_拷贝.png", "IMG_0001.jpg", "README"):
+        assert rules.route(FakeEntry(name), stats=rule_stats).target == rules.route(FakeEntry(name)).target
+    assert rules.route(FakeEntry("报表.XLSX")).target == "."
+    assert rules.route(FakeEntry("a.xls")).target == "."
+    assert rules.route(FakeEntry("图片.jpg")).target == "处理图"
+    assert rules.route(FakeEntry("IMG_拷贝.png")).target == "处理图"
+    assert rules.route(FakeEntry("IMG_0001.jpg")).target == "原图"
+    assert rules.route(FakeEntry("README")).target == "原图"
+
+    assert len(rules.dispatch[".xlsx"]) == 1
+    # 只有传入 RuleStats 的路由被统计
+    stats = {row["name"]: row for row in rule_stats.as_list()}
+    assert stats["excel"]["evaluations"] == 2 and stats["excel"]["matches"] == 2
+    assert stats["modified"]["evaluations"] == 4 and stats["modified"]["matches"] == 2
+    assert stats["default"]["matches"] == 2
+
+
+def test_size_rule_and_example_file():
+    rules = load_rules(os.path.join(PROJECT_DIR, "rules.example.json"))
+    assert rules.route(FakeEntry("a.CR2", size=5 * 1024 * 1024)).target == "RAW"
+    # 小于 1MB 的 RAW 文件继续匹配后面的规则
+    assert rules.route(FakeEntry("a.cr2", size=10)).target in ("原图", "归档")
+    assert rules.target_folders == ("RAW", "处理图", "归档", "原图")
+
+
+def test_toml_rules():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "rules.toml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('default = "其他"\n\n[[rules]]\nname = "pdf"\nextensions = ["pdf"]\ntarget = "文档"\n')
+        try:
+            rules = load_rules(path)
+        except RuleError:
+            return  # 当前 Python 没有 TOML 解析器
+        assert rules.route(FakeEntry("a.PDF")).target == "文档"
+        assert rules.route(FakeEntry("a.jpg")).target == "其他"
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_invalid_rules():
+    for config in ({"rules": [{"extensions": [".a"]}]},
+                   {"rules": [{"target": "a/b"}]},
+                   {"rules": [{"target": "x", "colour": "red"}]},
+                   {"default": ".", "rules": []}):
+        try:
+            compile_rules(config)
+        except RuleError:
+            continue
+        raise AssertionError(f"应当拒绝: {config}")
+
+
+def test_engine_with_custom_rules():
+    """测试自定义目标文件夹，以及再次运行时不再处理其中的文件"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        os.makedirs(os.path.join(root_folder, "a"))
+        for name in ("x.pdf", "y.jpg", "图.jpg"):
+            with open(os.path.join(root_folder, "a", name), "w", encoding="utf-8") as f:
+                f.write(name)
+
+        config = {"rules": [{"name": "pdf", "extensions": [".pdf"], "target": "文档"},
+                            {"name": "modified", "chinese": True, "target": "处理图"}]}
+        engine = OrganizerEngine(rules=compile_rules(config))
+        summary = engine.organize_files(root_folder)
+        assert summary.processed_count == 3
+        assert os.listdir(os.path.join(root_folder, "文档")) == ["x.pdf"]
+        assert os.listdir(os.path.join(root_folder, "处理图")) == ["图.jpg"]
+        assert json.dumps(summary.as_dict(), ensure_ascii=False)
+
+        entries, _ = scan_files(root_folder, classification_folders=engine.rules.target_folders)
+        assert entries == []
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_default_rules_dispatch()
+    test_size_rule_and_example_file()
+    test_toml_rules()
+    test_invalid_rules()
+    test_engine_with_custom_rules()
+    print("规则测试通过")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试持久化扫描索引的增量扫描
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from organizer.engine import OrganizerEngine
+from organizer.rules import compile_rules
+from organizer.scan_index import INDEX_FILENAME
+
+
+def create_files(folder, names):
+    os.makedirs(folder, exist_ok=True)
+    for name in names:
+        with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+            f.write(name)
+
+
+def test_unchanged_tree_is_not_relisted():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        for i in range(5):
+            create_files(os.path.join(root_folder, f"批次{i}", "子文件夹"), [f"IMG_{i}.jpg", f"图{i}.png"])
+
+        engine = OrganizerEngine(use_index=True)
+        summary = engine.organize_files(root_folder)
+        assert summary.processed_count == 10
+        assert os.path.isfile(os.path.join(root_folder, INDEX_FILENAME))
+        # 索引文件不会被当作普通文件整理
+        assert INDEX_FILENAME not in os.listdir(os.path.join(root_folder, "原图"))
+
+        # 刚整理完的文件夹修改时间与记录时间过近，第二次运行会重新确认一次
+        time.sleep(0.1)
+        engine.organize_files(root_folder)
+        summary = engine.organize_files(root_folder)
+        stats = summary.scan_stats
+        # 根文件夹、原图、处理图、5 个批次文件夹及其子文件夹
+        assert stats.directories == 0
+        assert stats.cached_dirs == 13
+        assert stats.scandir_calls == 0
+        assert summary.processed_count == 0
+
+        # 深层文件夹中新增的文件只会让该文件夹被重新列出
+        time.sleep(0.1)
+        create_files(os.path.join(root_folder, "批次3", "子文件夹"), ["new.jpg"])
+        summary = engine.organize_files(root_folder)
+        assert summary.processed_count == 1
+        assert summary.scan_stats.directories == 1
+        assert "new.jpg" in os.listdir(os.path.join(root_folder, "原图"))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_index_is_optional():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        create_files(os.path.join(temp_dir, "a"), ["x.jpg"])
+        OrganizerEngine().organize_files(temp_dir)
+        assert not os.path.exists(os.path.join(temp_dir, INDEX_FILENAME))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_changed_rules_recheck_original_folder():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "root")
+        for i in range(3):
+            create_files(os.path.join(root_folder, f"批次{i}"), [f"IMG_{i}.jpg"])
+        config = {"rules": [{"name": "modified", "keywords": ["拷贝"], "target": "处理图"}]}
+
+        OrganizerEngine(rules=compile_rules(config), use_index=True).organize_files(root_folder)
+        # 刚整理完的文件夹修改时间与记录时间过近，第二次运行会重新确认一次
+        time.sleep(0.1)
+        OrganizerEngine(rules=compile_rules(config), use_index=True).organize_files(root_folder)
+        summary = OrganizerEngine(rules=compile_rules(config), use_index=True).organize_files(root_folder)
+        assert summary.scan_stats.cached_dirs > 0 and summary.corrected_count == 0
+
+        # 规则改变后"原图"重新列出，按新规则放错的文件被修正
+        config["rules"].append({"name": "camera", "name_pattern": "^IMG_", "target": "处理图"})
+        summary = OrganizerEngine(rules=compile_rules(config), use_index=True).organize_files(root_folder)
+        assert summary.corrected_count == 3
+        assert sorted(os.listdir(os.path.join(root_folder, "处理图"))) == ["IMG_0.jpg", "IMG_1.jpg", "IMG_2.jpg"]
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_unchanged_tree_is_not_relisted()
+    test_index_is_optional()
+    test_changed_rules_recheck_original_folder()
+    print("扫描索引测试通过")
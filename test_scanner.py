@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试基于 os.scandir 的扫描器
+验证跳过根分类文件夹、相对路径与深度的记录以及系统调用计数
+"""
+
+import os
+import shutil
+import tempfile
+
+from organizer.scanner import Scanner, scan_files
+
+
+def create_files(folder, names):
+    os.makedirs(folder, exist_ok=True)
+    for name in names:
+        with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+            f.write(f"这是{name}的内容")
+
+
+def test_scanner():
+    """测试扫描器的文件收集结果"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        root_folder = os.path.join(temp_dir, "用户指定文件夹")
+        create_files(root_folder, ["根文件.jpg"])
+        create_files(os.path.join(root_folder, "原图"), ["已分类.jpg"])
+        create_files(os.path.join(root_folder, "处理图"), ["已分类_修改后.jpg"])
+        create_files(os.path.join(root_folder, "第一级", "第二级"), ["a.jpg", "表格.xlsx"])
+        create_files(os.path.join(root_folder, "第一级", "原图"), ["嵌套.jpg"])
+
+        skipped = {}
+        found_folders = []
+        entries, stats = scan_files(
+            root_folder,
+            on_skip=lambda rel_dir, count: skipped.__setitem__(rel_dir, count),
+            on_classification_folder=found_folders.append,
+        )
+
+        by_name = {entry.name: entry for entry in entries}
+        assert sorted(by_name) == ["a.jpg", "嵌套.jpg", "根文件.jpg", "表格.xlsx"]
+        assert skipped == {"原图": 1, "处理图": 1}
+        assert os.path.join("第一级", "原图") in found_folders
+
+        entry = by_name["a.jpg"]
+        assert entry.depth == 2
+        assert entry.rel_dir == os.path.join("第一级", "第二级")
+        assert by_name["根文件.jpg"].rel_folder == os.curdir
+
+        # 与旧的 (文件路径, 文件名, 源文件夹) 元组格式兼容
+        file_path, filename, source_folder = entry
+        assert file_path == os.path.join(source_folder, filename)
+        assert entry.stat().st_size > 0
+
+        # scandir 每个文件夹只需一次系统调用
+        assert stats.directories == 6
+        assert stats.scandir_calls == 6
+        assert stats.stat_calls == 1
+        assert stats.syscalls < stats.legacy_syscalls
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_scanner_skips_unreadable_folder():
+    """测试无法读取的文件夹被跳过并计入错误"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        scanner = Scanner(os.path.join(temp_dir, "不存在"))
+        errors = []
+        scanner.on_error = lambda folder, e: errors.append(folder)
+        assert list(scanner.scan()) == []
+        assert scanner.stats.errors == 1
+        assert len(errors) == 1
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_scanner()
+    test_scanner_skips_unreadable_folder()
+    print("扫描器测试通过")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试文件移动层：同盘重命名与跨盘内核复制
+"""
+
+import errno
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from organizer import transfer
+from organizer.transfer import FileMover
+
+
+class CrossDeviceMover(FileMover):
+    """把名为 other_disk 的文件夹当作另一块磁盘"""
+
+    def device_of(self, folder):
+        return 2 if os.path.basename(folder) == "other_disk" else 1
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def test_same_device_uses_rename():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        src = os.path.join(temp_dir, "a", "x.jpg")
+        dst = os.path.join(temp_dir, "原图", "x.jpg")
+        write_file(src, b"data")
+        os.makedirs(os.path.dirname(dst))
+
+        mover = FileMover()
+        assert mover.move(src, dst) == "rename"
+        assert not os.path.exists(src) and os.path.exists(dst)
+        assert mover.stats.renames == 1 and mover.stats.copies == 0
+        # 默认不为统计字节数多 stat 一次
+        assert mover.stats.bytes_moved == 0
+
+        counting = FileMover(count_bytes=True)
+        assert counting.move(dst, src) == "rename"
+        assert counting.stats.bytes_moved == 4 and counting.stats.bytes_copied == 0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_cross_device_copy_streams_and_keeps_metadata():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        data = os.urandom(3 * 1024 * 1024 + 17)
+        src = os.path.join(temp_dir, "a", "x.jpg")
+        dst = os.path.join(temp_dir, "other_disk", "x.jpg")
+        write_file(src, data)
+        os.utime(src, (1000000000, 1000000000))
+        os.makedirs(os.path.dirname(dst))
+
+        mover = CrossDeviceMover()
+        assert mover.move(src, dst) == "copy"
+        assert not os.path.exists(src)
+        with open(dst, 'rb') as f:
+            assert f.read() == data
+        assert int(os.stat(dst).st_mtime) == 1000000000
+        assert mover.stats.copies == 1
+        assert mover.stats.bytes_copied == len(data)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_buffered_fallback_when_kernel_copy_unsupported():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        data = os.urandom(transfer.BUFFER_SIZE * 2 + 5)
+        src = os.path.join(temp_dir, "a", "x.jpg")
+        dst = os.path.join(temp_dir, "other_disk", "x.jpg")
+        write_file(src, data)
+        os.makedirs(os.path.dirname(dst))
+
+        unsupported = OSError(errno.ENOSYS, "不支持")
+        with mock.patch.object(os, "copy_file_range", side_effect=unsupported, create=True), \
+                mock.patch.object(os, "sendfile", side_effect=unsupported, create=True):
+            mover = CrossDeviceMover()
+            mover.move(src, dst)
+
+        with open(dst, 'rb') as f:
+            assert f.read() == data
+        assert mover.stats.buffered == 1
+        assert mover.stats.bytes_copied == len(data)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_failed_copy_keeps_source():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        src = os.path.join(temp_dir, "a", "x.jpg")
+        dst = os.path.join(temp_dir, "other_disk", "x.jpg")
+        write_file(src, b"data")
+        os.makedirs(os.path.dirname(dst))
+
+        with mock.patch.object(os, "copy_file_range", side_effect=OSError(errno.EIO, "磁盘错误"), create=True):
+            try:
+                CrossDeviceMover().move(src, dst)
+            except OSError:
+                pass
+            else:
+                raise AssertionError("应当抛出 OSError")
+
+        assert os.path.exists(src)
+        assert not os.path.exists(dst)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_existing_target_is_kept():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        src = os.path.join(temp_dir, "a", "x.jpg")
+        dst = os.path.join(temp_dir, "other_disk", "x.jpg")
+        write_file(src, b"new")
+        write_file(dst, b"old")
+
+        try:
+            CrossDeviceMover().move(src, dst)
+        except FileExistsError:
+            pass
+        else:
+            raise AssertionError("应当抛出 FileExistsError")
+
+        # 目标位置原有的文件和源文件都保持不变
+        with open(dst, 'rb') as f:
+            assert f.read() == b"old"
+        with open(src, 'rb') as f:
+            assert f.read() == b"new"
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    test_same_device_uses_rename()
+    test_cross_device_copy_streams_and_keeps_metadata()
+    test_buffered_fallback_when_kernel_copy_unsupported()
+    test_failed_copy_keeps_source()
+    test_existing_target_is_kept()
+    print("文件移动层测试通过")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试监视模式：事件合并、文件稳定检查、轮询和 inotify 后端
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from organizer.engine import CallbackListener, OrganizerEngine
+from organizer.watch import FolderWatcher, InotifyBackend, PendingFiles, PollingBackend
+
+
+def write_file(path, content="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_pending_files_wait_for_stable_size():
+    """测试文件在延迟时间内没有变化才算就绪，仍在写入的文件重新计时"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        stable = os.path.join(temp_dir, "stable.jpg")
+        growing = os.path.join(temp_dir, "growing.jpg")
+        vanished = os.path.join(temp_dir, "vanished.tmp")
+        for path in (stable, growing, vanished):
+            write_file(path)
+
+        pending = PendingFiles(latency=1.0)
+        for path in (stable, growing, vanished):
+            pending.add(path, now=0.0)
+        # 突发事件只推迟截止时间
+        pending.add(stable, now=0.5)
+        assert pending.next_deadline() == 1.0
+
+        write_file(growing, "xxxx")
+        os.remove(vanished)
+        assert pending.pop_ready(now=1.2) == []
+        assert pending.pop_ready(now=1.5) == [stable]
+        assert len(pending) == 1
+        assert pending.pop_ready(now=2.2) == [growing]
+        assert len(pending) == 0 and pending.next_deadline() is None
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_polling_backend_reports_new_files_only():
+    """测试轮询后端只报告新文件和变化的文件，不进入根分类文件夹"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        write_file(os.path.join(temp_dir, "a", "old.jpg"))
+        write_file(os.path.join(temp_dir, "原图", "done.jpg"))
+        backend = PollingBackend(temp_dir, excluded=("原图",))
+        assert backend.poll() == []
+
+        write_file(os.path.join(temp_dir, "a", "new.jpg"))
+        write_file(os.path.join(temp_dir, "b", "c", "deep.jpg"))
+        write_file(os.path.join(temp_dir, "原图", "moved.jpg"))
+        changed = sorted(os.path.relpath(path, temp_dir) for path in backend.poll())
+        assert changed == [os.path.join("a", "new.jpg"), os.path.join("b", "c", "deep.jpg")]
+        assert backend.poll() == []
+        backend.close()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def check_watcher_organizes_new_files(backend):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        write_file(os.path.join(temp_dir, "早到", "before.jpg"))
+        logs = []
+        engine = OrganizerEngine(CallbackListener(log=logs.append))
+        watcher = FolderWatcher(engine, temp_dir, latency=0.2, backend=backend, poll_interval=0.1)
+        thread = threading.Thread(target=watcher.run)
+        thread.start()
+        try:
+            original = os.path.join(temp_dir, "原图")
+            modified = os.path.join(temp_dir, "处理图")
+            assert wait_until(lambda: os.path.exists(os.path.join(original, "before.jpg")))
+
+            write_file(os.path.join(temp_dir, "扫描", "IMG_1.jpg"))
+            write_file(os.path.join(temp_dir, "扫描", "新建", "精修.png"))
+            write_file(os.path.join(temp_dir, "扫描", "汇总.xlsx"))
+            assert wait_until(lambda: os.path.exists(os.path.join(original, "IMG_1.jpg"))
+                              and os.path.exists(os.path.join(modified, "精修.png"))
+                              and os.path.exists(os.path.join(temp_dir, "汇总.xlsx")))
+            # 等待移入根目录的Excel文件引起的事件也处理完
+            time.sleep(0.5)
+        finally:
+            watcher.stop()
+            thread.join(timeout=10)
+        assert not thread.is_alive()
+        assert watcher.processed_count == 4
+        assert watcher.error_count == 0
+        # 刚移入根目录的Excel文件不会被再次处理或重命名
+        assert not any(line.startswith("文件已在正确位置") for line in logs)
+        assert set(os.listdir(temp_dir)) == {"原图", "处理图", "扫描", "早到", "汇总.xlsx"}
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_watcher_with_polling():
+    check_watcher_organizes_new_files("poll")
+
+
+def test_watcher_with_inotify():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        InotifyBackend(temp_dir).close()
+    except OSError:
+        # 当前系统不支持 inotify
+        return
+    finally:
+        shutil.rmtree(temp_dir)
+    check_watcher_organizes_new_files("inotify")
+
+
+if __name__ == "__main__":
+    test_pending_files_wait_for_stable_size()
+    test_polling_backend_reports_new_files_only()
+    test_watcher_with_polling()
+    test_watcher_with_inotify()
+    print("监视模式测试通过")